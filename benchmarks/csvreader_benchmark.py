@@ -0,0 +1,76 @@
+"""
+Benchmark that compares the throughput of the different reading modes of :py:class:`CSVReader`.
+It reports the number of rows per second for reading dictionaries (:py:meth:`CSVReader.data`),
+records (:py:meth:`CSVReader.records`) and batches of records (:py:meth:`CSVReader.batches`).
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/csvreader_benchmark.py [path [repetitions]]
+"""
+import os
+import sys
+import time
+
+from gnmutils.reader.csvreader import CSVReader
+from gnmutils.parser.trafficparser import TrafficParser
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "gnmutils_tests/data/c00-001-001/1/1406555483-traffic.log-20140730"
+)
+
+
+def _read_data(reader, path):
+    count = 0
+    for _ in reader.data(path=path):
+        count += 1
+    return count
+
+
+def _read_records(reader, path):
+    count = 0
+    for _ in reader.records(path=path):
+        count += 1
+    return count
+
+
+def _read_batches(reader, path):
+    count = 0
+    for batch in reader.batches(path=path, size=1000):
+        count += len(batch)
+    return count
+
+
+def benchmark(function, path, repetitions=20):
+    """
+    Function measures the throughput of given :py:attr:`function` reading :py:attr:`path`. The
+    fastest of all repetitions is reported to reduce the influence of other load on the system.
+
+    :param function: function that reads the given path and returns the number of rows
+    :param path: path of file to read
+    :param repetitions: number of times the file is read
+    :return: rows per second
+    """
+    parser = TrafficParser()
+    reader = CSVReader()
+    reader.parser = parser
+    best = None
+    for _ in range(repetitions):
+        parser.parsed_data.clear()
+        start = time.time()
+        rows = function(reader, path)
+        duration = time.time() - start
+        if best is None or duration < best[1]:
+            best = (rows, duration)
+    return best[0] / best[1]
+
+
+def main(path=DEFAULT_PATH, repetitions=20):
+    results = [(name, benchmark(function, path, repetitions)) for name, function in (
+        ("data", _read_data), ("records", _read_records), ("batches", _read_batches))]
+    baseline = results[0][1]
+    for name, rows_per_second in results:
+        print("%-10s %12.0f rows/s (%.2fx)" % (name, rows_per_second, rows_per_second / baseline))
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or [DEFAULT_PATH]), repetitions=int((sys.argv[2:3] or [20])[0]))
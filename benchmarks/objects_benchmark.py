@@ -0,0 +1,77 @@
+"""
+Benchmark that reports the memory needed per :py:class:`Process` and :py:class:`Traffic` object.
+The slotted objects are compared to dictionary backed objects holding the same attributes, which
+is the representation used before the attributes have been moved into slots. Attribute values
+are shared between both representations and therefore not counted.
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/objects_benchmark.py
+"""
+import os
+import sys
+
+from gnmutils.reader.csvreader import CSVReader
+from gnmutils.parser.jobparser import JobParser
+from gnmutils.parser.trafficparser import TrafficParser
+
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "gnmutils_tests/data/c00-001-001/1"
+)
+
+
+class DictObject(object):
+    """
+    Dictionary backed object that is used as reference.
+    """
+    def __init__(self, state):
+        self.__dict__.update(state)
+
+
+def _size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    traffic = getattr(obj, "_traffic", None)
+    if traffic is not None:
+        size += sys.getsizeof(traffic)
+    return size
+
+
+def bytes_per_object(objects):
+    """
+    Function returns the average number of bytes per object for the given objects and their dict
+    backed counterparts.
+
+    :param objects: list of objects
+    :return: tuple of bytes per object for dict backed and current objects
+    """
+    dict_objects = [DictObject(obj.__getstate__()) for obj in objects]
+    return (sum(_size(obj) for obj in dict_objects) / float(len(objects)),
+            sum(_size(obj) for obj in objects) / float(len(objects)))
+
+
+def processes():
+    parser = JobParser()
+    reader = CSVReader()
+    reader.parser = parser
+    job = next(parser.parse(path=os.path.join(DATA_PATH, "1-process.csv")))
+    return [node.value for pid in job.process_cache for node in job.process_cache[pid]]
+
+
+def traffics():
+    parser = TrafficParser()
+    reader = CSVReader()
+    reader.parser = parser
+    return next(parser.parse(path=os.path.join(DATA_PATH, "1-traffic.csv")))
+
+
+def main():
+    for name, objects in (("Process", processes()), ("Traffic", traffics())):
+        before, after = bytes_per_object(objects)
+        print("%-8s %6d objects: %6.0f bytes (dict) -> %6.0f bytes (slots), %.1f%% saved" % (
+            name, len(objects), before, after, 100 * (1 - after / before)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark that reports the time needed to build and to traverse the process tree of synthetic
+:py:class:`Job`s of different sizes. Trees are generated in three shapes: random trees where
+processes are attached to a random earlier process, deep trees that form a single chain and wide
+trees where all processes are children of the root. Besides the linked trees, freezing the tree
+into a :py:class:`FrozenTree`, walking the frozen tree and computing its metrics is timed, as well as ordering the processes of
+the job for replaying.
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/tree_benchmark.py [process_count [repetitions]]
+"""
+import logging
+import random
+import sys
+import time
+
+from gnmutils.objects.job import Job
+from gnmutils.objects.process import Process
+from gnmutils.treemetrics import tree_metrics
+
+
+def synthetic_job(count, shape="random", seed=0):
+    """
+    Function creates a complete job of :py:attr:`count` processes.
+
+    :param int count: number of processes
+    :param str shape: shape of tree, one of `random`, `deep` and `wide`
+    :param seed: seed of random generator
+    :return: job
+    """
+    generator = random.Random(seed)
+    exit_tme = 10 * count + 10
+    processes = [Process(name="sge_shepherd", cmd="sge_shepherd", pid=1, ppid=0, gpid=1, tme=0,
+                         exit_tme=exit_tme)]
+    for index in range(1, count):
+        if shape == "deep":
+            parent = processes[-1]
+        elif shape == "wide":
+            parent = processes[0]
+        else:
+            parent = processes[generator.randrange(index)]
+        processes.append(Process(name="test", cmd="test", pid=index + 1, ppid=parent.pid, gpid=1,
+                                 tme=10 * index, exit_tme=exit_tme - 1))
+    job = Job()
+    for process in processes:
+        job.add_process(process=process)
+    return job
+
+
+def _timed(function, repetitions):
+    best = None
+    for _ in range(repetitions):
+        start = time.time()
+        function()
+        duration = time.time() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def _walk_dfs(job):
+    for _ in job.tree.walkDFS():
+        pass
+
+
+def _walk_bfs(job):
+    for _ in job.tree.walkBFS():
+        pass
+
+
+def _walk_frozen(frozen):
+    for _ in frozen.walk():
+        pass
+
+
+def _processes_in_order(job):
+    for _ in job.processes_in_order():
+        pass
+
+
+def main(count=100000, repetitions=3):
+    logging.disable(logging.CRITICAL)
+    for shape in ("random", "deep", "wide"):
+        for size in (count // 100, count // 10, count):
+            job = synthetic_job(size, shape=shape)
+            frozen = job.tree.freeze()
+            for name, function in (("build", job.regenerate_tree),
+                                   ("walkDFS", lambda: _walk_dfs(job)),
+                                   ("walkBFS", lambda: _walk_bfs(job)),
+                                   ("freeze", lambda: job.tree.freeze()),
+                                   ("walk", lambda: _walk_frozen(frozen)),
+                                   ("metrics", lambda: tree_metrics(frozen)),
+                                   ("order", lambda: _processes_in_order(job))):
+                try:
+                    duration = _timed(function, repetitions)
+                except (RuntimeError, AttributeError) as error:
+                    # recursion limit of recursive traversals or tree has not been built
+                    print("%-6s %-8s %7d processes: %s" % (shape, name, size, error))
+                    continue
+                print("%-6s %-8s %7d processes: %8.3f s (%5.2f us per process)" % (
+                    shape, name, size, duration, 1e6 * duration / size))
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
@@ -0,0 +1,276 @@
+"""
+The :py:class:`JobCatalog` keeps summaries of the jobs that have been written into a run, so that
+jobs can be selected without parsing their process files.
+"""
+import collections
+import logging
+import os
+
+from gnmutils.utils import replace_file
+
+FIELDS = ("id", "gpid", "tme", "exit_tme", "last_tme", "uid", "valid", "complete",
+          "process_count", "process_size", "traffic_size")
+
+
+class JobSummary(collections.namedtuple("JobSummary", FIELDS)):
+    """
+    Summary of a :py:class:`Job` as stored in a :py:class:`JobCatalog`. Besides attributes of the
+    job, the sizes of its process and traffic file in bytes are given. The size of the process
+    file is used to detect summaries of files that have been changed without updating the catalog.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_job(cls, job=None, process_size=0, traffic_size=0):
+        """
+        Method creates the summary of the given job.
+
+        :param job: job to summarize
+        :param int process_size: size of process file in bytes
+        :param int traffic_size: size of traffic file in bytes
+        :return: summary of job
+        :rtype: :py:class:`JobSummary`
+        """
+        return cls(id=str(job.db_id), gpid=job.gpid, tme=job.tme, exit_tme=job.exit_tme,
+                   last_tme=job.last_tme, uid=job.uid, valid=job.is_valid(),
+                   complete=job.is_complete(), process_count=job.process_count(),
+                   process_size=process_size, traffic_size=traffic_size)
+
+    @classmethod
+    def from_row(cls, row=None):
+        """
+        Method creates a summary from a row of a catalog file.
+
+        :param list row: values in order of :py:attr:`FIELDS`
+        :return: summary
+        :rtype: :py:class:`JobSummary`
+        """
+        values = [row[0]]
+        for value in row[1:]:
+            values.append(int(value) if value else None)
+        summary = cls._make(values)
+        return summary._replace(valid=bool(summary.valid), complete=bool(summary.complete))
+
+    def with_sizes(self, process_size=None, traffic_size=None):
+        """
+        Method returns the summary with the given sizes of files, sizes that are not given are
+        kept.
+
+        :param int process_size: size of process file in bytes
+        :param int traffic_size: size of traffic file in bytes
+        :return: summary
+        :rtype: :py:class:`JobSummary`
+        """
+        changes = {}
+        if process_size is not None:
+            changes["process_size"] = process_size
+        if traffic_size is not None:
+            changes["traffic_size"] = traffic_size
+        return self._replace(**changes)
+
+    def getRow(self):
+        return ",".join("" if value is None else str(int(value)) if isinstance(value, bool)
+                        else str(value) for value in self)
+
+    def matches(self, valid=None, complete=None, uid=None, start=None, end=None):
+        """
+        Method checks if the summary matches the given criteria. A job matches the time window
+        given by :py:attr:`start` and :py:attr:`end` if it has been running during the window.
+        Criteria that are not given are not checked.
+
+        :param valid: if job is valid
+        :param complete: if job is complete
+        :param uid: uid of job
+        :param start: start of time window
+        :param end: end of time window
+        :return: true if summary matches, false otherwise
+        """
+        if valid is not None and self.valid != valid:
+            return False
+        if complete is not None and self.complete != complete:
+            return False
+        if uid is not None and self.uid != uid:
+            return False
+        if end is not None and self.tme > end:
+            return False
+        if start is not None:
+            last_tme = self.last_tme or self.exit_tme
+            if last_tme is not None and last_tme < start:
+                return False
+        return True
+
+
+def job_matches(job=None, valid=None, complete=None, uid=None, start=None, end=None):
+    """
+    Function checks if the given job matches the criteria of :py:meth:`JobSummary.matches`.
+
+    :param job: job to check
+    :return: true if job matches, false otherwise
+    """
+    if job is None:
+        return False
+    return JobSummary.from_job(job).matches(
+        valid=valid, complete=complete, uid=uid, start=start, end=end)
+
+
+class JobCatalog(object):
+    """
+    The class :py:class:`JobCatalog` manages the file of :py:class:`JobSummary`s of a run. The file
+    is a CSV file that holds a single row per job. Summaries of new jobs are appended to the file,
+    when the summary of a job that is already in the catalog changes, the file is rewritten with
+    the current summaries.
+
+    :param path: path of the run
+    """
+    file_name = "job_catalog.csv"
+
+    def __init__(self, path=None):
+        self.path = path
+        self._summaries = None
+        # if the file needs to be rewritten before appending, e.g. because of an incomplete row
+        self._rewrite = False
+
+    def __contains__(self, job_id):
+        return str(job_id) in self.summaries
+
+    def __len__(self):
+        return len(self.summaries)
+
+    @property
+    def file_path(self):
+        return os.path.join(self.path, self.file_name)
+
+    @property
+    def summaries(self):
+        """
+        Method returns the current summaries, they are loaded when first accessed.
+
+        :return: dictionary of job ids and summaries
+        :rtype: collections.OrderedDict
+        """
+        if self._summaries is None:
+            self._load()
+        return self._summaries
+
+    def get(self, job_id=None):
+        """
+        Method returns the summary of the given job.
+
+        :param job_id: id of job
+        :return: summary, `None` if job is not in catalog
+        :rtype: :py:class:`JobSummary`
+        """
+        return self.summaries.get(str(job_id), None)
+
+    def select(self, **kwargs):
+        """
+        Generator that returns the summaries matching the given criteria (see
+        :py:meth:`JobSummary.matches`).
+
+        :return: generator of summaries
+        """
+        for summary in self.summaries.values():
+            if summary.matches(**kwargs):
+                yield summary
+
+    def update(self, summary=None):
+        """
+        Method adds or replaces the summary of a job.
+
+        :param summary: summary of job
+        :type summary: :py:class:`JobSummary`
+        """
+        self.update_all(summaries=[summary])
+
+    def update_all(self, summaries=None):
+        """
+        Method adds or replaces the summaries of several jobs at once. Summaries that have not
+        changed are skipped. If any job that is already in the catalog has changed, the file is
+        rewritten once, otherwise the summaries of new jobs are appended.
+
+        :param summaries: iterable of summaries of jobs
+        """
+        current = self.summaries
+        added = []
+        replaced = False
+        for summary in summaries:
+            known = current.get(summary.id, None)
+            if known == summary:
+                continue
+            if known is None:
+                added.append(summary)
+            else:
+                replaced = True
+            current[summary.id] = summary
+        if replaced or (added and self._rewrite):
+            self._write(current.values(), mode="w")
+        elif added:
+            self._write(added, mode="a")
+
+    def update_sizes(self, job_id=None, process_size=None, traffic_size=None):
+        """
+        Method updates the sizes of files of a job that is already in the catalog.
+
+        :param job_id: id of job
+        :param int process_size: size of process file in bytes
+        :param int traffic_size: size of traffic file in bytes
+        :return: true if job is in catalog, false otherwise
+        """
+        summary = self.get(job_id)
+        if summary is None:
+            return False
+        self.update(summary.with_sizes(process_size=process_size, traffic_size=traffic_size))
+        return True
+
+    def remove(self, job_ids=None):
+        """
+        Method removes the summaries of the given jobs, e.g. because their files have been
+        archived.
+
+        :param job_ids: iterable of ids of jobs
+        """
+        current = self.summaries
+        removed = [current.pop(str(job_id)) for job_id in job_ids if str(job_id) in current]
+        if removed:
+            self._write(current.values(), mode="w")
+
+    def _write(self, summaries, mode="a"):
+        if mode == "w":
+            temporary_path = "%s.tmp" % self.file_path
+            self._rewrite = False
+        else:
+            temporary_path = None
+        with open(temporary_path or self.file_path, mode) as catalog_file:
+            if catalog_file.tell() == 0:
+                catalog_file.write("%s\n" % ",".join(FIELDS))
+            for summary in summaries:
+                catalog_file.write("%s\n" % summary.getRow())
+        if temporary_path is not None:
+            replace_file(source=temporary_path, target=self.file_path)
+
+    def _load(self):
+        self._summaries = collections.OrderedDict()
+        self._rewrite = False
+        try:
+            catalog_file = open(self.file_path, "r")
+        except IOError:
+            return
+        with catalog_file:
+            for line in catalog_file:
+                if line[0] == "#" or line.startswith("id,"):
+                    continue
+                if line[-1] != "\n":
+                    logging.getLogger(self.__class__.__name__).warning(
+                        "ignoring incomplete row in %s", self.file_path)
+                    self._rewrite = True
+                    break
+                try:
+                    summary = JobSummary.from_row(line[:-1].split(","))
+                except (TypeError, ValueError):
+                    logging.getLogger(self.__class__.__name__).warning(
+                        "ignoring invalid row in %s: %s", self.file_path, line)
+                    continue
+                if summary.id in self._summaries:
+                    # rows of catalogs that have been appended to for every update
+                    self._rewrite = True
+                self._summaries[summary.id] = summary
@@ -0,0 +1,272 @@
+"""
+The :py:class:`Checkpoint` stores the state of parsers incrementally in an append-only file.
+"""
+import hashlib
+import itertools
+import logging
+import os
+import pickle
+
+from gnmutils.objectcache import ObjectCache
+from gnmutils.utils import replace_file
+
+
+class Checkpoint(object):
+    """
+    The class :py:class:`Checkpoint` manages a file of records that each set or delete a single
+    entry of a state. A state is given as dictionary of entries. When updating the checkpoint, only
+    entries that have changed since the last update are appended. Entries are compared by the
+    fingerprint of their pickled value.
+
+    Every record consists of a pickled header with operation, key, fingerprint and size of the
+    value, followed by the pickled value itself. Therefore the index of the current entries can be
+    built without unpickling the values, values are only read when accessed.
+
+    As soon as the file contains more than :py:attr:`compaction_factor` times the records that are
+    required for the current entries, it is compacted by rewriting the current entries only.
+
+    :param path: path of the checkpoint file
+    :param int compaction_factor: ratio of records to entries that triggers compaction
+    """
+    SET = "set"
+    DELETE = "delete"
+    KIND = "kind"
+
+    # number of records that are always accepted before compacting
+    minimum_records = 100
+    # pickle protocol that is supported by all python versions in use
+    protocol = 2
+
+    def __init__(self, path=None, compaction_factor=2):
+        self.path = path
+        self.compaction_factor = compaction_factor
+        self._kind = None
+        # maps keys to fingerprint, offset and size of their value
+        self._index = None
+        self._records = 0
+        self._end = 0
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def kind(self):
+        """
+        Method returns the kind of state that is stored, `None` if nothing has been stored yet.
+
+        :return: kind of state
+        """
+        self.index
+        return self._kind
+
+    @property
+    def index(self):
+        """
+        Method returns the index of current entries, it is loaded when first accessed.
+
+        :return: dictionary of keys and tuples of fingerprint, offset and size
+        :rtype: dict
+        """
+        if self._index is None:
+            self._load_index()
+        return self._index
+
+    def keys(self):
+        """
+        Method returns the keys of the current entries.
+
+        :return: keys of entries
+        :rtype: list
+        """
+        return list(self.index.keys())
+
+    def value(self, key=None):
+        """
+        Method reads the value of a single entry.
+
+        :param key: key of entry
+        :return: value of entry
+        :raises KeyError: if there is no entry for key
+        """
+        _, offset, size = self.index[key]
+        with open(self.path, "rb") as checkpoint_file:
+            checkpoint_file.seek(offset)
+            return pickle.loads(checkpoint_file.read(size))
+
+    def items(self):
+        """
+        Generator that reads the values of the current entries.
+
+        :return: generator of tuples of key and value
+        """
+        if not self.index:
+            return
+        with open(self.path, "rb") as checkpoint_file:
+            for key, (_, offset, size) in sorted(self.index.items(), key=lambda item: item[1][1]):
+                checkpoint_file.seek(offset)
+                yield key, pickle.loads(checkpoint_file.read(size))
+
+    def update(self, entries=None, kind=None, unchanged=None):
+        """
+        Method appends the changes of :py:attr:`entries` compared to the current entries of the
+        checkpoint. Entries that are not given anymore are deleted.
+
+        Entries that are known to be stored already can be given as :py:attr:`unchanged`. They
+        are kept without pickling them. Only if they are missing, their value is requested.
+
+        :param dict entries: dictionary of current entries
+        :param kind: kind of the state the entries belong to
+        :param dict unchanged: dictionary of keys and functions returning the value of entries
+            that have not been changed since the last update
+        """
+        index = self.index
+        unchanged = unchanged or {}
+        records = []
+        if kind != self.kind:
+            records.append((self.KIND, kind, None, None))
+        missing = ((key, load()) for key, load in unchanged.items() if key not in index)
+        for key, value in itertools.chain(entries.items(), missing):
+            value = pickle.dumps(value, self.protocol)
+            fingerprint = hashlib.md5(value).digest()
+            try:
+                if index[key][0] == fingerprint:
+                    continue
+            except KeyError:
+                pass
+            records.append((self.SET, key, fingerprint, value))
+        for key in index:
+            if key not in entries and key not in unchanged:
+                records.append((self.DELETE, key, None, None))
+        if self._records + len(records) > \
+                self.compaction_factor * (len(entries) + len(unchanged) + 1) + \
+                self.minimum_records:
+            self._compact(records)
+        elif records:
+            self._append(records)
+
+    def _append(self, records):
+        mode = "r+b" if os.path.exists(self.path) else "wb"
+        with open(self.path, mode) as checkpoint_file:
+            # drop an eventually incomplete record at the end
+            checkpoint_file.seek(self._end)
+            checkpoint_file.truncate()
+            self._write(checkpoint_file, records)
+
+    def _compact(self, records):
+        """
+        Method rewrites the checkpoint with the current entries after applying the given records.
+        Values that have not been changed are copied without unpickling them.
+        """
+        values = {}
+        if self._index:
+            with open(self.path, "rb") as checkpoint_file:
+                for key, (fingerprint, offset, size) in self._index.items():
+                    checkpoint_file.seek(offset)
+                    values[key] = (fingerprint, checkpoint_file.read(size))
+        kind = self._kind
+        for operation, key, fingerprint, value in records:
+            if operation == self.SET:
+                values[key] = (fingerprint, value)
+            elif operation == self.DELETE:
+                values.pop(key, None)
+            elif operation == self.KIND:
+                kind = key
+        temporary_path = "%s.tmp" % self.path
+        self._index = {}
+        self._records = 0
+        self._end = 0
+        with open(temporary_path, "wb") as checkpoint_file:
+            self._write(checkpoint_file, [(self.KIND, kind, None, None)] + [
+                (self.SET, key, fingerprint, value)
+                for key, (fingerprint, value) in values.items()])
+        replace_file(source=temporary_path, target=self.path)
+        logging.getLogger(self.__class__.__name__).debug(
+            "compacted %s to %d entries", self.path, len(values))
+
+    def _write(self, checkpoint_file, records):
+        index = self._index
+        for operation, key, fingerprint, value in records:
+            pickle.dump((operation, key, fingerprint, len(value or "")), checkpoint_file,
+                        self.protocol)
+            if operation == self.SET:
+                index[key] = (fingerprint, checkpoint_file.tell(), len(value))
+                checkpoint_file.write(value)
+            elif operation == self.DELETE:
+                index.pop(key, None)
+            elif operation == self.KIND:
+                self._kind = key
+        self._records += len(records)
+        self._end = checkpoint_file.tell()
+
+    def _load_index(self):
+        self._index = {}
+        self._records = 0
+        self._end = 0
+        try:
+            checkpoint_file = open(self.path, "rb")
+        except IOError:
+            return
+        with checkpoint_file:
+            while True:
+                try:
+                    operation, key, fingerprint, size = pickle.load(checkpoint_file)
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError):
+                    logging.getLogger(self.__class__.__name__).warning(
+                        "ignoring incomplete record at %d in %s", self._end, self.path)
+                    break
+                offset = checkpoint_file.tell()
+                if offset + size > os.fstat(checkpoint_file.fileno()).st_size:
+                    logging.getLogger(self.__class__.__name__).warning(
+                        "ignoring incomplete record at %d in %s", self._end, self.path)
+                    break
+                if operation == self.SET:
+                    self._index[key] = (fingerprint, offset, size)
+                    checkpoint_file.seek(size, 1)
+                elif operation == self.DELETE:
+                    self._index.pop(key, None)
+                elif operation == self.KIND:
+                    self._kind = key
+                self._records += 1
+                self._end = checkpoint_file.tell()
+
+
+def checkpoint_entries(data=None, checkpoint=None):
+    """
+    Function that splits the given state into entries that can be stored independently in a
+    :py:class:`Checkpoint`. Supported are :py:class:`ObjectCache`s, sets and dictionaries.
+
+    :param data: state to be split
+    :param checkpoint: checkpoint the entries are written to
+    :return: tuple of kind of state, dictionary of entries and dictionary of unchanged entries
+        (see :py:meth:`Checkpoint.update`), `None` if not supported
+    """
+    if isinstance(data, ObjectCache):
+        entries, unchanged = data.checkpoint_entries(checkpoint=checkpoint)
+        return "ObjectCache", entries, unchanged
+    if isinstance(data, set):
+        return "set", dict((element, None) for element in data), None
+    if isinstance(data, dict):
+        return "dict", data, None
+    return None
+
+
+def restore(checkpoint=None):
+    """
+    Function that restores the state stored in the given :py:class:`Checkpoint`. The data of
+    :py:class:`ObjectCache`s is read when it is accessed.
+
+    :param checkpoint: checkpoint to restore state from
+    :return: restored state
+    """
+    if checkpoint.kind == "ObjectCache":
+        return ObjectCache.from_checkpoint(checkpoint)
+    if checkpoint.kind == "set":
+        return set(checkpoint.keys())
+    if checkpoint.kind == "dict":
+        return dict(checkpoint.items())
+    raise ValueError("unknown kind of checkpoint %s" % checkpoint.kind)
@@ -1,9 +1,11 @@
 """
 The module offers convenience methods to access objects from the database.
 """
+import collections
 import logging
 
-from gnmutils.db.dbobjects import DBWorkernodeObject, DBConfigurationObject, DBAffiliationObject
+from gnmutils.db.dbobjects import DBWorkernodeObject, DBConfigurationObject, DBAffiliationObject, \
+    DBJobObject
 
 from dbutils.sqlcommand import SQLCommand
 from dbutils.exceptions import UniqueConstrainedViolatedException
@@ -13,9 +15,26 @@ class DBOperator(object):
     """
     The class :py:class:`DBOperator` offers convenience methods to load and look for different
     domain objects for GNM workflow.
+
+    Workernodes, configurations and affiliations are only a few hundred objects that are looked
+    up for every job. Therefore they are kept in a cache of at most :py:attr:`cache_size` objects once they
+    have been loaded or created, so the database is only queried for objects that have not been
+    looked up before. If objects are changed or deleted in the database by others, the cache
+    needs to be cleared by :py:meth:`clear_caches`.
+
+    :param data_source: data source of database
+    :param int cache_size: maximum number of objects that are cached
     """
-    def __init__(self, data_source=None):
+    def __init__(self, data_source=None, cache_size=1024):
         self._data_source = data_source
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+
+    def clear_caches(self):
+        """
+        Method clears the cache of workernodes, configurations and affiliations.
+        """
+        self._cache.clear()
 
     def load_one(self, data=None, **kwargs):
         """
@@ -63,6 +82,19 @@ class DBOperator(object):
             job_object.add_filter('last_tme', '>=')
         return sql_command.findOne(job_object)
 
+    def load_jobs(self, run=None, workernode_id=None, **kwargs):
+        """
+        Generator that loads all jobs of the given run and workernode from the database.
+
+        :param run: name of run
+        :param workernode_id: id of workernode
+        :param kwargs: additional arguments
+        :return: generator of job objects
+        """
+        sql_command = kwargs.get("sql_command", SQLCommand(dataSource=self._data_source))
+        for job_object in sql_command.find(DBJobObject(run=run, workernode_id=workernode_id)):
+            yield job_object
+
     def load_or_create_affiliation(self, data=None, **kwargs):
         """
         Method to either load an already existing affiliation from the database specified by given
@@ -88,6 +120,20 @@ class DBOperator(object):
                 raise
         return affiliation_object
 
+    def load_or_create_affiliations(self, uids=None, **kwargs):
+        """
+        Method ensures that affiliations exist for all given `uid`s, e.g. before saving several
+        jobs at once. Every uid is only looked up once, uids that are not valid are skipped.
+
+        :param uids: iterable of uids
+        :param kwargs: additional arguments
+        :return: list of loaded or created affiliations
+        :raise: Exception
+        """
+        return [self._cached(("affiliation", uid),
+                             lambda: self.load_or_create_affiliation(data=uid, **kwargs))
+                for uid in sorted(set(uids)) if uid and uid > 0]
+
     def load_or_create_workernode(self, data=None, **kwargs):
         """
         Method to either load an already existing workernode from the database specified by given
@@ -99,7 +145,24 @@ class DBOperator(object):
         :rtype: :py:class:`DBWorkernodeObject`
         :raise: Exception
         """
-        sql_command = kwargs.get("sql_command", SQLCommand(dataSource=self._data_source))
+        return self._cached(("workernode", data),
+                            lambda: self._load_or_create_workernode(data=data, **kwargs))
+
+    def load_workernode(self, workernode_id=None, **kwargs):
+        """
+        Method to load the workernode with the given id from the database.
+
+        :param workernode_id: id of workernode
+        :param kwargs: additional arguments
+        :return: loaded workernode
+        :rtype: :py:class:`DBWorkernodeObject`
+        :raise: Exception
+        """
+        return self._cached(("workernode_id", workernode_id), lambda: self.load_one(
+            data=DBWorkernodeObject(id=workernode_id), **kwargs))
+
+    def _load_or_create_workernode(self, data=None, **kwargs):
+        sql_command = kwargs.get("sql_command", None) or SQLCommand(dataSource=self._data_source)
         workernode_object = DBWorkernodeObject(name=data)
         try:
             workernode_object = self.load_one(sql_command=sql_command, data=workernode_object)
@@ -124,7 +187,12 @@ class DBOperator(object):
         :rtype: :py:class:`DBConfigurationObject`
         :raise: Exception
         """
-        sql_command = kwargs.get("sql_command", SQLCommand(dataSource=self._data_source))
+        key = ("configuration", data.version, data.interval, data.level, data.grouping,
+               data.skip_other_pids)
+        return self._cached(key, lambda: self._load_or_create_configuration(data=data, **kwargs))
+
+    def _load_or_create_configuration(self, data=None, **kwargs):
+        sql_command = kwargs.get("sql_command", None) or SQLCommand(dataSource=self._data_source)
         config = data
         configuration_object = DBConfigurationObject(
             version=config.version,
@@ -150,6 +218,50 @@ class DBOperator(object):
                 raise
         return configuration_object
 
+    def _cached(self, key, load):
+        """
+        Method returns the object cached for :py:attr:`key`. If it is not cached, it is loaded by
+        calling :py:attr:`load`. Objects that cannot be loaded are not cached.
+
+        :param key: key of object
+        :param load: function that loads the object
+        :return: cached or loaded object
+        """
+        cache = self._cache
+        try:
+            db_object = cache.pop(key)
+        except KeyError:
+            db_object = load()
+            if db_object is None:
+                return None
+            if len(cache) >= self.cache_size:
+                cache.popitem(last=False)
+        # objects are kept in order of their last access
+        cache[key] = db_object
+        return db_object
+
+    def save_all(self, data=None, **kwargs):
+        """
+        Method to save or update all database objects given in :py:attr:`data` inside a single
+        transaction. If one of the objects cannot be saved, the transaction is rolled back and the
+        exception is raised.
+
+        :param data: list of objects to save or update
+        :param kwargs: additional arguments
+        :return: list of saved/updated database objects
+        :raise: Exception
+        """
+        sql_command = kwargs.get("sql_command", None) or SQLCommand(dataSource=self._data_source)
+        try:
+            sql_command.startTransaction()
+            db_objects = [sql_command.update(db_object) if db_object.id_value else
+                          sql_command.save(db_object) for db_object in data]
+            sql_command.commitTransaction()
+        except Exception:
+            sql_command.rollbackTransaction()
+            raise
+        return db_objects
+
     def save_or_update(self, data=None, **kwargs):
         """
         Method to save or update an database object given in :py:attr:`data`.
@@ -7,12 +7,14 @@ import multiprocessing
 import logging
 import os
 import re
+import time
 
 from gnmutils.sources.datasource import DataSource
 from gnmutils.sources.filedatasource import FileDataSource
 from gnmutils.sources.dbbackedfiledatasource import DBBackedFileDataSource
 from gnmutils.pilot import Pilot
-from gnmutils.utils import directory_level, relevant_directories, RUN_LEVEL
+from gnmutils.objects.job import Job
+from gnmutils.utils import directory_level, relevant_directories, raw_data_size, RUN_LEVEL
 
 from utility.report import LVL, update_parser, argparse_init
 from utility.exceptions import ExceptionFrame, mainExceptionFrame
@@ -42,7 +44,8 @@ def create_payloads():
         count=count,
         target=_create_payloads,
         data=[{"path": os.path.join(os.path.join(element[0], element[1]), element[2]),
-               "output_path": output_path} for element in list(relevant_directories(path))])
+               "output_path": output_path} for element in list(relevant_directories(path))],
+        size_function=_processed_work_unit_size)
 
 
 def import_cms_dashboard_data():
@@ -95,7 +98,8 @@ def archive_jobs():
     do_multicore(
         count=count,
         target=_archive_jobs,
-        data=data)
+        data=data,
+        size_function=_processed_work_unit_size)
 
 
 def generate_network_statistics():
@@ -118,18 +122,85 @@ def generate_network_statistics():
     )
 
 
-def do_multicore(count=1, target=None, data=None):
+def do_multicore(count=1, target=None, data=None, size_function=None, chunksize=1):
     """
     Entry function that starts the actual functions using given :py:attr:`count` of cores.
 
+    The work units given in :py:attr:`data` are weighted by :py:attr:`size_function` and handed
+    out largest first. Workers request new units as soon as they are done, so a single huge
+    run does not end up being processed last while other cores are already idle. Progress and
+    duration of every unit is reported via logging.
+
     :param count: number of cores to use for processing
     :param target: target function to use for processing
     :param data: data to use for processing
+    :param size_function: function returning the estimated size of a work unit, defaults to
+        the bytes of raw data inside the path of a work unit
+    :param chunksize: number of work units that are handed to a worker at once
     """
+    if size_function is None:
+        size_function = _work_unit_size
+    sized_data = sorted(((size_function(element), element) for element in data or []),
+                        key=lambda sized_element: sized_element[0], reverse=True)
+    total_size = sum(size for size, _ in sized_data) or 1
+    logger = logging.getLogger(__name__)
+    logger.info("processing %d work units (%d bytes) on %d cores",
+                len(sized_data), total_size, count)
+
+    start = time.time()
+    done_size = 0
     pool = multiprocessing.Pool(processes=count)
-    pool.map(target, data)
-    pool.close()
-    pool.join()
+    try:
+        work_units = [(target, element, size) for size, element in sized_data]
+        for index, (element, size, duration) in enumerate(
+                pool.imap_unordered(_timed_work_unit, work_units, chunksize)):
+            done_size += size
+            logger.info("finished work unit %d/%d (%.1f%%) in %.2fs: %s",
+                        index + 1, len(work_units), 100.0 * done_size / total_size,
+                        duration, element)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    logger.info("processed %d work units in %.2fs", len(sized_data), time.time() - start)
+
+
+def _timed_work_unit(work_unit):
+    target, element, size = work_unit
+    start = time.time()
+    target(element)
+    return element, size, time.time() - start
+
+
+def _work_unit_path(element):
+    path = element.get("path", None)
+    if path is not None and "workernode" in element and "run" in element:
+        path = os.path.join(os.path.join(path, element["workernode"]), element["run"])
+    return path
+
+
+def _work_unit_size(element):
+    path = _work_unit_path(element)
+    if path is None:
+        return 0
+    return raw_data_size(path)
+
+
+def _processed_work_unit_size(element):
+    """
+    Function returns the number of bytes of the process and traffic files of processed jobs of a
+    work unit, e.g. for the work units of :py:func:`create_payloads` and :py:func:`archive_jobs`.
+
+    :param dict element: work unit
+    :return: size of processed data in bytes
+    :rtype: int
+    """
+    path = _work_unit_path(element)
+    if path is None:
+        return 0
+    return raw_data_size(path, "*-process.csv") + raw_data_size(path, "*-traffic.csv")
 
 
 def _create_payloads(args):
@@ -140,7 +211,7 @@ def _create_payloads(args):
         for pilot in data_source.jobs(path=path):
             pilot.__class__ = Pilot
             if pilot.is_cms_pilot():
-                pilot.prepare_traffic()
+                pilot.prepare_traffic(lazy=True)
                 for payload, _ in pilot.payloads():
                     # write file per payload
                     data_source.write_payload(path=output_path,
@@ -176,16 +247,13 @@ def _prepare_raw_data(kwargs):
         path = kwargs.get("path", None)
         output_path = kwargs.get("output_path", None)
         data_source = DataSource.best_available_data_source()
-        for job in data_source.jobs(source="raw",
-                                    path=path,
-                                    data_path=output_path,
-                                    stateful=True):
-            data_source.write_job(data=job, path=output_path)
-        for traffic in data_source.traffics(source="raw",
-                                            path=path,
-                                            data_path=output_path,
-                                            stateful=True):
-            data_source.write_traffic(data=traffic, path=output_path)
+        for data in data_source.jobs_with_traffics(path=path,
+                                                   data_path=output_path,
+                                                   stateful=True):
+            if isinstance(data, Job):
+                data_source.write_job(data=data, path=output_path)
+            else:
+                data_source.write_traffic(data=data, path=output_path)
 
 
 def eval_options_choice():
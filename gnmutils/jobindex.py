@@ -0,0 +1,44 @@
+"""
+The :py:class:`JobIndex` keeps the time intervals of the jobs of a run in memory, so that traffic
+can be matched to its job without asking the data source for every single traffic.
+"""
+import bisect
+import operator
+
+
+class JobIndex(object):
+    """
+    The class :py:class:`JobIndex` is built from the `gpid`, `tme`, `last_tme` and `id` of all
+    jobs of a run. For every gpid, the jobs are sorted by their `tme`, so the job that has been
+    started last before a given tme is found by bisection. This is the same job that is returned
+    by :py:meth:`DataSource.job_description`.
+
+    :param intervals: iterable of tuples of gpid, tme, last_tme and id of jobs
+    """
+    def __init__(self, intervals=None):
+        self._tmes = {}
+        self._jobs = {}
+        for gpid, tme, last_tme, db_id in sorted(intervals or [], key=operator.itemgetter(0, 1)):
+            self._tmes.setdefault(gpid, []).append(tme)
+            self._jobs.setdefault(gpid, []).append((tme, last_tme or 0, db_id))
+
+    def __len__(self):
+        return sum(len(jobs) for jobs in self._jobs.values())
+
+    def find(self, gpid=None, tme=None):
+        """
+        Method returns the job of the given :py:attr:`gpid` that has been started last at or
+        before :py:attr:`tme`.
+
+        :param gpid: gpid of job
+        :param tme: tme to look for
+        :return: tuple of tme, last_tme and id of job, `None` if there is no such job
+        """
+        try:
+            tmes = self._tmes[gpid]
+        except KeyError:
+            return None
+        index = bisect.bisect_right(tmes, tme) - 1
+        if index < 0:
+            return None
+        return self._jobs[gpid][index]
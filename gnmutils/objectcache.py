@@ -2,6 +2,7 @@
 The :py:class:`ObjectCache` allows to sort values by a key and another value.
 """
 import bisect
+import functools
 import logging
 
 from gnmutils.exceptions import DataNotInCacheException
@@ -10,11 +11,158 @@ from gnmutils.exceptions import DataNotInCacheException
 class ObjectCache(object):
     """
     The class :py:class:`ObjectCache` ...
+
+    For every key, the values the data objects are sorted by are kept in a parallel list. The list
+    is updated incrementally when adding or removing data, so that lookups only need a bisection.
+    Therefore the data lists must not be modified directly but via the methods of the cache.
     """
     def __init__(self):
         self._object_cache = {}
+        self._value_cache = {}
         self.faulty_nodes = set()
         self.unfound = set()
+        self._init_checkpoint()
+
+    def _init_checkpoint(self, checkpoint=None):
+        # checkpoint the cache has been restored from or written to last
+        self._checkpoint = checkpoint
+        # keys whose data has not been read from checkpoint yet
+        self._pending = set()
+        # keys whose data might have changed since checkpoint, `None` if unknown
+        self._changed = None if checkpoint is None else set()
+
+    def __getstate__(self):
+        self._load_pending()
+        state = dict(self.__dict__)
+        for name in ("_checkpoint", "_pending", "_changed"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_checkpoint()
+        if "_value_cache" not in state:
+            # rebuild values for caches that have been archived before values were stored
+            self._value_cache = dict(
+                (key, [int(self._archived_value(data)) for data in data_array])
+                for key, data_array in self._object_cache.items()
+            )
+
+    def __contains__(self, key):
+        return key in self._object_cache or key in self._pending
+
+    def keys(self):
+        """
+        Method returns the keys data is stored for, without reading data that has not been read
+        from checkpoint yet.
+
+        :return: list of keys
+        """
+        return list(self._object_cache.keys()) + list(self._pending)
+
+    def checkpoint_entries(self, checkpoint=None):
+        """
+        Method that splits the current state of the cache into entries that can be stored
+        independently, see :py:class:`gnmutils.checkpoint.Checkpoint`. The data of every key is
+        one entry, so only keys that have been changed need to be stored again.
+
+        Data of keys that have not been accessed since the cache has been written to or restored
+        from :py:attr:`checkpoint` is given as unchanged, it is neither read nor pickled again.
+
+        :param checkpoint: checkpoint the entries are written to
+        :return: tuple of dictionary of entries and dictionary of functions that return the
+            unchanged entries
+        :rtype: tuple
+        """
+        if checkpoint is None or checkpoint is not self._checkpoint:
+            changed = None
+        else:
+            changed = self._changed
+        entries = {}
+        unchanged = {}
+        for key in self.keys():
+            if changed is not None and key not in changed:
+                unchanged[("data", key)] = functools.partial(self._entry, key)
+            else:
+                entries[("data", key)] = self._entry(key)
+        entries[("faulty_nodes",)] = self.faulty_nodes
+        entries[("unfound",)] = self.unfound
+        # the entries given define the state of the checkpoint from now on
+        self._checkpoint = checkpoint
+        self._changed = set()
+        return entries, unchanged
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint=None):
+        """
+        Method that creates a cache from a checkpoint written with the entries created by
+        :py:meth:`checkpoint_entries`. The data of a key is only read from checkpoint when the key
+        is accessed.
+
+        :param checkpoint: checkpoint to restore from
+        :type checkpoint: :py:class:`gnmutils.checkpoint.Checkpoint`
+        :return: restored cache
+        :rtype: :py:class:`ObjectCache`
+        """
+        object_cache = cls()
+        object_cache._init_checkpoint(checkpoint)
+        for key in checkpoint.keys():
+            if key[0] == "data":
+                object_cache._pending.add(key[1])
+            elif key[0] == "faulty_nodes":
+                object_cache.faulty_nodes = checkpoint.value(key)
+            elif key[0] == "unfound":
+                object_cache.unfound = checkpoint.value(key)
+        return object_cache
+
+    @classmethod
+    def from_checkpoint_entries(cls, entries):
+        """
+        Method that creates a cache from the entries created by :py:meth:`checkpoint_entries`.
+
+        :param entries: iterable of tuples of key and value of entries
+        :return: restored cache
+        :rtype: :py:class:`ObjectCache`
+        """
+        object_cache = cls()
+        for key, value in entries:
+            if key[0] == "data":
+                object_cache._object_cache[key[1]], object_cache._value_cache[key[1]] = value
+            elif key[0] == "faulty_nodes":
+                object_cache.faulty_nodes = value
+            elif key[0] == "unfound":
+                object_cache.unfound = value
+        return object_cache
+
+    def _entry(self, key):
+        self._load(key)
+        return self._object_cache[key], self._value_cache[key]
+
+    def _load(self, key):
+        if key in self._pending:
+            self._object_cache[key], self._value_cache[key] = self._checkpoint.value(("data", key))
+            self._pending.discard(key)
+
+    def _load_pending(self):
+        for key in list(self._pending):
+            self._load(key)
+
+    def _touch(self, key):
+        """
+        Method prepares the data of :py:attr:`key` to be accessed. Data that has not been read
+        from checkpoint yet is read and the key is remembered as changed.
+        """
+        if self._pending:
+            self._load(key)
+        if self._changed is not None:
+            self._changed.add(key)
+
+    @staticmethod
+    def _archived_value(data):
+        try:
+            return data.tme
+        except AttributeError:
+            return data.value.tme
 
     def add_data(self, data=None, key=None, value=None, key_function=lambda data: data.pid,
                  value_function=lambda data: data.tme):
@@ -36,13 +184,18 @@ class ObjectCache(object):
             key = key_function(data)
         if value is None:
             value = value_function(data)
+        value = int(value)
+        self._touch(key)
 
         try:
-            value_list = [int(value_function(process)) for process in self._object_cache[key]]
-            index = bisect.bisect_left(value_list, int(value))
-            self._object_cache[key].insert(index, data)
+            value_list = self._value_cache[key]
         except KeyError:
             self._object_cache[key] = [data]
+            self._value_cache[key] = [value]
+        else:
+            index = bisect.bisect_left(value_list, value)
+            value_list.insert(index, value)
+            self._object_cache[key].insert(index, data)
 
     def get_data(self, value=None, key=None, remember_error=False, validate_range=False,
                  range_end_value_function=lambda data: data.exit_tme,
@@ -56,7 +209,7 @@ class ObjectCache(object):
         :param key: key to look for
         :param remember_error: remember unmatched keys, defaults to False
         :param validate_range: bool if to check if value is in valid range given closest value
-        :param value_function: function to get the value for comparison from underlying data
+        :param value_function: function to get the value for range comparison from underlying data
         :param range_end_value_function: function to get end value for range comparison from
                 underlying data
         :return: closest data object, otherwise `None`
@@ -76,50 +229,90 @@ class ObjectCache(object):
             return self._object_cache[key][index]
         return None
 
-    def remove_data(self, data=None, key=None, key_function=lambda data: data.pid):
+    def remove_data(self, data=None, key=None, key_function=lambda data: data.pid, value=None):
         """
         Method that removes a given data object from cache. Returns `True` if the object could be
         removed otherwise `False`.
+        If the :py:attr:`value` the data object has been stored with is given, only the data
+        objects with this value are searched.
 
         :param data: data object to be removed
         :param key: key where data is stored
         :param key_function: function to get the key from underlying data
+        :param value: value the data object has been stored with
         :return: `True` if removal was successful, `False` otherwise
         :rtype: bool
         """
         if key is None:
             key = key_function(data)
+        self._touch(key)
         try:
             data_array = self._object_cache[key]
-            data_array.remove(data)
-            if len(self._object_cache[key]) == 0:
-                del self._object_cache[key]
-            return True
-        except ValueError:
-            pass
+            value_list = self._value_cache[key]
         except KeyError:
-            pass
-        return False
+            return False
+        index = None
+        if value is not None:
+            value = int(value)
+            try:
+                index = data_array.index(
+                    data,
+                    bisect.bisect_left(value_list, value),
+                    bisect.bisect_right(value_list, value)
+                )
+            except ValueError:
+                pass
+        if index is None:
+            try:
+                index = data_array.index(data)
+            except ValueError:
+                return False
+        self._delete(key, index)
+        return True
+
+    def pop_data(self, key=None):
+        """
+        Method that removes and returns the data object with the biggest value for given
+        :py:attr:`key`.
+
+        :param key: key where data is stored
+        :return: removed data object
+        :raises KeyError: if no data is stored for key
+        """
+        self._touch(key)
+        data = self._object_cache[key][-1]
+        self._delete(key, -1)
+        return data
+
+    def _delete(self, key, index):
+        data_array = self._object_cache[key]
+        del data_array[index]
+        del self._value_cache[key][index]
+        if len(data_array) == 0:
+            del self._object_cache[key]
+            del self._value_cache[key]
 
     def data_index(self, value=None, key=None, remember_error=False, validate_range=False,
                    value_function=lambda data: data.tme,
                    range_end_value_function=lambda data: data.exit_tme):
         """
         Method returns index of closest value specified by :py:attr:`key` and :py:attr:`value`.
+        The value is compared as integer to the values the data objects have been added with
+        (see :py:meth:`add_data`).
 
         :param value: value to look for
         :param key: key where data is stored
         :param remember_error: remember mismatched keys, defaults to `False`
         :param validate_range: bool if to check if value is in valid range given closest value
-        :param value_function: function to get the value for comparison from underlying data
+        :param value_function: function to get the value for range comparison from underlying data
         :param range_end_value_function: function to get end value for range comparison from
                 underlying data
         :return: closest data object
         """
+        value = int(value)
+        self._touch(key)
         try:
-            data_array = self._object_cache[key]
-            value_array = [value_function(node) for node in data_array]
-            index = bisect.bisect_right(value_array, value) - 1
+            index = bisect.bisect_right(self._value_cache[key], value) - 1
         except KeyError:
             if remember_error:
                 self.faulty_nodes.add(key)
@@ -142,12 +335,7 @@ class ObjectCache(object):
         deprecated
         :param nodeObject:
         """
-        try:
-            tmeList = [process.value.tme for process in self._object_cache[nodeObject.value.pid]]
-            index = bisect.bisect_left(tmeList, int(nodeObject.value.tme))
-            self._object_cache[nodeObject.value.pid].insert(index, nodeObject)
-        except KeyError:
-            self._object_cache[nodeObject.value.pid] = [nodeObject]
+        self.add_data(data=nodeObject, key=nodeObject.value.pid, value=nodeObject.value.tme)
 
     def getNodeObject(self, tme=None, pid=None, rememberError=False):
         """
@@ -157,11 +345,10 @@ class ObjectCache(object):
         :param rememberError:
         :return:
         """
+        self._touch(pid)
         try:
-            processArray = self._object_cache[pid]
-            tmeArray = [node.value.tme for node in processArray]
-            index = bisect.bisect_right(tmeArray, tme) - 1
-            return processArray[index]
+            index = bisect.bisect_right(self._value_cache[pid], tme) - 1
+            return self._object_cache[pid][index]
         except KeyError:
             if rememberError:
                 self.faulty_nodes.add(pid)
@@ -173,10 +360,13 @@ class ObjectCache(object):
         """
         del self._object_cache
         self._object_cache = {}
+        del self._value_cache
+        self._value_cache = {}
         del self.faulty_nodes
         self.faulty_nodes = set()
         del self.unfound
         self.unfound = set()
+        self._pending = set()
 
     @property
     def object_cache(self):
@@ -186,4 +376,44 @@ class ObjectCache(object):
         :return: object cache
         :rtype: dict
         """
+        # data might be changed without the cache noticing
+        self._load_pending()
+        self._changed = None
         return self._object_cache
+
+    @property
+    def value_cache(self):
+        """
+        Method that returns the values the data objects are sorted by for every key. The lists are
+        parallel to the lists of :py:attr:`object_cache` and must not be modified.
+
+        :return: value cache
+        :rtype: dict
+        """
+        self._load_pending()
+        return self._value_cache
+
+    def data_at(self, key=None, index=None):
+        """
+        Method returns the data object at :py:attr:`index` of :py:attr:`key`, e.g. as given by
+        :py:meth:`data_index`.
+
+        :param key: key where data is stored
+        :param int index: index of data object
+        :return: data object
+        :raises KeyError: if no data is stored for key
+        :raises IndexError: if there is no data object at index
+        """
+        self._touch(key)
+        return self._object_cache[key][index]
+
+    def data_list(self, key=None):
+        """
+        Method returns a copy of the list of data objects of :py:attr:`key`, it is empty if no
+        data is stored for key.
+
+        :param key: key where data is stored
+        :return: list of data objects
+        """
+        self._touch(key)
+        return list(self._object_cache.get(key, ()))
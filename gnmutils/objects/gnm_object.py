@@ -1,5 +1,13 @@
+import inspect
+import operator
+
 from gnmutils.exceptions import ArgumentNotDefinedException
 
+try:
+    _getargspec = inspect.getfullargspec
+except AttributeError:
+    _getargspec = inspect.getargspec
+
 
 def check_id(value=None):
     """
@@ -28,6 +36,13 @@ def check_tme(value=None):
 
 
 class GNMObject(object):
+    """
+    Base class of the objects monitored by GNM tool. As there might be millions of objects in
+    memory, the attributes are stored in slots instead of a dictionary. Subclasses should
+    therefore define the :py:attr:`__slots__` of their attributes, too.
+    """
+    __slots__ = ("pid", "ppid", "uid", "tme", "gpid")
+
     default_key_type = {
         "pid": check_id,
         "ppid": check_id,
@@ -43,6 +58,67 @@ class GNMObject(object):
         self.tme = self._convert_to_default_type("tme", tme)
         self.gpid = self._convert_to_default_type("gpid", gpid)
 
+    @classmethod
+    def from_record(cls, record=None, fields=None):
+        """
+        Method creates an object from a record, e.g. read by :py:meth:`CSVReader.records`. The
+        values of the record are given to the constructor by position, so no dictionary needs to
+        be created for every record. The mapping of fields to positions is compiled once for
+        every class and fields.
+
+        :param record: record to create object from
+        :param tuple fields: names of constructor arguments of the values of the record, defaults
+            to the fields of the header of the record (see :py:meth:`CSVReader.record_type`)
+        :return: created object
+        :raises TypeError: if a field is not an argument of the constructor
+        """
+        fields = fields or record._header_fields
+        try:
+            constructor = _record_constructors[cls, fields]
+        except KeyError:
+            constructor = cls._record_constructor(fields)
+            _record_constructors[cls, fields] = constructor
+        return constructor(record)
+
+    @classmethod
+    def _record_constructor(cls, fields):
+        arguments = _getargspec(cls.__init__)
+        names = arguments.args[1:]
+        defaults = dict(zip(names[len(names) - len(arguments.defaults or ()):],
+                            arguments.defaults or ()))
+        unknown = [field for field in fields if field not in names]
+        if unknown:
+            raise TypeError("%s got unexpected arguments %s" % (cls.__name__, unknown))
+        # arguments not given by the record are appended to it with their default values
+        padding = []
+        positions = []
+        for name in names[:max(names.index(field) for field in fields) + 1]:
+            if name in fields:
+                positions.append(fields.index(name))
+            else:
+                positions.append(len(fields) + len(padding))
+                padding.append(defaults[name])
+        padding = tuple(padding)
+        if len(positions) == 1:
+            position = positions[0]
+            return lambda record: cls(record[position])
+        getter = operator.itemgetter(*positions)
+        if padding:
+            return lambda record: cls(*getter(record + padding))
+        return lambda record: cls(*getter(record))
+
+    def __getstate__(self):
+        state = dict(getattr(self, "__dict__", {}))
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
     def getRow(self):
         """
         Returns the values that can be printed into CSV. The formatting is comma-separated.
@@ -89,3 +165,7 @@ class GNMObject(object):
 
     def __repr__(self):
         return self.getRow()
+
+
+# constructors of objects from records by class and fields
+_record_constructors = {}
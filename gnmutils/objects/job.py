@@ -1,7 +1,10 @@
 import bisect
+import collections
+import itertools
 import logging
 
 from gnmutils.objectcache import ObjectCache
+from gnmutils.objects.lazytraffic import LazyTraffic
 from gnmutils.monitoringconfiguration import MonitoringConfiguration
 from gnmutils.exceptions import NonUniqueRootException, DataNotInCacheException, \
     NoDataSourceException, FilePathException, ObjectIsRootException
@@ -27,29 +30,55 @@ class Job(object):
         self._configuration = configuration
         self._last_tme = last_tme
         self._tree = None
+        # number of nodes below root, counted while initializing the tree
+        self._vertex_count = None
         # for lazy loading of traffic
         self.data_source = kwargs.get("data_source", None)
         self.path = kwargs.get("path", None)
         self.variant = kwargs.get("variant", None)
 
+    def __getstate__(self):
+        # the data source is attached again by the parser that hands out the job, archiving it
+        # would change archived jobs whenever the state of the data source changes
+        state = self.__dict__.copy()
+        state["data_source"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
     def clear_caches(self):
         self._root = None
         self._process_cache.clear()
         self._tree_initialized = False
+        self._vertex_count = None
+
+    def prepare_traffic(self, lazy=False, max_rows=None):
+        """
+        Method attaches the traffic of the job to its processes. If :py:attr:`lazy` is set, the
+        traffic is not read but only indexed and read when it is accessed, keeping at most
+        :py:attr:`max_rows` traffic of the job in memory (see :py:class:`TrafficLoader`).
 
-    def prepare_traffic(self):
+        :param lazy: if to read traffic on demand
+        :param max_rows: maximum number of traffic kept in memory when reading on demand
+        """
         # FIXME: the correct path is sometimes not built
         # inside invalidated_exception/c01-007-102/1/112468-6-process.csv
         # inside invalidated_exception/c01-007-102/1/112468-traffic.csv
+        traffic = None
         try:
             if self.variant is not None:
-                traffic = self.data_source.read_traffic(path=self.path, name="%s-%s" % (
-                    self.db_id, self.variant))
+                name = "%s-%s" % (self.db_id, self.variant)
+            else:
+                name = self.db_id
+            if lazy:
+                traffic = self.data_source.traffic_loader(
+                    path=self.path, name=name, max_rows=max_rows)
+                self.add_lazy_traffic(traffic)
             else:
-                traffic = self.data_source.read_traffic(path=self.path, name=self.db_id)
-            for traffics in traffic:
-                for element in traffics:
-                    self.add_traffic(element)
+                traffic = self.data_source.read_traffic(path=self.path, name=name)
+                for traffics in traffic:
+                    self.add_traffics(traffics)
         except DataNotInCacheException as e:
             logging.getLogger(self.__class__.__name__).warning(
                 "Traffic object (%s) could not be appended to job: %s", traffic, e
@@ -270,12 +299,98 @@ class Job(object):
         :param traffic: traffic to be added
         """
         process_node = self._process_cache.get_data(
-            value=traffic.tme + (self._configuration.interval if self._configuration else 20),
+            value=traffic.tme + self._traffic_interval,
             key=traffic.pid,
             value_function=lambda data: data.value.tme
         )
         process_node.value.traffic.append(traffic)
 
+    def add_traffics(self, traffics=None):
+        """
+        Method to add a list of traffic to the current job. The traffic is assigned to the same
+        processes as by calling :py:meth:`add_traffic` for every traffic. But instead of searching
+        the process for every traffic, the traffic of every pid is sorted by tme and assigned in a
+        single sweep over the processes with that pid.
+
+        :param traffics: list of traffic to be added
+        :raises DataNotInCacheException: if there is no process for a traffic, the traffic in
+            front of it has already been added
+        """
+        nodes_by_index = self._traffic_nodes(
+            pids=[traffic.pid for traffic in traffics],
+            tmes=[traffic.tme for traffic in traffics])
+        for traffic, node in zip(traffics, nodes_by_index):
+            if node is None:
+                raise DataNotInCacheException(
+                    key=traffic.pid, value=traffic.tme + self._traffic_interval)
+            node.value.traffic.append(traffic)
+
+    def add_lazy_traffic(self, loader=None):
+        """
+        Method to add the traffic of a traffic file to the current job without reading it. The
+        traffic is assigned to the same processes as by :py:meth:`add_traffics`, but every process
+        is only given a :py:class:`LazyTraffic` with the rows of its traffic. The traffic is read
+        by the :py:attr:`loader` when it is accessed.
+
+        :param loader: loader of traffic file
+        :type loader: :py:class:`TrafficLoader`
+        :raises DataNotInCacheException: if there is no process for a traffic, the traffic in
+            front of it has already been added
+        """
+        index = loader.index
+        nodes_by_row = self._traffic_nodes(pids=index.pids, tmes=index.tmes)
+        rows_by_node = collections.OrderedDict()
+        missing_row = None
+        for row, node in enumerate(nodes_by_row):
+            if node is None:
+                missing_row = row
+                break
+            rows_by_node.setdefault(node, []).append(row)
+        for node, rows in rows_by_node.items():
+            process = node.value
+            process.traffic = LazyTraffic(loader=loader, rows=rows, traffic=process.traffic)
+        if missing_row is not None:
+            raise DataNotInCacheException(
+                key=index.pids[missing_row],
+                value=index.tmes[missing_row] + self._traffic_interval)
+
+    @property
+    def _traffic_interval(self):
+        return self._configuration.interval if self._configuration else 20
+
+    def _traffic_nodes(self, pids=None, tmes=None):
+        """
+        Method returns the process node for every traffic given by its pid and tme, `None` if
+        there is no process for a traffic.
+
+        :param pids: pid for every traffic
+        :param tmes: tme for every traffic
+        :return: list of process nodes
+        """
+        interval = self._traffic_interval
+        process_cache = self.process_cache
+        value_cache = self._process_cache.value_cache
+        indices_by_pid = {}
+        for index, pid in enumerate(pids):
+            indices_by_pid.setdefault(pid, []).append(index)
+        nodes_by_index = [None] * len(pids)
+        for pid, indices in indices_by_pid.items():
+            try:
+                process_tmes = value_cache[pid]
+            except KeyError:
+                continue
+            nodes = process_cache[pid]
+            indices.sort(key=tmes.__getitem__)
+            process_count = len(process_tmes)
+            position = 0
+            for index in indices:
+                value = tmes[index] + interval
+                while position < process_count and process_tmes[position] <= value:
+                    position += 1
+                # same as bisecting to the right, so the last process is taken before the first
+                nodes_by_index[index] = nodes[position - 1]
+        return nodes_by_index
+
     def is_valid(self):
         """
         Method that checks if the current job is valid. Therefore it validates that only for one
@@ -342,75 +457,51 @@ class Job(object):
         Method that returns processes in order depending on tme and their pid. This is especially
         useful when replaying a file as a stream.
 
+        Processes are grouped by their tme, the groups are ordered by :py:meth:`_create_order`
+        starting from the last pid of the previous group.
+
         :return: process generator of the job
         """
         tree = self.tree
         # create the actual array
         processes = [node.value for node, _ in tree.walkDFS()]
-        processes_in_order = []
         processes.sort(key=lambda x: x.tme)
-        current_tme = processes[0].tme
-        current_processes = []
         current_pid = processes[0].gpid - 1  # to also include first pid in correct order
-        current_pid_tme = processes[0].tme
-        current_pid_exit_tme = processes[0].exit_tme
         _create_order = self._create_order
-        while processes:
-            if processes[0].tme == current_tme:
-                current_processes.append(processes.pop(0))
-            else:
-                # do sorting
-                ordered = _create_order(current_processes, current_pid, current_pid_tme, current_pid_exit_tme)
-                # reset values
-                current_tme = processes[0].tme
-                current_pid = ordered[-1].pid
-                current_pid_tme = ordered[-1].tme
-                current_pid_exit_tme = ordered[-1].exit_tme
-                processes_in_order.extend(ordered)
-                current_processes = []
-        if current_processes:
-            ordered = _create_order(current_processes, current_pid, current_pid_tme, current_pid_exit_tme)
-            processes_in_order.extend(ordered)
-        for process in processes_in_order:
-            yield process
-
-    def _create_order(self, elements, start_pid, start_pid_tme, start_pid_exit_tme):
-        elements_in_order = []
+        for _, current_processes in itertools.groupby(processes, key=lambda x: x.tme):
+            ordered = _create_order(list(current_processes), current_pid)
+            current_pid = ordered[-1].pid
+            for process in ordered:
+                yield process
+
+    @staticmethod
+    def _create_order(elements, start_pid):
+        """
+        Method orders processes that have been started at the same tme. Processes are sorted by
+        pid, beginning with the first pid after :py:attr:`start_pid` and continuing with the
+        smaller pids afterwards to account for wrapped pids. Processes whose parent is part of
+        the elements and would only follow afterwards are moved to the back, keeping their order.
+
+        :param elements: processes with same tme
+        :param start_pid: last pid that has been used before
+        :return: ordered list of processes
+        """
+        if len(elements) == 1:
+            return elements
         elements.sort(key=lambda x: x.pid)
-        # check if the tmes from start_pid are close, than we can directly consider start_pid
-        base_tme = elements[0].tme
-        if base_tme - start_pid_tme > 100:
-            ppid_list = [element.ppid for element in elements]
-            try:
-                candidate_generator = (element for element in elements if element.pid in ppid_list)
-                candidate = next(candidate_generator)
-                while candidate.pid in ppid_list:
-                    candidate = next(candidate_generator)
-            except StopIteration:
-                candidate = None
-            if candidate is not None:
-                # check if there is something on the left to be taken...
-                # TODO: when it needs to go on from the back, I do have a problem so far...
-                possible_start_elements = [element.pid for element in elements if element.pid < candidate.pid]
-                last_valid = candidate.pid
-                possible_element = possible_start_elements.pop()
-                while last_valid - possible_element < 50 and len(possible_start_elements) > 0:
-                    last_valid = possible_element
-                    possible_element = possible_start_elements.pop()
-                start_pid = last_valid - 1
-
-        bigger = [process for process in elements if process.pid > start_pid]
-        elements_in_order.extend(bigger)
-        smaller = [process for process in elements if process.pid <= start_pid]
-        elements_in_order.extend(smaller)
+        elements_in_order = [process for process in elements if process.pid > start_pid]
+        elements_in_order.extend(process for process in elements if process.pid <= start_pid)
         # as long as there are items that depend on others in the back, put them to the back of the list
-        pid_list = [element.pid for element in elements_in_order]
-        for index, element in enumerate(elements_in_order[:]):
-            if element.ppid in pid_list[index + 1:]:
-                # move element to back
-                elements_in_order.remove(element)
-                elements_in_order.append(element)
-        return elements_in_order
+        last_index = dict((element.pid, index) for index, element in enumerate(elements_in_order))
+        in_front = []
+        in_back = []
+        for index, element in enumerate(elements_in_order):
+            if last_index.get(element.ppid, -1) > index:
+                in_back.append(element)
+            else:
+                in_front.append(element)
+        in_front.extend(in_back)
+        return in_front
 
     def process_count(self):
         """
@@ -418,11 +509,7 @@ class Job(object):
 
         :return: process count
         """
-        count = 0
-        process_cache = self.process_cache
-        for pid in process_cache:
-            count += len(process_cache[pid])
-        return count
+        return sum(len(nodes) for nodes in self.process_cache.values())
 
     @staticmethod
     def default_header(**kwargs):
@@ -462,7 +549,7 @@ class Job(object):
             self._tree_initialized = True
             if self._tree is None:
                 if (len(self._process_cache.faulty_nodes) <= 1 and self._root and
-                       (Tree(self._root).getVertexCount() == self.process_count())):
+                        self._vertex_count == self.process_count()):
                     self._tree = Tree(self._root)
             logging.getLogger(self.__class__.__name__).info(
                 "faulty nodes: %s", self._process_cache.faulty_nodes
@@ -485,43 +572,66 @@ class Job(object):
     #     return tme_index
 
     def _initialize_tree(self):
+        """
+        Method links every process to its parent in a single pass. The tmes of the process cache
+        are already sorted per pid, so they are used as index to find the parent by bisection. The
+        parent is the last process with matching pid that has been started before the process and
+        has not exited before.
+
+        While linking, the number of nodes below the root is counted, so that the completeness of
+        the tree can be checked without walking the tree. The count stays `None` if the tree
+        cannot be generated.
+        """
         logging.getLogger(self.__class__.__name__).info("Initializing tree structure")
+        self._vertex_count = None
         # rebind to local variables for faster lookup
         process_cache = self.process_cache  # object cache
+        value_cache = self._process_cache.value_cache
         _process_cache = self._process_cache
-        self_process_cache_get_data = self._process_cache.get_data
-        # sort the keys first to get the correct ordering in the final tree
-        for pid in process_cache.keys():
-            for node in process_cache[pid][:]:
+        faulty_nodes = _process_cache.faulty_nodes
+        root = self._root
+        linked = 0
+        root_linked = False
+        for pid, nodes in list(process_cache.items()):
+            for node in nodes[:]:
+                process = node.value
+                tme = process.tme
+                ppid = process.ppid
                 try:
-                    parent = self_process_cache_get_data(
-                        value=node.value.tme,
-                        key=node.value.ppid,
-                        remember_error=True,
-                        value_function=lambda data: data.value.tme,
-                        range_end_value_function=lambda data: data.value.exit_tme,
-                        validate_range=True)
-                except DataNotInCacheException:
+                    parent_tmes = value_cache[ppid]
+                except KeyError:
+                    parent = None
+                else:
+                    parent = process_cache[ppid][bisect.bisect_right(parent_tmes, tme) - 1]
+                    if tme < parent.value.tme or tme > parent.value.exit_tme:
+                        parent = None
+                if parent is None:
+                    faulty_nodes.add(ppid)
+                    logging.getLogger(self.__class__.__name__).info("error for %s (%d)", ppid, tme)
                     # TODO: maybe also check for exit tme
-                    if self._root is not None and \
-                            (node.value.tme < self._root.value.tme or
-                                node.value.exit_tme > self._root.value.exit_tme):
+                    if root is not None and \
+                            (tme < root.value.tme or process.exit_tme > root.value.exit_tme):
                         # skip it manually
                         # it is valid here to remove the nodes...
-                        _process_cache.remove_data(node, node.value.pid, node.value.tme)
-                        _process_cache.faulty_nodes.remove(node.value.ppid)
+                        _process_cache.remove_data(data=node, key=pid, value=tme)
+                        faulty_nodes.remove(ppid)
+                        # children that have already been linked cannot be reached from root
+                        linked -= len(node.children)
                     else:
-                        if node is self._root:
+                        if node is root:
                             continue
                         logging.getLogger(self.__class__.__name__).warning("Skipping tree generation")
                         return
                 else:
-                    if parent:
-                        #parent.add(node, orderPosition=self._add_function)
-                        parent.add(node)
+                    parent.add(node)
+                    linked += 1
+                    if node is root:
+                        root_linked = True
         logging.getLogger(self.__class__.__name__).info(
             "no parents found for %d nodes", len(self._process_cache.faulty_nodes)
         )
+        if root is not None and not root_linked:
+            self._vertex_count = linked + 1
 
     def __repr__(self):
         return "%s: db_id (%s), job_id (%s), gpid (%d), workernode (%s), configuration (%s), " \
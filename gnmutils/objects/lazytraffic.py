@@ -0,0 +1,131 @@
+"""
+Module implements traffic that is only read from the `<id>-traffic.csv` of a job when it is
+accessed. Instead of keeping the traffic of all processes of a job in memory, every
+:py:class:`Process` is given a :py:class:`LazyTraffic` that knows the rows of its traffic in the
+file. The rows are read by a :py:class:`TrafficLoader` that is shared by all processes of a job
+and keeps only a limited number of rows in memory.
+"""
+import collections
+import itertools
+
+from gnmutils.objects.traffic import Traffic
+from gnmutils.reader.csvindex import CSVIndex
+
+
+class TrafficLoader(object):
+    """
+    The :py:class:`TrafficLoader` reads the traffic of :py:class:`LazyTraffic`s from a single
+    file. The traffic that has been read is cached for the views that have been accessed last.
+    If the cache holds more than :py:attr:`max_rows` traffic, the traffic of the least recently
+    accessed views is dropped and read again when it is accessed next.
+
+    :param str path: path of traffic file
+    :param int max_rows: maximum number of traffic kept in memory
+    """
+    default_max_rows = 100000
+
+    def __init__(self, path=None, max_rows=None):
+        self.path = path
+        self.max_rows = max_rows if max_rows is not None else self.default_max_rows
+        self._index = None
+        self._cache = collections.OrderedDict()
+        self._cached_rows = 0
+
+    def __getstate__(self):
+        # cached traffic can be read again
+        return self.path, self.max_rows, self._index
+
+    def __setstate__(self, state):
+        self.path, self.max_rows, self._index = state
+        self._cache = collections.OrderedDict()
+        self._cached_rows = 0
+
+    @property
+    def index(self):
+        """
+        Method returns the index of the traffic file. It is loaded from the sidecar of the file
+        on first access, files without sidecar are indexed.
+
+        :return: index of traffic file
+        :rtype: :py:class:`CSVIndex`
+        """
+        if self._index is None:
+            self._index = CSVIndex.for_file(path=self.path)
+        return self._index
+
+    @property
+    def cached_rows(self):
+        """
+        Method returns the number of traffic that is currently kept in memory.
+
+        :return: number of cached traffic
+        :rtype: int
+        """
+        return self._cached_rows
+
+    def load(self, view=None):
+        """
+        Method returns the traffic of the given view, either from cache or from file.
+
+        :param view: view to load traffic for
+        :type view: :py:class:`LazyTraffic`
+        :return: list of traffic
+        """
+        try:
+            traffics = self._cache.pop(view)
+        except KeyError:
+            traffics = [Traffic(**data) for data in self.index.read(rows=view.rows)]
+            self._cached_rows += len(traffics)
+        # views are kept in order of their last access
+        self._cache[view] = traffics
+        while self._cached_rows > self.max_rows and len(self._cache) > 1:
+            _, dropped = self._cache.popitem(last=False)
+            self._cached_rows -= len(dropped)
+        return traffics
+
+    def clear_caches(self):
+        """
+        Method drops all cached traffic.
+        """
+        self._cache.clear()
+        self._cached_rows = 0
+
+
+class LazyTraffic(object):
+    """
+    The :py:class:`LazyTraffic` is a list-like view on the traffic of a single process. It only
+    knows the numbers of its rows inside the traffic file, the traffic itself is given by its
+    :py:class:`TrafficLoader` when the view is iterated or indexed. Traffic that is appended to
+    the view is kept in memory and given after the traffic from file.
+
+    :param loader: loader to read traffic from
+    :type loader: :py:class:`TrafficLoader`
+    :param rows: numbers of rows of the traffic in file
+    :param list traffic: traffic that is already in memory
+    """
+    def __init__(self, loader=None, rows=None, traffic=None):
+        self.loader = loader
+        self.rows = rows if rows is not None else []
+        self._added = list(traffic) if traffic else []
+
+    def __len__(self):
+        return len(self.rows) + len(self._added)
+
+    def __iter__(self):
+        if not self.rows:
+            return iter(self._added)
+        return itertools.chain(self.loader.load(self), self._added)
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def __repr__(self):
+        return "%s(%d rows of %s)" % (self.__class__.__name__, len(self), self.loader.path)
+
+    def append(self, traffic=None):
+        """
+        Method appends traffic to the view.
+
+        :param traffic: traffic to be appended
+        """
+        self._added.append(traffic)
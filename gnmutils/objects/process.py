@@ -16,6 +16,10 @@ class Process(GNMObject):
     Associated processes can be read into a single :py:class:`Job`. Then their hierarchy becomes
     directly visible.
     """
+    __slots__ = ("name", "cmd", "exit_tme", "state", "_valid", "_traffic", "error_code", "signal",
+                 "job_id", "tree_depth", "process_type", "color", "int_in_volume",
+                 "int_out_volume", "ext_in_volume", "ext_out_volume")
+
     default_key_type = {
         'name': stringutils.xstr,
         'cmd': stringutils.xstr,
@@ -57,7 +61,8 @@ class Process(GNMObject):
         self.state = _convert_to_default_type("state", state)
 
         self._valid = valid
-        self._traffic = traffic or []
+        # list of traffic is only created when traffic is attached
+        self._traffic = traffic or None
 
         self.error_code = _convert_to_default_type("error_code", error_code)
         self.signal = _convert_to_default_type("signal", signal)
@@ -80,6 +85,25 @@ class Process(GNMObject):
             kwargs["exit_tme"] = kwargs.pop("tme")
         return cls(**kwargs)
 
+    @classmethod
+    def from_process_record(cls, record=None):
+        """
+        Method creates a process from the record of a process event like
+        :py:meth:`from_process_event` (see :py:meth:`GNMObject.from_record`).
+
+        :param record: record of process event
+        :return: created process
+        """
+        if "exit" in record.state:
+            try:
+                fields = _exit_fields[record._header_fields]
+            except KeyError:
+                fields = tuple("exit_tme" if field == "tme" else field
+                               for field in record._header_fields)
+                _exit_fields[record._header_fields] = fields
+            return cls.from_record(record, fields=fields)
+        return cls.from_record(record)
+
     @staticmethod
     def from_dict(row):
         """
@@ -107,8 +131,19 @@ class Process(GNMObject):
         :return: the attached traffic
         :rtype: list
         """
+        if self._traffic is None:
+            self._traffic = []
         return self._traffic
 
+    @traffic.setter
+    def traffic(self, value=None):
+        """
+        Method to replace the associated traffic, e.g. by a :py:class:`LazyTraffic`.
+
+        :param value: list-like traffic to be attached
+        """
+        self._traffic = value or None
+
     @property
     def batchsystemId(self):
         """
@@ -165,17 +200,21 @@ class Process(GNMObject):
                "signal,valid,int_in_volume,int_out_volume,ext_in_volume,"\
                "ext_out_volume,tree_depth,process_type,color,state"
 
-    def toProcessEvent(self):
+    def toProcessEvent(self, state=None):
         """
         Method converts the process into a process event. Depending on the current state, it is
-        either a start or finishing event.
+        either a start or finishing event. By giving a :py:attr:`state`, the start event of a
+        finished process can be created as well.
 
+        :param state: state of event, defaults to the current state
         :return: process event dict
         :rtype: dict
         """
+        if state is None:
+            state = self.state
         event_dict = {"name": self.name, "cmd": self.cmd, "pid": self.pid, "ppid": self.ppid,
-                      "uid": self.uid, "gpid": self.gpid, "state": self.state}
-        if "exit" in self.state:
+                      "uid": self.uid, "gpid": self.gpid, "state": state}
+        if "exit" in state:
             event_dict["tme"] = self.exit_tme
             event_dict["exit_code"] = self.exit_code
         else:
@@ -248,3 +287,7 @@ class Process(GNMObject):
                 stringutils.xint(self.error_code), self.signal, self.job_id, self.tree_depth,
                 self.process_type, self.color, self.int_in_volume, self.int_out_volume,
                 self.ext_in_volume, self.ext_out_volume)
+
+
+# fields of records of exit events by fields of records
+_exit_fields = {}
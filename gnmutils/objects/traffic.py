@@ -9,10 +9,104 @@ from gnmutils.exceptions import ArgumentNotDefinedException, TrafficMismatchExce
 from gnmutils.utility import strings as stringutils
 
 
+class ConnectionClassifier(object):
+    """
+    The :py:class:`ConnectionClassifier` parses the connections monitored by the GNM tool, e.g.
+    `10.1.7.102:32983-10.97.4.129:3128`, into their source and destination and categorises the
+    destination as internal (`int`) or external (`ext`). As the same connections are seen for
+    every monitoring interval, the results are kept for up to :py:attr:`max_connections`
+    connections. The internal IP of workernodes is kept as well.
+
+    :param int max_connections: maximum number of connections to keep
+    """
+    internal_pattern = re.compile(
+        r"^(?:10\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}|192\.108\.[0-9]{1,3}\.[0-9]{1,3})")
+
+    def __init__(self, max_connections=100000):
+        self.max_connections = max_connections
+        self._internal_ips = {}
+        self._connections = {}
+
+    def internal_ip(self, workernode=None):
+        """
+        Method returns the internal IP of the given workernode, e.g. `10.1.7.102` for
+        `c01-007-102`.
+
+        :param str workernode: name of workernode
+        :return: internal IP
+        """
+        try:
+            return self._internal_ips[workernode]
+        except KeyError:
+            internal_ip = "10.1." + ".".join(map(str, map(int, workernode.split("-")[1:])))
+            self._internal_ips[workernode] = internal_ip
+            return internal_ip
+
+    def category(self, ip=None):
+        """
+        Method returns the connection category of the given destination IP.
+
+        :param str ip: destination IP
+        :return: `int` for internal, `ext` for external IPs
+        """
+        if self.internal_pattern.match(ip):
+            return "int"
+        return "ext"
+
+    def parse(self, conn=None, workernode=None):
+        """
+        Method parses the given connection. If a :py:attr:`workernode` is given, the source of
+        the connection is the workernode, so source and destination are exchanged if the
+        destination is the workernode.
+
+        :param str conn: the connection to parse
+        :param str workernode: the workernode the connection has been monitored on
+        :return: tuple of source ip, source port, destination ip, destination port, connection
+            category and if source and destination have been exchanged
+        :raises TrafficMismatchException: if the connection does not belong to the workernode
+        """
+        try:
+            return self._connections[conn, workernode]
+        except KeyError:
+            pass
+        splitted_connection = conn.split("-")
+        splitted_source = splitted_connection[0].split(":")
+        splitted_target = splitted_connection[1].split(":")
+        exchanged = False
+        if workernode:
+            internal_ip = self.internal_ip(workernode=workernode)
+            if internal_ip in splitted_source[0]:
+                # everything is fine
+                pass
+            elif internal_ip in splitted_target[0]:
+                splitted_source, splitted_target = splitted_target, splitted_source
+                exchanged = True
+            else:
+                logging.getLogger(self.__class__.__name__).warning(
+                    "Calculated internal IP (%s) does not match anything (%s and %s)",
+                    internal_ip, splitted_source, splitted_target
+                )
+                raise TrafficMismatchException(conn=conn, workernode=workernode)
+        dest_ip = stringutils.xstr(splitted_target[0])
+        connection = (stringutils.xstr(splitted_source[0]), stringutils.xint(splitted_source[1]),
+                      dest_ip, stringutils.xint(splitted_target[1]), self.category(ip=dest_ip),
+                      exchanged)
+        if len(self._connections) >= self.max_connections:
+            self._connections.clear()
+        self._connections[conn, workernode] = connection
+        return connection
+
+
 class Traffic(GNMObject):
     """
     Implementation of a traffic entry that is monitored from GNM tool.
     """
+    __slots__ = ("source_ip", "dest_ip", "source_port", "dest_port", "conn_cat", "in_rate",
+                 "out_rate", "in_cnt", "out_cnt", "interval")
+
+    # shared by all traffic to classify connections
+    classifier = ConnectionClassifier()
+
     default_key_type = {
         'pid': check_id,
         'ppid': check_id,
@@ -115,50 +209,16 @@ class Traffic(GNMObject):
         :param str conn: the connection to set
         :param str workernode: the workernode to set
         """
-        splitted_connection = conn.split("-")
-        splitted_source = splitted_connection[0].split(":")
-        splitted_target = splitted_connection[1].split(":")
-        if workernode:
-            last_ip_part = ".".join(map(str, map(int, workernode.split("-")[1:])))
-            internal_ip = "10.1." + last_ip_part
-            if internal_ip in splitted_source[0]:
-                # everything is fine
-                pass
-            elif internal_ip in splitted_target[0]:
-                # splitted values need to be exchanged
-                logging.getLogger(self.__class__.__name__).info(
-                    "exchanging traffic values for %s and %s", splitted_source, splitted_target
-                )
-                tmp = splitted_source
-                splitted_source = splitted_target
-                splitted_target = tmp
-
-                tmp_rate = self.in_rate
-                self.in_rate = self.out_rate
-                self.out_rate = tmp_rate
-
-                tmp_cnt = self.in_cnt
-                self.in_cnt = self.out_cnt
-                self.out_cnt = tmp_cnt
-            else:
-                logging.getLogger(self.__class__.__name__).warning(
-                    "Calculated internal IP (%s) does not match anything (%s and %s)",
-                    internal_ip, splitted_source, splitted_target
-                )
-                raise TrafficMismatchException(conn=conn, workernode=workernode)
-
-        self.source_ip = self._convert_to_default_type("source_ip", splitted_source[0])
-        self.source_port = self._convert_to_default_type("source_port", splitted_source[1])
-        self.dest_ip = self._convert_to_default_type("dest_ip", splitted_target[0])
-        self.dest_port = self._convert_to_default_type("dest_port", splitted_target[1])
-
-        if ((re.match("^10\.([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})", self.dest_ip)) or
-                (re.match("^192\.108\.([0-9]{1,3})\.([0-9]{1,3})", self.dest_ip))):
-            # internal interface
-            self.conn_cat = self._convert_to_default_type("conn_cat", "int")
-        else:
-            # external interface
-            self.conn_cat = self._convert_to_default_type("conn_cat", "ext")
+        (self.source_ip, self.source_port, self.dest_ip, self.dest_port, self.conn_cat,
+         exchanged) = self.classifier.parse(conn=conn, workernode=workernode)
+        if exchanged:
+            # values need to be exchanged
+            logging.getLogger(self.__class__.__name__).info(
+                "exchanging traffic values for %s:%s and %s:%s", self.dest_ip, self.dest_port,
+                self.source_ip, self.source_port
+            )
+            self.in_rate, self.out_rate = self.out_rate, self.in_rate
+            self.in_cnt, self.out_cnt = self.out_cnt, self.in_cnt
 
     def getRow(self):
         return ("%d,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s"
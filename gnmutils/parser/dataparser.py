@@ -17,6 +17,9 @@ class DataParser(object):
     * splitting of payloads
     * etc.
     """
+    # number of rows that are parsed at once, `None` parses row by row
+    default_batch_size = None
+
     def __init__(self, data_source=None, data_reader=None, path=None, **kwargs):
         self.data_source = data_source
         self.data_reader = data_reader
@@ -24,6 +27,7 @@ class DataParser(object):
         self._data = None
         self.configuration = None
         self._parsed_data = set()
+        self._parsed_offsets = {}
         if path and kwargs.get("name", None) is None:
             self.load_archive_state(path=path)
 
@@ -50,6 +54,10 @@ class DataParser(object):
                 pattern="parsed_data.pkl",
                 path=path
             ), set())
+            self._parsed_offsets = next(self.data_source.object_data(
+                pattern="parsed_offsets.pkl",
+                path=path
+            ), {})
             self._changed = False
 
     def data_id(self, value):
@@ -72,6 +80,28 @@ class DataParser(object):
         """
         return self._parsed_data
 
+    @property
+    def parsed_offsets(self):
+        """
+        Method that returns the positions up to which files have been parsed that have not been
+        parsed completely. Positions are given as tuple of byte offset, line number, header and
+        last tme, so that the :py:class:`DataReader` can resume at the given offset.
+
+        :return: dictionary of paths and positions
+        :rtype: dict
+        """
+        return self._parsed_offsets
+
+    @property
+    def data_readers(self):
+        """
+        Method that returns the :py:class:`DataReader`s the parser reads its data with.
+
+        :return: list of data readers
+        :rtype: list
+        """
+        return [self.data_reader]
+
     @property
     def data(self):
         """
@@ -108,7 +138,7 @@ class DataParser(object):
         """
         Method that archives the current state of the :py:class:`DataParser`. It includes the
         current :py:attr:`data` that was read, the :py:attr:`configuration` as well as already
-        :py:attr:`parsed_data`.
+        :py:attr:`parsed_data` and :py:attr:`parsed_offsets`.
 
         :param kwargs: additional attributes
         """
@@ -131,6 +161,12 @@ class DataParser(object):
                 path=path,
                 **kwargs
             )
+            self.data_source.write_object_data(
+                data=self._parsed_offsets,
+                name="parsed_offsets",
+                path=path,
+                **kwargs
+            )
         else:
             logging.getLogger(self.__class__.__name__).warning(
                 "Archiving not done because of missing data_source"
@@ -141,15 +177,33 @@ class DataParser(object):
         This method instantiates the parsing for file given by :py:param:`path` on specified
         :py:class:`DataReader`. It acts as a generator and yields all finished objects.
 
-        :param path:
-        :return:
+        If :py:attr:`batch_size` is given, the rows are read in batches of records by the
+        :py:class:`DataReader` and handed to :py:meth:`add_pieces`. If :py:attr:`records` is
+        given, the rows are read as records and converted by :py:meth:`_piece_from_record`.
+        Otherwise rows are read as dictionaries and converted by :py:meth:`_piece_from_dict`.
+
+        :param path: path to parse
+        :param batch_size: number of rows to parse at once, defaults to
+            :py:attr:`default_batch_size`
+        :param records: read rows as records instead of dictionaries, defaults to `False`
+        :return: generator of finished objects
         """
+        batch_size = kwargs.get("batch_size", self.default_batch_size)
+        if batch_size:
+            for data in self._parse_batches(path=path, batch_size=batch_size):
+                yield data
+            return
         # rebind to local variables for faster lookup
-        _piece_from_dict = self._piece_from_dict
+        if kwargs.get("records", False):
+            rows = self.data_reader.records(path=path)
+            piece_from_row = self._piece_from_record
+        else:
+            rows = self.data_reader.data(path=path)
+            piece_from_row = self._piece_from_dict
         add_piece = self.add_piece
-        for data_dict in self.data_reader.data(path=path):
-            if data_dict is not None:
-                piece = _piece_from_dict(data_dict)
+        for row in rows:
+            if row is not None:
+                piece = piece_from_row(row)
                 data = add_piece(piece=piece)  # FIXME: add_piece returns nothing in many parsers
                 if data is not None:
                     yield data
@@ -157,6 +211,30 @@ class DataParser(object):
             if new_data is not None:
                 yield new_data
 
+    def _parse_batches(self, path, batch_size):
+        add_pieces = self.add_pieces
+        for batch in self.data_reader.batches(path=path, size=batch_size):
+            for data in add_pieces(batch=batch):
+                if data is not None:
+                    yield data
+        for new_data in self._parsing_finished():
+            if new_data is not None:
+                yield new_data
+
+    def add_pieces(self, batch=None):
+        """
+        This method adds a batch of records to the current data object managed by the Parser.
+        All records of a batch share the same fields.
+
+        :param batch: list of records to be added
+        :raises ParserNotInitializedException: if the data object has not been initialized with
+        specific type
+        :return: list of finished objects
+        """
+        if self._data is None:
+            raise ParserNotInitializedException
+        return self._add_pieces(batch)
+
     def add_piece(self, piece=None):
         """
         This method adds partial data to the current data object managed by the Parser.
@@ -173,9 +251,37 @@ class DataParser(object):
     def _piece_from_dict(self, piece=None):
         raise NotImplementedError
 
+    def _piece_from_record(self, record=None):
+        """
+        Method converts a record read by :py:meth:`CSVReader.records` into a piece. By default the
+        record is converted to a dictionary and handed to :py:meth:`_piece_from_dict`.
+
+        :param record: record to convert
+        :return: piece to be added
+        """
+        return self._piece_from_dict(dict(zip(record._header_fields, record)))
+
     def _add_piece(self, piece=None):
         node = Node(value=piece)
         self._data.add_node_object(node)
 
+    def _add_pieces(self, batch=None):
+        """
+        Method that adds a batch of records. By default every record is converted by
+        :py:meth:`_piece_from_record` and added by :py:meth:`_add_piece`. Parsers might overwrite
+        this method to construct and add the pieces in bulk.
+
+        :param batch: list of records to be added
+        :return: list of finished objects
+        """
+        _piece_from_record = self._piece_from_record
+        _add_piece = self._add_piece
+        result = []
+        for record in batch:
+            data = _add_piece(_piece_from_record(record))
+            if data is not None:
+                result.append(data)
+        return result
+
     def _parsing_finished(self):
         yield None
@@ -5,6 +5,7 @@ from gnmutils.parser.dataparser import DataParser
 from gnmutils.objects.process import Process
 from gnmutils.objects.job import Job
 from gnmutils.utils import path_components
+from gnmutils.utility.tree import Node
 
 
 class JobParser(DataParser):
@@ -13,6 +14,8 @@ class JobParser(DataParser):
     :py:class:`gnmutils.objects.process.Process` es as well as
     :py:class:`gnmutils.objects.traffic.Traffic` into a single :py:class:`gnmutils.objects.job.Job`.
     """
+    default_batch_size = 1000
+
     def __init__(self, data_source=None, data_reader=None, **kwargs):
         DataParser.__init__(self, data_source, data_reader, **kwargs)
         try:
@@ -55,6 +58,13 @@ class JobParser(DataParser):
     def _piece_from_dict(self, data_dict=None):
         return Process(**data_dict)
 
+    def _add_pieces(self, batch=None):
+        fields = batch[0]._header_fields
+        add_node_object = self._data.add_node_object
+        for node in [Node(value=Process(**dict(zip(fields, record)))) for record in batch]:
+            add_node_object(node)
+        return []
+
     def _parsing_finished(self):
         if self._data.is_valid() and self._data.is_complete():
             yield self._data
@@ -0,0 +1,170 @@
+"""
+This module implements a :py:class:`DataParser` that splits the process and traffic stream of the
+GNM tool into jobs and their traffic in a single pass.
+"""
+import heapq
+import logging
+import os
+
+from gnmutils.parser.dataparser import DataParser
+from gnmutils.parser.processstreamparser import ProcessStreamParser
+from gnmutils.parser.trafficstreamparser import TrafficStreamParser
+from gnmutils.reader.csvreader import CSVReader
+from gnmutils.objects.traffic import Traffic
+
+
+class JobTrafficStreamParser(DataParser):
+    """
+    The :py:class:`JobTrafficStreamParser` combines a :py:class:`ProcessStreamParser` and a
+    :py:class:`TrafficStreamParser`. Instead of reading the process and traffic logs of a run one
+    after the other, both logs are merged by their `tme`. The traffic is matched against the jobs
+    that are currently assembled from the process stream, so no further lookup of jobs from the
+    data source is needed.
+
+    Parsing is started with the path of a process log, the matching traffic log is derived from
+    its name (see :py:meth:`parse`). Finished :py:class:`Job`s are given out as soon as they are complete, their traffic
+    follows after the monitoring interval has passed. Traffic is given in the format that is
+    expected by :py:meth:`FileDataSource.write_traffic`. As the id of the traffic is only
+    taken from the job when the traffic is given out, jobs can be written in between, e.g. to
+    assign their id from database.
+    """
+    process_pattern = "-process.log-"
+    traffic_pattern = "-traffic.log-"
+
+    def __init__(self, data_source=None, data_reader=None, workernode=None, run=None, path=None,
+                 **kwargs):
+        DataParser.__init__(self, data_source, data_reader, **kwargs)
+        process_reader = CSVReader()
+        self.process_parser = ProcessStreamParser(
+            workernode=workernode,
+            run=run,
+            data_source=data_source,
+            path=path,
+            data_reader=process_reader
+        )
+        process_reader.parser = self.process_parser
+        traffic_reader = CSVReader()
+        self.traffic_parser = TrafficStreamParser(
+            workernode=workernode,
+            run=run,
+            data_source=data_source,
+            path=path,
+            data_path=kwargs.get("data_path", None),
+            data_reader=traffic_reader
+        )
+        traffic_reader.parser = self.traffic_parser
+        self.traffic_parser.job_cache = self.process_parser.data
+        self._data = self.process_parser.data
+        self.workernode = workernode
+        self.run = run
+
+    @property
+    def data_readers(self):
+        return self.process_parser.data_readers + self.traffic_parser.data_readers
+
+    def load_archive_state(self, path=None):
+        pass
+
+    def archive_state(self, **kwargs):
+        self.process_parser.archive_state(**kwargs)
+        self.traffic_parser.archive_state(**kwargs)
+
+    def data_id(self, value):
+        pass
+
+    def check_caches(self, **kwargs):
+        self.process_parser.check_caches(**kwargs)
+        self.traffic_parser.check_caches(**kwargs)
+
+    def clear_caches(self):
+        self.process_parser.clear_caches()
+        self.traffic_parser.clear_caches()
+
+    def pop_data(self):
+        for job in self.process_parser.pop_data():
+            self.traffic_parser.finish_job(job=job)
+            yield job
+        for traffic in self.traffic_parser.pop_data():
+            if traffic["data"]:
+                yield traffic
+
+    def parse(self, path, **kwargs):
+        """
+        This method instantiates the parsing of the process log given by :py:attr:`path` and its
+        corresponding traffic log. It acts as a generator and yields finished jobs as well as
+        their traffic.
+
+        Traffic logs can be given as well. As both logs are read from the position they have been
+        read to before, a traffic log whose process log has already been parsed is only read
+        where it has grown since. Traffic logs without process log are read on their own, their
+        traffic can only be matched to jobs that are currently known.
+
+        :param path: path of process or traffic log to parse
+        :return: generator of finished jobs and traffic
+        """
+        if self.traffic_pattern in path:
+            traffic_path = path
+            process_path = path.replace(self.traffic_pattern, self.process_pattern)
+        else:
+            process_path = path
+            traffic_path = path.replace(self.process_pattern, self.traffic_pattern)
+        streams = []
+        if os.path.isfile(process_path):
+            streams.append(self._stream(
+                self.process_parser.data_reader.records(path=process_path), 0,
+                self.process_parser.parsed_offsets, process_path))
+        elif traffic_path not in self.traffic_parser.parsed_data:
+            logging.getLogger(self.__class__.__name__).warning(
+                "there is no process log for %s, only traffic of known jobs is matched",
+                traffic_path)
+        if traffic_path != process_path and os.path.isfile(traffic_path):
+            streams.append(self._stream(
+                self.traffic_parser.data_reader.records(path=traffic_path), 1,
+                self.traffic_parser.parsed_offsets, traffic_path))
+
+        add_process = self.process_parser.add_piece
+        add_traffic = self.traffic_parser.add_piece
+        finish_job = self.traffic_parser.finish_job
+        process_offsets = self.process_parser.parsed_offsets
+        traffic_offsets = self.traffic_parser.parsed_offsets
+        for _, kind, _, row, position in heapq.merge(*streams):
+            # the reader of the other stream has already read ahead, so the position of a stream
+            # is only taken over when its row is parsed
+            if kind == 0:
+                process_offsets[process_path] = position
+                job = add_process(piece=row)
+                if job is not None:
+                    finish_job(job=job)
+                    yield job
+            else:
+                traffic_offsets[traffic_path] = position
+                traffic = add_traffic(piece=Traffic.from_record(row))
+                if traffic is not None and traffic["data"]:
+                    yield traffic
+        for traffic in self.traffic_parser._parsing_finished():
+            if traffic is not None and traffic["data"]:
+                yield traffic
+
+    @staticmethod
+    def _stream(rows, kind, parsed_offsets, path):
+        """
+        Generator that decorates the rows of a stream to be merged by `tme`. Processes are sorted
+        before traffic of the same `tme`, so that a job is known before its traffic. Otherwise
+        the order within the stream is kept.
+
+        Every row is given with the position the reader has reached after the row (see
+        :py:attr:`DataParser.parsed_offsets`).
+
+        :param rows: generator of records
+        :param int kind: kind of stream, 0 for processes and 1 for traffic
+        :param parsed_offsets: positions of the parser the rows are read for
+        :param path: path of the stream
+        :return: generator of tuples of tme, kind, index, row and position
+        """
+        position = None
+        for index, row in enumerate(rows):
+            if row is not None:
+                if position is None:
+                    # the reader updates its position in place
+                    position = parsed_offsets[path]
+                yield int(row.tme or 0), kind, index, row, tuple(position)
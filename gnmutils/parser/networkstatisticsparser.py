@@ -20,12 +20,15 @@ class NetworkStatisticsParser(DataParser):
     Main purpose for this implementation is the generation of data that can be used for simulation.
     The results can further be saved into CSV files.
     """
+    default_batch_size = 1000
+
     def __init__(self, data_source=None, data_reader=None, workernode=None, run=None, **kwargs):
         DataParser.__init__(self, data_source, data_reader, **kwargs)
         self._data = self._data or {}
         self._workernode = workernode
         self._run = run
-        self._base_tme = 0
+        # statistics that have been restored keep the intervals they have been started with
+        self._base_tme = min(self._data) if self._data else 0
 
     def data_id(self, value):
         pass
@@ -50,6 +53,10 @@ class NetworkStatisticsParser(DataParser):
 
     def load_archive_state(self, path=None):
         if self.data_source is not None:
+            self._data = next(self.data_source.object_data(
+                pattern="statistics_data.pkl",
+                path=path
+            ), None)
             self.configuration = next(self.data_source.object_data(
                 pattern="configuration.pkl",
                 path=path
@@ -58,14 +65,28 @@ class NetworkStatisticsParser(DataParser):
                 pattern="statistics_parsed_data.pkl",
                 path=path
             ), set())
+            self._parsed_offsets = next(self.data_source.object_data(
+                pattern="statistics_parsed_offsets.pkl",
+                path=path
+            ), {})
 
     def archive_state(self, **kwargs):
         if self.data_source is not None:
+            self.data_source.write_object_data(
+                data=self._data,
+                name="statistics_data",
+                **kwargs
+            )
             self.data_source.write_object_data(
                 data=self._parsed_data,
                 name="statistics_parsed_data",
                 **kwargs
             )
+            self.data_source.write_object_data(
+                data=self._parsed_offsets,
+                name="statistics_parsed_offsets",
+                **kwargs
+            )
         else:
             logging.getLogger(self.__class__.__name__).warning(
                 "Archiving not done because of missing data_source"
@@ -106,6 +127,23 @@ class NetworkStatisticsParser(DataParser):
         statistics.add(piece)
         self._data[tme] = statistics
 
+    def _add_pieces(self, batch=None):
+        fields = batch[0]._header_fields
+        tme_index = fields.index("tme")
+        _get_matching_tme = self._get_matching_tme
+        data = self._data
+        for record in batch:
+            tme = _get_matching_tme(tme=int(record[tme_index] or 0))
+            try:
+                statistics = data[tme]
+            except KeyError:
+                statistics = data[tme] = NetworkStatistics(
+                    workernode=self._workernode,
+                    run=self._run,
+                    tme=tme)
+            statistics.add(dict(zip(fields, record)))
+        return []
+
     def _piece_from_dict(self, data_dict=None):
         return data_dict
 
@@ -4,6 +4,7 @@ The module implements the parsing of original output files from GNM tool.
 import logging
 
 from gnmutils.parser.dataparser import DataParser
+from gnmutils.reader.csvreader import CSVReader
 from gnmutils.objectcache import ObjectCache
 from gnmutils.objects.process import Process
 from gnmutils.objects.job import Job
@@ -30,6 +31,7 @@ class ProcessStreamParser(DataParser):
         self.run = run
 
     def load_archive_state(self, path=None):
+        DataParser.load_archive_state(self, path=path)
         if self.data_source is not None:
             self._process_cache = next(self.data_source.object_data(
                 pattern="process_cache.pkl",
@@ -62,6 +64,11 @@ class ProcessStreamParser(DataParser):
                 name="parsed_data",
                 **kwargs
             )
+            self.data_source.write_object_data(
+                data=self._parsed_offsets,
+                name="parsed_offsets",
+                **kwargs
+            )
         else:
             logging.getLogger(self.__class__.__name__).warning(
                 "Archiving not done because of missing data_source"
@@ -69,9 +76,9 @@ class ProcessStreamParser(DataParser):
 
     def pop_data(self):
         _data = self._data
-        for key in _data.object_cache.keys():
-            while _data.object_cache[key]:
-                yield _data.object_cache[key].pop()
+        for key in _data.keys():
+            while key in _data:
+                yield self._attached(_data.pop_data(key=key))
 
     def check_caches(self, **kwargs):
         if not self._changed:
@@ -107,43 +114,55 @@ class ProcessStreamParser(DataParser):
         self._process_cache.clear()
 
     def _piece_from_dict(self, piece=None):
-        return piece
+        fields = tuple(sorted(piece))
+        return CSVReader.record_type(fields)._make(piece[field] for field in fields)
+
+    def _piece_from_record(self, record=None):
+        return record
 
-    def _add_piece(self, process_dict=None):
+    def _add_piece(self, record=None):
+        """
+        Method adds the record of a process event (see :py:meth:`CSVReader.records`).
+
+        :param record: record of process event
+        :return: finished job if any
+        """
         self._changed = True
         _process_cache = self._process_cache
-        if int(process_dict.get("gpid", 0)) > 0:
-            if "exit" in process_dict.get("state", None):
+        if int(record.gpid or 0) > 0:
+            if "exit" in record.state:
                 try:
                     matching_process = _process_cache.get_data(
-                        value=int(process_dict.get("tme", 0)),  # we are in event, so tme means exit_tme
-                        key=int(process_dict.get("pid", 0))
+                        value=int(record.tme or 0),  # we are in event, so tme means exit_tme
+                        key=int(record.pid or 0)
                     )
                 except DataNotInCacheException:
-                    _process_cache.add_data(data=Process.from_process_event(**process_dict))
+                    _process_cache.add_data(data=Process.from_process_record(record))
                 else:
                     if matching_process is not None:
                         try:
-                            matching_process.addProcessEvent(**process_dict)
+                            matching_process.addProcessEvent(**record._asdict())
                         except ProcessMismatchException as exception:
                             logging.getLogger(self.__class__.__name__).warning(exception)
-                            _process_cache.add_data(data=Process.from_process_event(**process_dict))
+                            _process_cache.add_data(data=Process.from_process_record(record))
                         else:
-                            _process_cache.remove_data(data=matching_process, key=matching_process.pid)
+                            _process_cache.remove_data(data=matching_process,
+                                                       key=matching_process.pid,
+                                                       value=matching_process.tme)
                             is_finished, job = self._finish_process(process=matching_process)
                             if not is_finished and job is None:
                                 _process_cache.unfound.add(matching_process)
                             elif is_finished:
-                                self._data.remove_data(data=job, key=job.gpid)
-                                return job
+                                self._data.remove_data(data=job, key=job.gpid, value=job.tme)
+                                return self._attached(job)
                     else:
-                        process = Process.from_process_event(**process_dict)
+                        process = Process.from_process_record(record)
                         logging.getLogger(self.__class__.__name__).warning(
                             "received exit event of process before actual start event: %s" % process
                         )
                         _process_cache.add_data(data=process)
             else:
-                process = Process.from_process_event(**process_dict)
+                process = Process.from_process_record(record)
                 if self.job_root_name in process.name:
                     # create new dummy job
                     self._data.add_data(
@@ -158,6 +177,18 @@ class ProcessStreamParser(DataParser):
                         value=process.tme)
                 _process_cache.add_data(data=process)
 
+    def _attached(self, job=None):
+        """
+        Method attaches the data source to a job that has been restored from archived state, as
+        the data source is not archived with the job.
+
+        :param job: job to attach data source to
+        :return: the job
+        """
+        if job.data_source is None:
+            job.data_source = self.data_source
+        return job
+
     def _finish_process(self, process=None):
         try:
             # FIXME: I have no idea why I currently have to add this...
@@ -165,7 +196,7 @@ class ProcessStreamParser(DataParser):
         except DataNotInCacheException:
             return False, None
         try:
-            matching_job = self._data.object_cache[process.gpid][object_index]
+            matching_job = self._data.data_at(key=process.gpid, index=object_index)
         except KeyError:
             logging.getLogger(self.__class__.__name__).debug(
                 "no matching job has been found %s", process
@@ -3,6 +3,8 @@ from gnmutils.objects.traffic import Traffic
 
 
 class TrafficParser(DataParser):
+    default_batch_size = 1000
+
     def __init__(self, data_source=None, data_reader=None, **kwargs):
         DataParser.__init__(self, data_source, data_reader, **kwargs)
         self._data = []
@@ -13,6 +15,11 @@ class TrafficParser(DataParser):
     def _add_piece(self, piece=None):
         self._data.append(piece)
 
+    def _add_pieces(self, batch=None):
+        fields = batch[0]._header_fields
+        self._data.extend([Traffic(**dict(zip(fields, record))) for record in batch])
+        return []
+
     def _piece_from_dict(self, data_dict=None):
         return Traffic(**data_dict)
 
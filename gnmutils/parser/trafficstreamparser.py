@@ -3,6 +3,7 @@ This module implements a :py:class:`DataParser` that creates a single CSV file o
 from the stream received from the GNM tool.
 """
 import logging
+import operator
 
 from gnmutils.exceptions import DataNotInCacheException
 from gnmutils.parser.dataparser import DataParser
@@ -12,7 +13,10 @@ from gnmutils.objects.job import Job
 
 
 class TrafficWrapper(object):
-    def __init__(self, job=None, configuration=None):
+    # job the wrapper has been finished with, see :py:meth:`finish`
+    _job = None
+
+    def __init__(self, job=None, configuration=None, exit_tme=None):
         self._traffic = {}
         self.pid = None
         self.tme = None
@@ -20,7 +24,7 @@ class TrafficWrapper(object):
         if job is not None:
             self.pid = job.gpid
             self.tme = job.tme
-            self.exit_tme = job.last_tme
+            self.exit_tme = exit_tme if exit_tme is not None else job.last_tme
             self._traffic["workernode"] = job.workernode
             self._traffic["run"] = job.run
             self._traffic["id"] = job.db_id
@@ -36,8 +40,24 @@ class TrafficWrapper(object):
         :return: dictionary containing relevant traffic information
         :rtype: dict
         """
+        if self._job is not None:
+            # the id might only have been assigned after the job has been written, data sources
+            # that write jobs deferred can take it from the job
+            self._traffic["id"] = self._job.db_id
+            self._traffic["job"] = self._job
         return self._traffic
 
+    def finish(self, job=None):
+        """
+        Method that marks the wrapper as belonging to the given finished :py:class:`Job`. The
+        end of the wrapper is set to the last tme of the job and the id of the traffic is taken
+        from the job when being accessed.
+
+        :param job: the finished job
+        """
+        self.exit_tme = job.last_tme
+        self._job = job
+
     @property
     def data(self):
         """
@@ -59,7 +79,33 @@ class TrafficStreamParser(DataParser):
 
     At the time when splitting the stream, it does not matter, if the single traffic entries are
     matched to existing :py:class:`Process`es. They just need to appear in csv files.
+
+    If a :py:attr:`job_cache` of currently running jobs is given, e.g. by a
+    :py:class:`ProcessStreamParser` that is splitting the process stream at the same time, the jobs
+    are looked up there instead of the data source. Those jobs are still running, so the wrappers
+    stay open until :py:meth:`finish_job` is called. Only when unfound traffic is tried again by
+    :py:meth:`check_caches`, jobs that are not in the cache anymore are looked up as well.
+
+    Otherwise the jobs of the run are loaded at once from the data source into a
+    :py:attr:`job_index` (see :py:meth:`DataSource.job_index`) when the first job is looked up.
+    Only if the data source does not offer an index, jobs are loaded for every traffic by
+    :py:meth:`DataSource.job_description`.
+
+    Traffic whose job cannot be found is kept as unfound and tried again by
+    :py:meth:`check_caches`. To not look up the job again for every traffic of the same gpid, e.g.
+    for background traffic that does not belong to any job, misses are remembered for the gpid
+    and a bucket of :py:attr:`unmatched_interval` seconds of traffic until the stream has
+    proceeded by :py:attr:`unmatched_timeout` seconds, so replaying logs behaves the same as
+    parsing them live. :py:meth:`check_caches` still looks up every remembered miss once. This
+    does not apply to jobs from :py:attr:`job_cache` that are still being added while parsing.
     """
+    # marks the end of wrappers whose job end is still unknown
+    open_exit_tme = 5000000000
+    # length of tme buckets in seconds that misses are remembered for
+    unmatched_interval = 600
+    # number of seconds of the stream until jobs of remembered misses are looked up again
+    unmatched_timeout = 300
+
     def __init__(self, data_source=None, data_reader=None, workernode=None, run=None, **kwargs):
         DataParser.__init__(self, data_source, data_reader, **kwargs)
         if self.data_source is not None:
@@ -71,25 +117,58 @@ class TrafficStreamParser(DataParser):
                 pattern="traffic_parsed_data.pkl",
                 path=kwargs.get("path", None)
             ), set())
+            self._parsed_offsets = next(self.data_source.object_data(
+                pattern="traffic_parsed_offsets.pkl",
+                path=kwargs.get("path", None)
+            ), {})
         else:
             self._data = ObjectCache()
         self.workernode = workernode
         self.run = run
+        self.job_cache = None
+        self.job_index = None
+        # path of processed data of the run to load the job index for
+        self._data_path = kwargs.get("data_path", None)
+        self._job_index_loaded = False
+        self._job_index_from_source = False
+        # expiry and number of check of misses by gpid and tme bucket
+        self._unmatched = {}
+        self._checks = 0
+        # latest tme of the stream
+        self._stream_tme = 0
         self._last_tme = None
 
     def pop_data(self):
-        for key in self._data.object_cache.keys():
-            while self._data.object_cache[key]:
-                wrapper = self._data.object_cache[key].pop()
+        for key in self._data.keys():
+            while key in self._data:
+                wrapper = self._data.pop_data(key=key)
                 yield wrapper.traffic
 
     def check_caches(self, **kwargs):
         if not self._changed:
             return
-        for traffic in self._data.unfound.copy():
-            _, appended, _ = self._match_traffic(traffic=traffic)
-            if appended:
-                self._data.unfound.discard(traffic)
+        self._checks += 1
+        for key, (expiry, _) in list(self._unmatched.items()):
+            if expiry <= self._stream_tme:
+                del self._unmatched[key]
+        unfound = self._data.unfound
+        if not unfound:
+            return
+        if self._job_index_from_source:
+            # jobs might have been added since the index has been loaded
+            self._job_index_loaded = False
+            self._job_index_from_source = False
+            self.job_index = None
+        # traffic is retried in order per gpid, so once a wrapper has been created, the
+        # following traffic of the gpid is matched from cache
+        traffics = {}
+        for traffic in unfound:
+            traffics.setdefault(traffic.gpid, []).append(traffic)
+        for gpid_traffics in traffics.values():
+            for traffic in sorted(gpid_traffics, key=operator.attrgetter("tme")):
+                _, appended, _ = self._match_traffic(traffic=traffic, retry=True)
+                if appended:
+                    unfound.discard(traffic)
 
     def clear_caches(self):
         self._data.clear()
@@ -115,6 +194,11 @@ class TrafficStreamParser(DataParser):
                 name="traffic_parsed_data",
                 **kwargs
             )
+            self.data_source.write_object_data(
+                data=self._parsed_offsets,
+                name="traffic_parsed_offsets",
+                **kwargs
+            )
         else:
             logging.getLogger(self.__class__.__name__).warning(
                 "Archiving not done because of missing data_source"
@@ -122,46 +206,76 @@ class TrafficStreamParser(DataParser):
 
     def _add_piece(self, piece=None):
         self._changed = True
+        if piece.tme > self._stream_tme:
+            self._stream_tme = piece.tme
         # look for matching job
         finished, _, matching_wrapper = self._match_traffic(traffic=piece)
         if finished and object is not None:
-            self._data.remove_data(data=matching_wrapper)
+            self._data.remove_data(data=matching_wrapper, value=matching_wrapper.tme)
             return matching_wrapper.traffic
 
         # check for other finished jobs
         self._last_tme = piece.tme - self._interval()
         return next(self._check_data(), None)
 
-    def _match_traffic(self, traffic=None):
+    def finish_job(self, job=None):
+        """
+        Method to be called when a job from :py:attr:`job_cache` has been finished. The wrapper
+        of the job is closed, so that its traffic is given out after the monitoring interval. If
+        no traffic has been seen so far, an empty wrapper is created to catch late traffic.
+
+        :param job: the finished job
+        """
+        wrapper = None
+        try:
+            object_index = self._data.data_index(value=job.tme, key=job.gpid)
+        except DataNotInCacheException:
+            pass
+        else:
+            wrapper = self._data.data_at(key=job.gpid, index=object_index)
+            if wrapper.tme != job.tme:
+                wrapper = None
+        if wrapper is None:
+            wrapper = TrafficWrapper(job=job, configuration=self.configuration)
+            self._data.add_data(data=wrapper)
+        wrapper.finish(job=job)
+
+    def _match_traffic(self, traffic=None, retry=False):
         # load job object from cache
         matching_traffic_wrapper = None
         finished = False
         try:
             object_index = self._data.data_index(value=traffic.tme, key=traffic.gpid)
         except DataNotInCacheException:
-            appended = self._match_with_new_wrapper(traffic=traffic)
+            appended = self._match_with_new_wrapper(traffic=traffic, retry=retry)
         else:
             try:
-                matching_traffic_wrapper = self._data.object_cache[traffic.gpid][object_index]
+                matching_traffic_wrapper = self._data.data_at(key=traffic.gpid,
+                                                              index=object_index)
                 if traffic.tme - self._interval() <= matching_traffic_wrapper.exit_tme:
                     matching_traffic_wrapper.data.append(traffic)
                     appended = True
                 else:
                     # remember and remove old wrapper
                     finished = True
-                    appended = self._match_with_new_wrapper(traffic=traffic)
+                    appended = self._match_with_new_wrapper(traffic=traffic, retry=retry)
             except IndexError:
                 # no wrapper is known
-                appended = self._match_with_new_wrapper(traffic=traffic)
+                appended = self._match_with_new_wrapper(traffic=traffic, retry=retry)
             except KeyError:
                 # no wrapper is known
-                appended = self._match_with_new_wrapper(traffic=traffic)
+                appended = self._match_with_new_wrapper(traffic=traffic, retry=retry)
         return finished, appended, matching_traffic_wrapper
 
     def _piece_from_dict(self, data_dict=None):
         return Traffic(**data_dict)
 
-    def _match_with_new_wrapper(self, traffic=None):
+    def _piece_from_record(self, record=None):
+        return Traffic.from_record(record)
+
+    def _match_with_new_wrapper(self, traffic=None, retry=False):
+        # misses of jobs that are still being added to the job cache are not remembered
+        remember = self.job_cache is None or retry
         if traffic.gpid == 0:
             wrapper = TrafficWrapper(Job(
                 gpid=0,
@@ -169,8 +283,11 @@ class TrafficStreamParser(DataParser):
                 last_tme=5000000000,
                 workernode=self.workernode,
                 run=self.run))
+        elif remember and self._is_unmatched(traffic=traffic, retry=retry):
+            self._data.unfound.add(traffic)
+            return False
         else:
-            wrapper = self._load_traffic_wrapper(traffic=traffic)
+            wrapper = self._load_traffic_wrapper(traffic=traffic, from_source=retry)
         if wrapper is not None:
             wrapper.data.append(traffic)
             self._data.add_data(data=wrapper)
@@ -180,15 +297,51 @@ class TrafficStreamParser(DataParser):
                 "was not able to get job for traffic (gpid: %s, tme: %s, workernode: %s, run: %s)",
                 traffic.gpid, traffic.tme, self.workernode, self.run
             )
+            if remember:
+                self._add_unmatched(traffic=traffic)
             self._data.unfound.add(traffic)
         return False
 
-    def _load_traffic_wrapper(self, traffic=None):
-        job = Job(workernode=self.workernode,
-                  run=self.run,
-                  tme=traffic.tme + self._interval(),
-                  gpid=traffic.gpid)
-        job = self.data_source.job_description(data=job)
+    def _unmatched_key(self, traffic=None):
+        return traffic.gpid, (traffic.tme + self._interval()) // self.unmatched_interval
+
+    def _is_unmatched(self, traffic=None, retry=False):
+        try:
+            expiry, check = self._unmatched[self._unmatched_key(traffic=traffic)]
+        except KeyError:
+            return False
+        if retry:
+            # misses are looked up once per check
+            return check == self._checks
+        return expiry > self._stream_tme
+
+    def _add_unmatched(self, traffic=None):
+        self._unmatched[self._unmatched_key(traffic=traffic)] = \
+            self._stream_tme + self.unmatched_timeout, self._checks
+
+    def _load_traffic_wrapper(self, traffic=None, from_source=False):
+        if self.job_cache is not None:
+            wrapper = self._cached_traffic_wrapper(traffic=traffic)
+            if wrapper is not None or not from_source:
+                return wrapper
+        job_index = self._job_index()
+        if job_index is not None:
+            tme = traffic.tme + self._interval()
+            matching_job = job_index.find(gpid=traffic.gpid, tme=tme)
+            if matching_job is None or matching_job[1] <= 0:
+                return None
+            # same job as given by the data source
+            job = Job(workernode=self.workernode, run=self.run, tme=tme, gpid=traffic.gpid,
+                      db_id=matching_job[2], last_tme=matching_job[1])
+        else:
+            job = Job(workernode=self.workernode,
+                      run=self.run,
+                      tme=traffic.tme + self._interval(),
+                      gpid=traffic.gpid)
+            try:
+                job = self.data_source.job_description(data=job)
+            except NotImplementedError:
+                return None
         if job is not None and job.last_tme > 0:
             wrapper = TrafficWrapper(
                 job=job,
@@ -197,6 +350,33 @@ class TrafficStreamParser(DataParser):
             return wrapper
         return None
 
+    def _cached_traffic_wrapper(self, traffic=None):
+        tme = traffic.tme + self._interval()
+        try:
+            job = self.job_cache.get_data(value=tme, key=traffic.gpid)
+        except DataNotInCacheException:
+            return None
+        if job.tme > tme:
+            return None
+        return TrafficWrapper(
+            job=job,
+            configuration=self.configuration,
+            exit_tme=self.open_exit_tme
+        )
+
+    def _job_index(self):
+        if not self._job_index_loaded:
+            self._job_index_loaded = True
+            if self.job_index is None and self.data_source is not None:
+                try:
+                    self.job_index = self.data_source.job_index(
+                        workernode=self.workernode, run=self.run, path=self._data_path)
+                except NotImplementedError:
+                    pass
+                else:
+                    self._job_index_from_source = True
+        return self.job_index
+
     def _interval(self):
         if self.configuration is not None:
             return self.configuration.interval
@@ -207,9 +387,9 @@ class TrafficStreamParser(DataParser):
             yield data
 
     def _check_data(self):
-        for key in self._data.object_cache.keys():
-            for wrapper in self._data.object_cache[key][:]:
+        for key in self._data.keys():
+            for wrapper in self._data.data_list(key=key):
                 if wrapper.exit_tme < self._last_tme:
-                    self._data.object_cache[key].remove(wrapper)
+                    self._data.remove_data(data=wrapper, key=key, value=wrapper.tme)
                     yield wrapper.traffic
 
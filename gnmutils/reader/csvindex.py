@@ -0,0 +1,277 @@
+"""
+The module offers an index of the rows of processed CSV files, so that single rows can be read
+again without parsing the whole file.
+"""
+import array
+import bisect
+import logging
+import operator
+import os
+import pickle
+
+from gnmutils.utils import replace_file
+
+if str is bytes:
+    # lines are read as str already
+    _decode = None
+else:
+    _decode = operator.methodcaller("decode")
+
+
+class CSVIndex(object):
+    """
+    The :py:class:`CSVIndex` records the offset of every row of a CSV file that has been written
+    by a :py:class:`DataSource`, e.g. `<id>-traffic.csv`, together with the `pid` and `tme` of
+    the row. Rows are read again by seeking to their offset, so only the rows needed are parsed.
+
+    Comments are skipped. In contrast to :py:class:`CSVReader` rows are expected to be given on
+    a single line and the file is expected to start with a header.
+
+    The index can be stored in a sidecar file next to the CSV file (`<file>.idx`). As files are
+    only appended to, the number of bytes that has been indexed is stored as well. When the file
+    has grown, only the rows appended are indexed on :py:meth:`update`.
+
+    For :py:meth:`select` the rows are grouped by their `pid` and sorted by their `tme` once, so
+    rows of a time range are found by bisection.
+
+    :param str path: path of CSV file
+    """
+    typecode = "l"
+    suffix = ".idx"
+    # pickle protocol that is supported by all python versions in use
+    protocol = 2
+    version = 1
+
+    def __init__(self, path=None):
+        self.path = path
+        self.offsets = array.array(self.typecode)
+        self.pids = array.array(self.typecode)
+        self.tmes = array.array(self.typecode)
+        # number of bytes indexed
+        self.size = 0
+        # first row of every header and the header itself
+        self._header_rows = []
+        self._headers = []
+        # tmes and numbers of rows sorted by tme, by pid and for all rows (`None`)
+        self._lookup = None
+
+    @classmethod
+    def from_file(cls, path=None):
+        """
+        Method creates the index of the given file.
+
+        :param str path: path of CSV file
+        :return: index of file
+        :rtype: :py:class:`CSVIndex`
+        :raises ValueError: if the file does not start with a header
+        """
+        index = cls(path=path)
+        index.update()
+        return index
+
+    @classmethod
+    def for_file(cls, path=None, persist=False):
+        """
+        Method returns the index of the given file. If a sidecar exists, it is loaded and only
+        rows that have been appended since are indexed. Otherwise the whole file is indexed. If
+        :py:attr:`persist` is set, the sidecar is written when the index has changed. Sidecars
+        that cannot be written, e.g. for read-only directories, are skipped.
+
+        :param str path: path of CSV file
+        :param persist: if to write changes to the sidecar
+        :return: index of file
+        :rtype: :py:class:`CSVIndex`
+        :raises ValueError: if the file does not start with a header
+        """
+        index = cls.load(path=path)
+        if index is None:
+            index = cls(path=path)
+        if index.update() and persist:
+            try:
+                index.save()
+            except (IOError, OSError) as error:
+                logging.getLogger(cls.__name__).info(
+                    "index of %s has not been saved: %s", path, error)
+        return index
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Method loads the index of the given file from its sidecar. Sidecars that cannot be read
+        or that do not fit the file are ignored.
+
+        :param str path: path of CSV file
+        :return: index of file, `None` if no valid sidecar exists
+        :rtype: :py:class:`CSVIndex`
+        """
+        try:
+            with open(cls.sidecar_path(path), "rb") as index_file:
+                state = pickle.load(index_file)
+            file_size = os.path.getsize(path)
+        except (IOError, OSError):
+            return None
+        except (pickle.UnpicklingError, EOFError, ValueError, TypeError) as error:
+            logging.getLogger(cls.__name__).warning(
+                "skipping invalid index of %s: %s", path, error)
+            return None
+        if state[0] != cls.version:
+            return None
+        _, size, header_rows, headers, offsets, pids, tmes = state
+        if size > file_size:
+            # file has been replaced
+            return None
+        index = cls(path=path)
+        index.offsets.fromlist(offsets)
+        index.pids.fromlist(pids)
+        index.tmes.fromlist(tmes)
+        index.size = size
+        index._header_rows = header_rows
+        index._headers = headers
+        return index
+
+    @classmethod
+    def sidecar_path(cls, path=None):
+        """
+        Method returns the path of the sidecar of the given file.
+
+        :param str path: path of CSV file
+        :return: path of sidecar
+        """
+        return "%s%s" % (path, cls.suffix)
+
+    def save(self):
+        """
+        Method writes the index to its sidecar. The sidecar is replaced at once, so readers
+        never see an incomplete index.
+        """
+        sidecar_path = self.sidecar_path(self.path)
+        temporary_path = "%s.tmp" % sidecar_path
+        with open(temporary_path, "wb") as index_file:
+            pickle.dump((self.version, self.size, self._header_rows, self._headers,
+                         self.offsets.tolist(), self.pids.tolist(), self.tmes.tolist()),
+                        index_file, self.protocol)
+        replace_file(source=temporary_path, target=sidecar_path)
+
+    def update(self):
+        """
+        Method indexes the rows that have been appended to the file since it has been indexed.
+        Incomplete last lines are left for the next update.
+
+        :return: if rows have been indexed
+        :rtype: bool
+        :raises ValueError: if the file does not start with a header
+        """
+        offsets = self.offsets
+        pids = self.pids
+        tmes = self.tmes
+        header = self._headers[-1] if self._headers else None
+        if header is not None:
+            tme_index = header["tme"]
+            pid_index = header["pid"]
+        last_tme = tmes[-1] if tmes else 0
+        offset = self.size
+        with open(self.path, "rb") as csvfile:
+            csvfile.seek(offset)
+            for line in csvfile:
+                if not line.endswith(b"\n"):
+                    # line is still being written
+                    break
+                start = offset
+                offset += len(line)
+                if _decode is not None:
+                    line = _decode(line)
+                if line[0] == "#":
+                    continue
+                row = line[:-1].split(",")
+                if header is not None:
+                    tme = row[tme_index]
+                    if tme:
+                        try:
+                            last_tme = int(tme)
+                        except ValueError:
+                            header = None
+                if header is None:
+                    if "tme" not in row:
+                        raise ValueError("no header found in %s" % self.path)
+                    header = dict((item, position) for position, item in enumerate(row))
+                    tme_index = header["tme"]
+                    pid_index = header["pid"]
+                    self._header_rows.append(len(offsets))
+                    self._headers.append(header)
+                    continue
+                offsets.append(start)
+                pids.append(int(row[pid_index] or 0))
+                tmes.append(last_tme)
+        if offset == self.size:
+            return False
+        logging.getLogger(self.__class__.__name__).info(
+            "indexed %d bytes of %s", offset - self.size, self.path)
+        self.size = offset
+        self._lookup = None
+        return True
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def header(self, row=0):
+        """
+        Method returns the header that is valid for the given row.
+
+        :param int row: number of row
+        :return: dictionary of fields and their positions in a row
+        :rtype: dict
+        """
+        return self._headers[bisect.bisect_right(self._header_rows, row) - 1]
+
+    def read(self, rows=None):
+        """
+        Generator that returns the given rows as dictionaries that map the fields of the header
+        to the values of the rows. Rows without `tme` are given the `tme` of the rows before.
+
+        :param rows: iterable of numbers of rows to read
+        :return: generator of dictionaries
+        """
+        offsets = self.offsets
+        tmes = self.tmes
+        with open(self.path, "rb") as csvfile:
+            for row in rows:
+                csvfile.seek(offsets[row])
+                line = csvfile.readline()
+                if _decode is not None:
+                    line = _decode(line)
+                header = self.header(row)
+                values = line.rstrip("\n").split(",")
+                data = dict((field, values[position]) for field, position in header.items())
+                if not data["tme"]:
+                    data["tme"] = tmes[row]
+                yield data
+
+    def select(self, pid=None, start=None, end=None):
+        """
+        Method returns the numbers of the rows of the given :py:attr:`pid` whose `tme` is between
+        :py:attr:`start` and :py:attr:`end`. Criteria that are not given are not checked.
+
+        :param int pid: pid of rows
+        :param int start: minimum tme of rows
+        :param int end: maximum tme of rows
+        :return: list of numbers of rows
+        """
+        try:
+            tmes, rows = self._sorted_rows()[pid]
+        except KeyError:
+            return []
+        first = 0 if start is None else bisect.bisect_left(tmes, start)
+        last = len(tmes) if end is None else bisect.bisect_right(tmes, end)
+        return sorted(rows[first:last])
+
+    def _sorted_rows(self):
+        if self._lookup is None:
+            tmes = self.tmes
+            grouped = {None: range(len(self.offsets))}
+            for row, pid in enumerate(self.pids):
+                grouped.setdefault(pid, []).append(row)
+            self._lookup = {}
+            for pid, rows in grouped.items():
+                rows = sorted(rows, key=tmes.__getitem__)
+                self._lookup[pid] = ([tmes[row] for row in rows], rows)
+        return self._lookup
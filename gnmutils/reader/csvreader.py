@@ -1,13 +1,21 @@
 """
 The module offers a reader to read CSV formats.
 """
+import collections
 import logging
+import operator
 import re
 import gzip
 
 from gnmutils.reader.datareader import DataReader
 from gnmutils.monitoringconfiguration import MonitoringConfiguration
 
+if str is bytes:
+    # lines are read as str already
+    _decode = None
+else:
+    _decode = operator.methodcaller("decode")
+
 
 class CSVReader(DataReader):
     """
@@ -16,6 +24,11 @@ class CSVReader(DataReader):
     tool to set version and configuration environment, detects headers from CSV, and removes commas
     from command strings, if available.
 
+    The header of a file is only detected once. Afterwards a mapping from row to record is compiled
+    that is used for all following rows. Rows can therefore either be accessed as dictionaries
+    (:py:meth:`data`), as lightweight records (:py:meth:`records`) or as lists of records
+    (:py:meth:`batches`).
+
     References to the actual parser and also the operator can be given. The parser as well as
     operator default to `None`.
 
@@ -23,11 +36,20 @@ class CSVReader(DataReader):
     :type parser: :py:class:`ProcessParser`, :py:class:`gnmutils.jobparser.JobParser`,
     :py:class:`TrafficParser`, or None
     """
+    # caches the record types that have been created for the different headers
+    _record_types = {}
+    # if files are marked as parsed when reaching their end
+    finalize_files = True
+
     def __init__(self, parser=None):
         DataReader.__init__(self, parser=parser)
         # caches the different header fields
         self._header = None
         self._tme = None
+        # compiled mapping from row to record
+        self._fields = None
+        self._getter = None
+        self._width = 0
 
     # prepare for next CSV file to be read
     def clear_caches(self):
@@ -37,92 +59,274 @@ class CSVReader(DataReader):
         del self._header
         self._header = None
         self._tme = None
+        self._fields = None
+        self._getter = None
+        self._width = 0
         if self._parser:
             self._parser.clear_caches()
 
+    @property
+    def fields(self):
+        """
+        Method returns the names of the fields of the current header in the order they are given
+        in the records.
+
+        :return: field names
+        :rtype: tuple
+        """
+        return self._fields
+
     def data(self, path=None, **kwargs):
+        """
+        Method that returns a generator of dictionaries that map the fields of the header to the
+        values of the single rows. If the file has already been parsed, `None` is yielded.
+
+        :param path: path to read data from
+        :param kwargs: additional arguments
+        :return: generator of dictionaries
+        """
+        return self._read(path=path, converter=self._dict_converter)
+
+    def records(self, path=None, **kwargs):
+        """
+        Method that returns a generator of records. The records are named tuples whose fields
+        are given by the header of the file. If the file has already been parsed, `None` is
+        yielded.
+
+        :param path: path to read data from
+        :param kwargs: additional arguments
+        :return: generator of records
+        """
+        return self._read(path=path, converter=self._record_converter)
+
+    def batches(self, path=None, size=1000, **kwargs):
+        """
+        Method that returns a generator of lists of records (see :py:meth:`records`). Each list
+        contains at most :py:attr:`size` records. All records of a list share the same fields, so
+        a new list is started when the header changes. If the file has already been parsed,
+        nothing is yielded.
+
+        :param path: path to read data from
+        :param int size: maximum number of records per batch
+        :param kwargs: additional arguments
+        :return: generator of lists of records
+        """
+        batch = []
+        append = batch.append
+        record_type = None
+        for record in self.records(path=path):
+            if record is None:
+                continue
+            if type(record) is not record_type:
+                if batch:
+                    yield batch
+                    batch = []
+                    append = batch.append
+                record_type = type(record)
+            append(record)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+                append = batch.append
+        if batch:
+            yield batch
+
+    @classmethod
+    def record_type(cls, fields):
+        """
+        Method returns the type of the records that is used for the given fields. Types are cached,
+        so that the same type is returned for identical headers.
+
+        Fields that are no valid identifiers are renamed in `_fields` of the type (see
+        `collections.namedtuple`), the names of the header are kept in `_header_fields` of the
+        type. The values of records therefore need to be mapped by `_header_fields`.
+
+        :param tuple fields: names of the fields
+        :return: named tuple type
+        """
+        try:
+            return cls._record_types[fields]
+        except KeyError:
+            record_type = collections.namedtuple("Record", fields, rename=True)
+            record_type._header_fields = tuple(fields)
+            cls._record_types[fields] = record_type
+            return record_type
+
+    @staticmethod
+    def _dict_converter(fields, getter):
+        return lambda row: dict(zip(fields, getter(row)))
+
+    @classmethod
+    def _record_converter(cls, fields, getter):
+        make_record = cls.record_type(fields)._make
+        return lambda row: make_record(getter(row))
+
+    def _compile_header(self, header, converter):
+        """
+        Method compiles the mapping from a row to its output for the given header.
+
+        :param dict header: dictionary of fields and their positions in a row
+        :param converter: factory that creates the conversion function for fields and getter
+        :return: function to convert a row
+        """
+        self._header = header
+        fields = tuple(sorted(header, key=header.get))
+        indices = [header[field] for field in fields]
+        if len(indices) == 1:
+            index = indices[0]
+            getter = lambda row: (row[index],)
+        else:
+            getter = operator.itemgetter(*indices)
+        self._fields = fields
+        self._width = max(indices) + 1
+        return converter(fields, getter)
+
+    def _read(self, path=None, converter=None):
+        """
+        Generator that yields every valid row converted by the function that is created by
+        :py:attr:`converter` for the current header.
+
+        The position after every row is remembered in :py:attr:`parser.parsed_offsets`. If a
+        position is known for :py:attr:`path`, reading is resumed at this position. When reaching
+        the end of the file, the file is marked as parsed. If :py:attr:`finalize_files` is
+        `False`, only the position is remembered and an incomplete last line is left for the next
+        time, as the file might still be written.
+
+        :param path: path to read data from
+        :param converter: factory that creates the conversion function for fields and getter
+        :return: generator of converted rows
+        """
         self._header = None
         open_function = open
         if re.match(".*.gz$", path):
             open_function = gzip.open
         if path in self._parser.parsed_data:
             yield None
-        else:
-            logging.getLogger(self.__class__.__name__).info("starting to read %s", path)
-            with open_function(path, 'r') as csvfile:
-                tme = 0
-                # process every line in csvfile
-                for idx, line in enumerate(csvfile):
-                    # first check for comments in CSV line and skip
-                    if line[0] == "#":
-                        # check if it is a line specifying the version of monitoring tool
-                        if line.startswith("# version"):
-                            try:
-                                config_dict = dict(((val.strip() for val in values.split(":"))
-                                                    for values in line[1:].split(",")))
-                                configuration = MonitoringConfiguration(**config_dict)
-                                self._parser.configuration = configuration
-                            except KeyError:
-                                pass
-                        continue
+            return
+        parsed_offsets = self._parser.parsed_offsets
+        logging.getLogger(self.__class__.__name__).info("starting to read %s", path)
+        with open_function(path, 'rb') as csvfile:
+            last_tme = self._tme
+            tme_index = None
+            width = 0
+            header_length = 0
+            convert = None
+            offset = 0
+            start = 0
+            try:
+                offset, start, header, last_tme = parsed_offsets[path]
+            except KeyError:
+                header = None
+            else:
+                logging.getLogger(self.__class__.__name__).info(
+                    "resuming %s at offset %d (line %d)", path, offset, start)
+                csvfile.seek(offset)
+                if header is not None:
+                    convert = self._compile_header(header, converter)
+                    tme_index = header["tme"]
+                    width = self._width
+                    header_length = len(header)
+            # position after the last row that has been given out, it is updated in place
+            position = [offset, start, header, last_tme]
+            parsed_offsets[path] = position
+            # number of lines read, rows that have been split over several lines count each line
+            line_number = start
+            # process every line in csvfile
+            for line in csvfile:
+                idx = line_number
+                line_number += 1
+                offset += len(line)
+                if _decode is not None:
+                    line = _decode(line)
+                # first check for comments in CSV line and skip
+                if line[0] == "#":
+                    # check if it is a line specifying the version of monitoring tool
+                    if line.startswith("# version"):
+                        try:
+                            config_dict = dict(((val.strip() for val in values.split(":"))
+                                                for values in line[1:].split(",")))
+                            configuration = MonitoringConfiguration(**config_dict)
+                            self._parser.configuration = configuration
+                        except KeyError:
+                            pass
+                    continue
 
-                    # remove newline character from line
+                # remove newline character from line
+                if line[-1] == "\n":
                     line = line[:-1]
-                    try:
-                        # as long as the header has not been initialized,
-                        # an exception is thrown and the header row is deteced
-                        # otherwise the usual processing process starts
-                        tme = line.split(",")[self._header['tme']] or self._tme or tme
-                        self._tme = int(tme)
-                    except TypeError:
-                        # initialize the header cache
-                        row = line.split(",")
-                        # check if maybe no header is included
-                        if "tme" not in row[0]:
-                            self._header = self._parser.defaultHeader(length=len(row), row=line)
-                        else:
-                            header_cache = {}
-                            for index, item in enumerate(line.split(",")):
-                                header_cache[item] = index
-                            self._header = header_cache
-                            continue
-                    except ValueError:
-                        # current line is header line
-                        header_cache = {}
-                        for index, item in enumerate(line.split(",")):
-                            header_cache[item] = index
-                        self._header = header_cache
+                elif not self.finalize_files:
+                    # line is still being written
+                    break
+                row = line.split(",")
+                if convert is None:
+                    # check if maybe no header is included
+                    if "tme" in row[0]:
+                        header = dict((item, index) for index, item in enumerate(row))
+                    else:
+                        header = self._parser.defaultHeader(length=len(row), row=line)
+                    convert = self._compile_header(header, converter)
+                    tme_index = header["tme"]
+                    width = self._width
+                    header_length = len(header)
+                    position[2] = header
+                    if "tme" in row[0]:
+                        position[0] = offset
+                        position[1] = line_number
                         continue
-                    while True:
+                else:
+                    tme = row[tme_index]
+                    if tme:
                         try:
-                            row = line.split(",")
-                            # check if there are too many header fields than expected
-                            if len(row) > len(self._header):
-                                logging.info(
-                                    "Trying to fix wrong row length: row %d (%s:%d - %s) vs. "
-                                    "header %d", len(row), path, idx, line, len(self._header)
-                                )
-                                # check if additional "," are in command and remove
-                                while len(row) > len(self._header):
-                                    cmd_index = self._header["cmd"]
-                                    cmd_string = row[cmd_index] + row[cmd_index+1]
-                                    del row[cmd_index+1]
-                                    row[cmd_index] = cmd_string
-                            # finally add the valid row to the parser
-                            tme_in_row = row[self._header["tme"]]
-                            if tme_in_row is None or len(tme_in_row) == 0:
-                                row[self._header["tme"]] = self._tme
-                            data_dict = {}
-                            for key in self._header:
-                                data_dict[key] = row[self._header[key]]
-                            yield data_dict
-                        except IndexError:
-                            line = (line + csvfile.next())[:-1]
-                        except StopIteration:
-                            logging.getLogger(self.__class__.__name__).error(
-                                "there seems to be a wrong ending in the file for line %d (%s) "
-                                "in file %s", idx, line, path
-                            )
-                        else:
-                            break
+                            last_tme = int(tme)
+                        except ValueError:
+                            # current line is header line
+                            header = dict((item, index) for index, item in enumerate(row))
+                            convert = self._compile_header(header, converter)
+                            tme_index = header["tme"]
+                            width = self._width
+                            header_length = len(header)
+                            position[0] = offset
+                            position[1] = line_number
+                            position[2] = header
+                            continue
+                    elif last_tme is None:
+                        last_tme = 0
+                # check if the row has been split over several lines
+                while len(row) < width:
+                    try:
+                        next_line = next(csvfile)
+                    except StopIteration:
+                        logging.getLogger(self.__class__.__name__).error(
+                            "there seems to be a wrong ending in the file for line %d (%s) "
+                            "in file %s", idx, line, path
+                        )
+                        row = None
+                        break
+                    offset += len(next_line)
+                    line_number += 1
+                    if _decode is not None:
+                        next_line = _decode(next_line)
+                    line = (line + next_line).rstrip("\n")
+                    row = line.split(",")
+                if row is None:
+                    break
+                # check if there are too many header fields than expected
+                if len(row) > header_length:
+                    logging.info(
+                        "Trying to fix wrong row length: row %d (%s:%d - %s) vs. "
+                        "header %d", len(row), path, idx, line, header_length
+                    )
+                    # check if additional "," are in command and remove
+                    cmd_index = self._header["cmd"]
+                    while len(row) > header_length:
+                        row[cmd_index] += row.pop(cmd_index + 1)
+                if not row[tme_index]:
+                    row[tme_index] = last_tme
+                self._tme = last_tme
+                position[0] = offset
+                position[1] = line_number
+                position[3] = last_tme
+                yield convert(row)
+        if self.finalize_files:
             self._parser.parsed_data.add(path)
+            parsed_offsets.pop(path, None)
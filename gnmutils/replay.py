@@ -0,0 +1,118 @@
+"""
+This module replays :py:class:`Job`s as a single stream of process and traffic events that is
+ordered by `tme`, e.g. to feed consumers of the GNM stream with archived data.
+"""
+import heapq
+import itertools
+import time
+
+START_EVENT = "start"
+TRAFFIC_EVENT = "traffic"
+EXIT_EVENT = "exit"
+
+# events of the same tme are given in order start, traffic and exit
+_PRIORITIES = {START_EVENT: 0, TRAFFIC_EVENT: 1, EXIT_EVENT: 2}
+
+
+def job_events(job=None):
+    """
+    Generator that returns the events of a single job ordered by `tme`. Processes are started in
+    the order of :py:meth:`Job.processes_in_order` and exit in reverse order, so that children
+    exit before their parents. Traffic needs to be attached to the processes before, e.g. by
+    :py:meth:`Job.prepare_traffic`.
+
+    :param job: job to create events for
+    :return: generator of tuples of tme, kind and event
+    """
+    if job.tree is not None:
+        processes = list(job.processes_in_order())
+    else:
+        processes = sorted(job.processes(), key=lambda process: process.tme)
+    starts = ((process.tme, _PRIORITIES[START_EVENT], index, START_EVENT, process)
+              for index, process in enumerate(processes))
+    exits = sorted((process.exit_tme, _PRIORITIES[EXIT_EVENT], -index, EXIT_EVENT, process)
+                   for index, process in enumerate(processes) if "exit" in process.state)
+    traffics = sorted((traffic.tme, _PRIORITIES[TRAFFIC_EVENT], index, TRAFFIC_EVENT, traffic)
+                      for index, traffic in enumerate(itertools.chain.from_iterable(
+                          process.traffic for process in processes)))
+    for tme, _, _, kind, data in heapq.merge(starts, traffics, exits):
+        if kind == START_EVENT:
+            # the state of the start event is lost as soon as a process has finished
+            yield tme, kind, data.toProcessEvent(state="fork" if "exit" in data.state else None)
+        elif kind == EXIT_EVENT:
+            yield tme, kind, data.toProcessEvent(state="exit")
+        else:
+            yield tme, kind, traffic_event(data)
+
+
+def traffic_event(traffic=None):
+    """
+    Function converts the given traffic into a traffic event.
+
+    :param traffic: traffic to convert
+    :return: traffic event dict
+    :rtype: dict
+    """
+    return {"tme": traffic.tme, "pid": traffic.pid, "ppid": traffic.ppid, "uid": traffic.uid,
+            "gpid": traffic.gpid, "in_rate": traffic.in_rate, "out_rate": traffic.out_rate,
+            "in_cnt": traffic.in_cnt, "out_cnt": traffic.out_cnt, "source_ip": traffic.source_ip,
+            "dest_ip": traffic.dest_ip, "source_port": traffic.source_port,
+            "dest_port": traffic.dest_port, "conn_cat": traffic.conn_cat,
+            "interval": traffic.interval}
+
+
+def replay(jobs=None, speed=None, prepare_traffic=False, interval=20):
+    """
+    Generator that merges the events of the given :py:attr:`jobs` into a single stream ordered
+    by `tme`. Jobs need to be given in order of their `tme`. They are only taken from
+    :py:attr:`jobs` as soon as the stream reaches their start, so only the jobs that are
+    running at the same time are kept in memory. As traffic is recorded for the start of its
+    monitoring :py:attr:`interval`, the traffic of a job may precede the start of the job by up
+    to one interval. Therefore jobs are taken one interval in advance.
+
+    If a :py:attr:`speed` is given, the stream is throttled to replay the events in real time
+    multiplied by the speed, e.g. a speed of 60 replays one hour of monitoring data in one
+    minute.
+
+    :param jobs: iterable of jobs ordered by tme
+    :param speed: factor to speed up real time, defaults to no throttling
+    :param prepare_traffic: if to load the traffic of every job before replaying it
+    :param interval: monitoring interval of traffic
+    :return: generator of tuples of kind and event
+    :raises ValueError: if jobs are not ordered by tme
+    """
+    jobs = iter(jobs)
+    next_job = next(jobs, None)
+    job_count = itertools.count()
+    # heap of the next event of every running job
+    events = []
+    last_tme = None
+    start = None
+    while events or next_job is not None:
+        if next_job is not None and (not events or next_job.tme - interval <= events[0][0]):
+            if prepare_traffic:
+                next_job.prepare_traffic()
+            tme = _push(events, job_events(next_job), next(job_count))
+            if last_tme is not None and tme is not None and tme < last_tme:
+                raise ValueError("job %s starts at %d before last event at %d" % (
+                    next_job.db_id, tme, last_tme))
+            next_job = next(jobs, None)
+            continue
+        tme, _, job_index, kind, event, job_iterator = heapq.heappop(events)
+        _push(events, job_iterator, job_index)
+        if speed:
+            if start is None:
+                start = (time.time(), tme)
+            delay = start[0] + (tme - start[1]) / float(speed) - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        last_tme = tme
+        yield kind, event
+
+
+def _push(events, job_iterator, job_index):
+    # only the next event of every job is on the heap, so the job index is unique
+    for tme, kind, event in job_iterator:
+        heapq.heappush(events, (tme, _PRIORITIES[kind], job_index, kind, event, job_iterator))
+        return tme
+    return None
@@ -46,12 +46,27 @@ class DataSource(object):
     def job_description(self, **kwargs):
         raise NotImplementedError
 
+    def job_index(self, **kwargs):
+        """
+        Method returns a :py:class:`JobIndex` of all jobs of the given run.
+
+        :param workernode: workernode of run
+        :param run: name of run
+        :param path: path of processed data of run
+        :return: index of jobs, `None` if no jobs are known
+        :rtype: :py:class:`JobIndex`
+        """
+        raise NotImplementedError
+
     def traffics(self, **kwargs):
         raise NotImplementedError
 
     def jobs(self, **kwargs):
         raise NotImplementedError
 
+    def jobs_with_traffics(self, **kwargs):
+        raise NotImplementedError
+
     def payloads(self, **kwargs):
         pass
 
@@ -4,10 +4,11 @@ the file system.
 """
 import logging
 import os
+import time
 
 from gnmutils.sources.filedatasource import FileDataSource
-from gnmutils.db.dbobjects import DBJobObject, DBPayloadObject, DBPayloadResultObject, \
-    DBWorkernodeObject
+from gnmutils.jobindex import JobIndex
+from gnmutils.db.dbobjects import DBJobObject, DBPayloadObject, DBPayloadResultObject
 from gnmutils.db.dboperator import DBOperator
 from gnmutils.utils import relevant_directories, directory_level, \
     RUN_LEVEL, WORKERNODE_LEVEL, BASE_LEVEL, FILE_LEVEL
@@ -19,10 +20,25 @@ from utility.exceptions import BasicError, RethrowException
 
 
 class DBBackedFileDataSource(FileDataSource):
-    def __init__(self):
+    """
+    Jobs given to :py:meth:`write_job` are not written at once but queued. As soon as
+    :py:attr:`batch_size` jobs are queued or the oldest queued job has been waiting for
+    :py:attr:`flush_interval` seconds, the queued jobs are saved to the database inside a single
+    transaction and their files are written (see :py:meth:`flush_jobs`). The age of the queue is
+    checked by :py:meth:`write_traffic` as well, so jobs are not kept back by a slow stream of
+    jobs. Remaining jobs are written when calling :py:meth:`close_files`.
+
+    :param int batch_size: maximum number of jobs that are queued
+    :param flush_interval: maximum number of seconds a job is queued
+    """
+    def __init__(self, batch_size=100, flush_interval=10):
         FileDataSource.__init__(self)
         self._db_data_source = DBDataSource(connectionName="default")
         self._db_operator = DBOperator(data_source=self._db_data_source)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._job_queue = []
+        self._queued_since = None
 
     def is_available(self):
         try:
@@ -64,8 +80,8 @@ class DBBackedFileDataSource(FileDataSource):
                     current_path = path
                     if level == BASE_LEVEL:
                         # join different workernodes and runs
-                        workernode_object = self._db_operator.load_one(
-                            data=DBWorkernodeObject(id=job_result.workernode_id)
+                        workernode_object = self._db_operator.load_workernode(
+                            workernode_id=job_result.workernode_id
                         )
                         current_path = os.path.join(os.path.join(path, workernode_object.name),
                                                     job_result.run)
@@ -116,27 +132,128 @@ class DBBackedFileDataSource(FileDataSource):
                 return None
 
     def write_job(self, **kwargs):
-        job = kwargs["data"]
+        """
+        Method queues the job to be written. The id of the job is assigned when the queue is
+        flushed.
+
+        :param path:
+        :param data:
+        :return: the job
+        """
+        self._job_queue.append(kwargs)
+        if self._queued_since is None:
+            self._queued_since = time.time()
+        self._flush_due_jobs()
+        return kwargs["data"]
+
+    def _flush_due_jobs(self):
+        if self._job_queue and (len(self._job_queue) >= self.batch_size or
+                                time.time() - self._queued_since >= self.flush_interval):
+            self.flush_jobs()
+
+    def flush_jobs(self):
+        """
+        Method saves all queued jobs to the database and writes their files. Affiliations of the
+        jobs are created up front, afterwards the jobs are saved inside a single transaction. If
+        this fails, the jobs are saved one by one.
+
+        A job that cannot be saved or written does not stop the remaining jobs from being
+        written. Failed jobs are queued again, so they are retried with the next flush. Jobs that
+        have already been saved keep their database object, so they are updated instead of being
+        saved twice.
+
+        :raises RethrowException: if any of the jobs could not be saved or written, the message
+            names the failed jobs
+        """
+        queue = self._job_queue
+        self._job_queue = []
+        self._queued_since = None
+        if not queue:
+            return
+        jobs = [kwargs["data"] for kwargs in queue]
+        try:
+            self._db_operator.load_or_create_affiliations(uids=[job.uid for job in jobs])
+            job_objects = self._db_operator.save_all(
+                data=[self._queued_job_object(kwargs) for kwargs in queue])
+        except Exception as exception:
+            logging.getLogger(self.__class__.__name__).warning(
+                "saving %d jobs at once failed, saving them one by one (%s)", len(jobs), exception)
+            job_objects = None
+        failed = []
+        for index, kwargs in enumerate(queue):
+            job = kwargs["data"]
+            job_object = None
+            try:
+                if job_objects is None:
+                    job_object = self._db_operator.save_or_update(
+                        data=self._queued_job_object(kwargs))
+                else:
+                    job_object = job_objects[index]
+                job.db_id = job_object.id_value
+                FileDataSource.write_job(self, **kwargs)
+            except Exception as exception:
+                logging.getLogger(self.__class__.__name__).error(
+                    "job (gpid=%s, tme=%s) could not be created (%s)", job.gpid, job.tme,
+                    exception)
+                if job_object is not None:
+                    kwargs = dict(kwargs, job_object=job_object)
+                failed.append(kwargs)
+            else:
+                logging.getLogger(self.__class__.__name__).debug(
+                    "saved job for index %s", job_object.id_value
+                )
+        if failed:
+            self._job_queue[:0] = failed
+            self._queued_since = time.time()
+            failed_jobs = ", ".join(
+                "%s (gpid=%s, tme=%s)" % (kwargs["data"].db_id, kwargs["data"].gpid,
+                                          kwargs["data"].tme) for kwargs in failed)
+            logging.getLogger(self.__class__.__name__).warning(
+                "queued jobs %s again", failed_jobs)
+            raise RethrowException("%d of %d jobs could not be created: %s" % (
+                len(failed), len(queue), failed_jobs))
+
+    def _queued_job_object(self, kwargs):
+        # jobs that have been queued again after saving them keep their database object
+        job_object = kwargs.get("job_object", None)
+        if job_object is None:
+            job_object = self._job_object(kwargs["data"])
+        return job_object
+
+    def _job_object(self, job=None):
         workernode_object = self._db_operator.load_or_create_workernode(data=job.workernode)
         configuration_object = self._db_operator.load_or_create_configuration(
             data=job.configuration
         )
-        job_object = DBJobObject(
+        return DBJobObject(
             job_id=job.job_id, run=job.run, uid=job.uid, gpid=job.gpid, tme=job.tme,
             exit_tme=job.exit_tme, workernode_id=workernode_object.id_value,
             configuration_id=configuration_object.id_value, valid=job.is_valid(),
             last_tme=job.last_tme, completed=job.is_complete())
-        try:
-            self._db_operator.save_or_update(data=job_object)
-            job.db_id = job_object.id_value
-            FileDataSource.write_job(self, **kwargs)
-        except:
-            raise RethrowException("The job could not be created")
-        else:
-            logging.getLogger(self.__class__.__name__).debug(
-                "saved job for index %s", job_object.id_value
-            )
-            return job
+
+    def write_traffic(self, **kwargs):
+        """
+        Method appends the traffic to the traffic file of its job. If the job is still queued,
+        the queue is flushed first to assign the id of the job. Otherwise the queue is flushed
+        afterwards if its jobs are due (see :py:meth:`write_job`).
+
+        :param path:
+        :param data:
+        """
+        traffic = kwargs.get("data", None)
+        if traffic.get("id", None) is None and traffic.get("job", None) is not None:
+            self.flush_jobs()
+            traffic["id"] = traffic["job"].db_id
+        FileDataSource.write_traffic(self, **kwargs)
+        self._flush_due_jobs()
+
+    def close_files(self):
+        """
+        Method writes all queued jobs and closes all files that are currently kept open for
+        writing.
+        """
+        self.flush_jobs()
+        FileDataSource.close_files(self)
 
     def write_payload(self, **kwargs):
         """
@@ -208,3 +325,22 @@ class DBBackedFileDataSource(FileDataSource):
             job.db_id = job_object.id_value
             job.last_tme = max(job_object.exit_tme, job_object.last_tme)
         return job
+
+    def job_index(self, **kwargs):
+        """
+        Method loads the jobs of the given run from the database into a :py:class:`JobIndex`.
+        Jobs that are still queued are written to the database first.
+
+        :param workernode: workernode of run
+        :param run: name of run
+        :return: index of jobs
+        :rtype: :py:class:`JobIndex`
+        """
+        self.flush_jobs()
+        workernode_object = self._db_operator.load_or_create_workernode(
+            data=kwargs.get("workernode", None))
+        job_objects = self._db_operator.load_jobs(run=kwargs.get("run", None),
+                                                  workernode_id=workernode_object.id_value)
+        return JobIndex((job_object.gpid, job_object.tme,
+                         max(job_object.exit_tme, job_object.last_tme), job_object.id_value)
+                        for job_object in job_objects)
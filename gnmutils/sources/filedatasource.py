@@ -11,16 +11,24 @@ import logging
 import sys
 
 from gnmutils.sources.datasource import DataSource
+from gnmutils.checkpoint import Checkpoint, checkpoint_entries, restore
+from gnmutils.catalog import JobCatalog, JobSummary, job_matches
+from gnmutils.jobindex import JobIndex
 from gnmutils.reader.csvreader import CSVReader
+from gnmutils.writer.csvwriter import CSVWriter
+from gnmutils.reader.csvindex import CSVIndex
+from gnmutils.objects.lazytraffic import TrafficLoader
+from gnmutils.objects.process import Process
+from gnmutils.objects.traffic import Traffic
 from gnmutils.parser.jobparser import JobParser
 from gnmutils.parser.processstreamparser import ProcessStreamParser
 from gnmutils.parser.trafficstreamparser import TrafficStreamParser
+from gnmutils.parser.jobtrafficstreamparser import JobTrafficStreamParser
 from gnmutils.parser.trafficparser import TrafficParser
 from gnmutils.parser.networkstatisticsparser import NetworkStatisticsParser
 from gnmutils.utils import relevant_directories
 from gnmutils.exceptions import FilePathException
 from gnmutils.utility import path as pathutils
-from gnmutils.utility import csv as csvutils
 
 
 class FileDataSource(DataSource):
@@ -31,17 +39,45 @@ class FileDataSource(DataSource):
     """
     default_path = None
 
+    def __init__(self):
+        self._writer = CSVWriter()
+        self._checkpoints = {}
+        # files appended to whose index is updated when closing files
+        self._appended_paths = set()
+        self._catalogs = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_checkpoints"] = {}
+        state["_catalogs"] = {}
+        return state
+
+    def __setstate__(self, state):
+        # data sources that have been archived before might miss current attributes
+        FileDataSource.__init__(self)
+        self.__dict__.update(state)
+
     def is_available(self):
         return True
 
     def object_data(self, path, **kwargs):
         """
+        Method yields object data that has been written by :py:meth:`write_object_data`. If a
+        checkpoint exists for the given pattern, the data is restored from the checkpoint.
+
         :param path:
         :param pattern:
         :return:
         """
         pattern = kwargs.get("pattern", None)
         if pattern is not None:
+            checkpoint = self._checkpoint(path=path, name=os.path.splitext(pattern)[0])
+            if checkpoint.kind is not None:
+                logging.getLogger(self.__class__.__name__).debug(
+                    "reading %s for object data", checkpoint.path
+                )
+                yield restore(checkpoint)
+                return
             try:
                 file_path = os.path.join(
                     path,
@@ -64,6 +100,10 @@ class FileDataSource(DataSource):
 
     def write_object_data(self, **kwargs):
         """
+        Method writes object data. Caches and sets are written incrementally to a checkpoint
+        (`<name>.ckpt`), so that only changes since the last call are written. Other objects are
+        pickled.
+
         :param path:
         :param data:
         :param name:
@@ -71,10 +111,29 @@ class FileDataSource(DataSource):
         """
         object_data = kwargs.get("data", None)
         path = pathutils.ensureDirectory(kwargs.get("path", self.default_path))
-        with open("%s/%s.pkl" % (path,
-                                 kwargs.get("name", "object_data")), "w+") as data_file:
+        name = kwargs.get("name", "object_data")
+        checkpoint = self._checkpoint(path=path, name=name)
+        entries = checkpoint_entries(object_data, checkpoint=checkpoint)
+        if entries is not None:
+            kind, entries, unchanged = entries
+            checkpoint.update(entries=entries, kind=kind, unchanged=unchanged)
+            # remove formerly pickled data that is replaced by checkpoint
+            pickle_path = os.path.join(path, "%s.pkl" % name)
+            if os.path.exists(pickle_path):
+                os.remove(pickle_path)
+            return
+        with open("%s/%s.pkl" % (path, name), "wb") as data_file:
             pickle.dump(object_data, data_file)
 
+    def _checkpoint(self, path=None, name=None):
+        checkpoint_path = os.path.join(path, "%s.ckpt" % name)
+        try:
+            return self._checkpoints[checkpoint_path]
+        except KeyError:
+            checkpoint = Checkpoint(path=checkpoint_path)
+            self._checkpoints[checkpoint_path] = checkpoint
+            return checkpoint
+
     def traffic(self, **kwargs):
         """
         :param path:
@@ -95,6 +154,10 @@ class FileDataSource(DataSource):
         :param data_path:
         :param source:
         :param stateful:
+        :param follow: follow growing raw data, see :py:meth:`_read_stream`
+        :param poll_interval:
+        :param idle_timeout:
+        :param archive_interval: seconds between archiving the state, see :py:meth:`_read_stream`
         :return:
         """
         path = kwargs.get("path", self.default_path)
@@ -102,62 +165,90 @@ class FileDataSource(DataSource):
             pass
         else:
             # convert raw data
-            for base_path, workernode, run, _ in relevant_directories(path=path):
+            for base_path, workernode, run, _ in self._stream_directories(
+                    path=path, follow=kwargs.get("follow", False),
+                    idle_timeout=kwargs.get("idle_timeout", None)):
                 current_path = os.path.join(os.path.join(base_path, workernode), run)
+                data_path = os.path.join(os.path.join(
+                    kwargs.get("data_path", self.default_path), workernode), run)
                 converter = CSVReader()
                 parser = TrafficStreamParser(
                     workernode=workernode,
                     run=run,
                     data_source=self,
                     path=current_path,
+                    data_path=data_path,
                     data_reader=converter
                 )
                 converter.parser = parser
                 for traffic in self._read_stream(
                         path=current_path,
-                        data_path=os.path.join(os.path.join(
-                            kwargs.get("data_path", self.default_path), workernode), run),
+                        data_path=data_path,
                         workernode=workernode,
                         run=run,
                         stateful=kwargs.get("stateful", False),
                         pattern="^[0-9]{10}-traffic.log-[0-9]{8}",
-                        converter=converter
+                        converter=converter,
+                        follow=kwargs.get("follow", False),
+                        poll_interval=kwargs.get("poll_interval", 10),
+                        idle_timeout=kwargs.get("idle_timeout", None),
+                        archive_interval=kwargs.get("archive_interval", 60)
                 ):
                     yield traffic
 
     def jobs(self, **kwargs):
         """
+        For processed data, jobs can be selected by the criteria of :py:meth:`JobSummary.matches`
+        (`valid`, `complete`, `uid`, `start` and `end`). Jobs whose summary in the
+        :py:class:`JobCatalog` of their run does not match are skipped without reading their
+        files. Other jobs are read and checked afterwards. As only valid and complete jobs can be
+        read, `None` is not given out when selecting jobs.
+
         :param path:
         :param source:
         :param pattern:
         :param stateful:
+        :param follow: follow growing raw data, see :py:meth:`_read_stream`
+        :param poll_interval:
+        :param idle_timeout:
+        :param archive_interval: seconds between archiving the state, see :py:meth:`_read_stream`
+        :param valid: if jobs are valid
+        :param complete: if jobs are complete
+        :param uid: uid of jobs
+        :param start: start of time window jobs have been running in
+        :param end: end of time window jobs have been running in
         :return:
         """
         path = kwargs.get("path", self.default_path)
         if "processed" in kwargs.get("source", "processed"):
             converter = CSVReader()
+            criteria = dict((key, kwargs[key]) for key in ("valid", "complete", "uid", "start",
+                                                           "end") if kwargs.get(key) is not None)
             for base_path, workernode, run, filename in relevant_directories(path=path):
                 current_path = os.path.join(os.path.join(base_path, workernode), run)
                 if filename:
+                    names = [filename]
+                else:
+                    names = []
+                    for dir_entry in sorted(os.listdir(current_path)):
+                        matches = re.match(kwargs.get("pattern", "(\d*)-process.csv$"), dir_entry)
+                        if matches:
+                            names.append(matches.group(1))
+                for name in names:
+                    if criteria and self._skip_job(path=current_path, name=name, **criteria):
+                        continue
                     for job in self.read_job(
                         path=current_path,
-                        name=filename,
+                        name=name,
                         converter=converter
                     ):
-                        yield job
-                else:
-                    for dir_entry in sorted(os.listdir(current_path)):
-                        matches = re.match(kwargs.get("pattern", "(\d*)-process.csv"), dir_entry)
-                        if matches:
-                            for job in self.read_job(
-                                path=current_path,
-                                name=matches.group(1),
-                                converter=converter
-                            ):
-                                yield job
+                        if not criteria or job_matches(job, **criteria):
+                            yield job
         else:
             # convert raw data
-            for base_path, workernode, run, _ in relevant_directories(path=path):
+            for base_path, workernode, run, _ in self._stream_directories(
+                    path=path, follow=kwargs.get("follow", False),
+                    idle_timeout=kwargs.get("idle_timeout", None)):
                 current_path = os.path.join(os.path.join(base_path, workernode), run)
                 converter = CSVReader()
                 parser = ProcessStreamParser(
@@ -175,10 +266,132 @@ class FileDataSource(DataSource):
                         run=run,
                         stateful=kwargs.get("stateful", False),
                         pattern="^[0-9]{10}-process.log-[0-9]{8}",
-                        converter=converter
+                        converter=converter,
+                        follow=kwargs.get("follow", False),
+                        poll_interval=kwargs.get("poll_interval", 10),
+                        idle_timeout=kwargs.get("idle_timeout", None),
+                        archive_interval=kwargs.get("archive_interval", 60)
                 ):
                     yield job
 
+    def job_catalog(self, path=None):
+        """
+        Method returns the :py:class:`JobCatalog` of the given run.
+
+        :param path: path of run
+        :return: catalog of run
+        :rtype: :py:class:`JobCatalog`
+        """
+        try:
+            return self._catalogs[path]
+        except KeyError:
+            catalog = JobCatalog(path=path)
+            self._catalogs[path] = catalog
+            return catalog
+
+    def job_index(self, **kwargs):
+        """
+        Method returns a :py:class:`JobIndex` of the jobs in the :py:class:`JobCatalog` of the
+        given run.
+
+        :param path: path of processed data of run
+        :return: index of jobs, `None` if no jobs are known
+        :rtype: :py:class:`JobIndex`
+        """
+        path = kwargs.get("path", None)
+        if path is None:
+            return None
+        catalog = self.job_catalog(path=path)
+        if not len(catalog):
+            return None
+        return JobIndex((summary.gpid, summary.tme,
+                         max(summary.exit_tme or 0, summary.last_tme or 0), summary.id)
+                        for summary in catalog.summaries.values())
+
+    def _skip_job(self, path=None, name=None, **kwargs):
+        """
+        Method checks if the job :py:attr:`name` inside :py:attr:`path` does not match the given
+        criteria according to the catalog of the run. Jobs whose process file has been changed
+        since they have been summarized are not skipped.
+
+        :param path: path of run
+        :param name: name of job
+        :return: true if job does not match, false if it needs to be read
+        """
+        summary = self.job_catalog(path=path).get(name)
+        if summary is None:
+            return False
+        try:
+            process_size = os.path.getsize(os.path.join(path, "%s-process.csv" % name))
+        except OSError:
+            return False
+        return process_size == summary.process_size and not summary.matches(**kwargs)
+
+    def _update_catalog(self, path=None, job=None):
+        """
+        Method updates the summary of the given job that has been written into the run at
+        :py:attr:`path`.
+
+        :param path: path of run
+        :param job: job that has been written
+        """
+        sizes = []
+        for kind in ("process", "traffic"):
+            file_path = os.path.join(path, "%s-%s.csv" % (job.db_id, kind))
+            # traffic might still be buffered by the writer
+            self._writer.flush(path=file_path)
+            try:
+                sizes.append(os.path.getsize(file_path))
+            except OSError:
+                sizes.append(0)
+        self.job_catalog(path=path).update(
+            JobSummary.from_job(job, process_size=sizes[0], traffic_size=sizes[1]))
+
+    def jobs_with_traffics(self, **kwargs):
+        """
+        Method splits the raw process and traffic stream in a single pass. Finished jobs are
+        given out as :py:class:`Job`s, traffic is given out as dictionary that can be written
+        by :py:meth:`write_traffic`. The traffic of a job is always given out after the job
+        itself.
+
+        :param path:
+        :param data_path:
+        :param stateful:
+        :param follow: follow growing raw data, see :py:meth:`_read_stream`
+        :param poll_interval:
+        :param idle_timeout:
+        :param archive_interval: seconds between archiving the state, see :py:meth:`_read_stream`
+        :return:
+        """
+        path = kwargs.get("path", self.default_path)
+        for base_path, workernode, run, _ in self._stream_directories(
+                path=path, follow=kwargs.get("follow", False),
+                idle_timeout=kwargs.get("idle_timeout", None)):
+            current_path = os.path.join(os.path.join(base_path, workernode), run)
+            data_path = os.path.join(os.path.join(
+                kwargs.get("data_path", self.default_path), workernode), run)
+            parser = JobTrafficStreamParser(
+                workernode=workernode,
+                run=run,
+                data_source=self,
+                path=current_path,
+                data_path=data_path
+            )
+            for data in self._read_stream(
+                    path=current_path,
+                    data_path=data_path,
+                    workernode=workernode,
+                    run=run,
+                    stateful=kwargs.get("stateful", False),
+                    pattern="^[0-9]{10}-(process|traffic).log-[0-9]{8}",
+                    parser=parser,
+                    follow=kwargs.get("follow", False),
+                    poll_interval=kwargs.get("poll_interval", 10),
+                    idle_timeout=kwargs.get("idle_timeout", None),
+                    archive_interval=kwargs.get("archive_interval", 60)
+            ):
+                yield data
+
     def network_statistics(self, **kwargs):
         """
         :param path:
@@ -209,39 +422,39 @@ class FileDataSource(DataSource):
 
     def write_traffic(self, **kwargs):
         """
+        Method appends the traffic to the traffic file of its job. The file is kept open until
+        :py:meth:`close_files` is called.
+
         :param path:
         :param data:
         :return:
         """
         traffic = kwargs.get("data", None)
-        path = pathutils.ensureDirectory(kwargs.get("path", self.default_path))
+        path = kwargs.get("path", self.default_path)
         base_path = os.path.join(os.path.join(path, traffic["workernode"]), traffic["run"])
-        pathutils.ensureDirectory(base_path)
-        with open(os.path.join(
-            base_path, "%s-traffic.csv" % traffic["id"]
-        ), "a") as traffic_file:
-            comment_string = "# Created by %s (%s) on %s" % (
-                self.__class__.__name__,
-                inspect.currentframe().f_code.co_name,
-                time.strftime("%Y%m%d")
+        comment_string = "# Created by %s (%s) on %s" % (
+            self.__class__.__name__,
+            inspect.currentframe().f_code.co_name,
+            time.strftime("%Y%m%d")
+        )
+        if traffic["configuration"] is not None:
+            header_data = "%s\n%s\n%s" % (
+                comment_string,
+                traffic["configuration"].getRow(),
+                traffic["data"][0].getHeader()
             )
-            if traffic["configuration"] is not None:
-                header_data = "%s\n%s\n%s" % (
-                    comment_string,
-                    traffic["configuration"].getRow(),
-                    traffic["data"][0].getHeader()
-                )
-            else:
-                header_data = "%s\n%s" % (
-                    comment_string,
-                    traffic["data"][0].getHeader()
-                )
-            for traffic_data in traffic["data"]:
-                csvutils.dumpToFile(
-                    file=traffic_file,
-                    data="%s" % traffic_data.getRow(),
-                    header="%s" % header_data
-                )
+        else:
+            header_data = "%s\n%s" % (
+                comment_string,
+                traffic["data"][0].getHeader()
+            )
+        traffic_path = os.path.join(base_path, "%s-traffic.csv" % traffic["id"])
+        self._writer.append(
+            path=traffic_path,
+            rows=[traffic_data.getRow() for traffic_data in traffic["data"]],
+            header=header_data
+        )
+        self._appended_paths.add(traffic_path)
 
     def write_job(self, **kwargs):
         """
@@ -251,24 +464,71 @@ class FileDataSource(DataSource):
         """
         job = kwargs.get("data", None)
         # TODO: ensure that this is a base path!
-        path = pathutils.ensureDirectory(kwargs.get("path", self.default_path))
+        path = kwargs.get("path", self.default_path)
         base_path = os.path.join(os.path.join(path, job.workernode), job.run)
-        pathutils.ensureDirectory(base_path)
-        with open(os.path.join(base_path, "%s-process.csv" % job.db_id), "w") as job_file:
-            header_initialized = False
-            for process in job.processes():
-                if not header_initialized:
-                    # write header
-                    comment_string = "# Created by %s (%s) on %s" % (
-                        self.__class__.__name__,
-                        inspect.currentframe().f_code.co_name,
-                        time.strftime("%Y%m%d")
-                    )
-                    job_file.write("%s\n" % comment_string)
-                    job_file.write("%s\n" % job.configuration.getRow())
-                    job_file.write("%s\n" % process.getHeader())
-                    header_initialized = True
-                job_file.write("%s\n" % process.getRow())
+        processes = list(job.processes())
+        if not processes:
+            header_data = None
+        else:
+            comment_string = "# Created by %s (%s) on %s" % (
+                self.__class__.__name__,
+                inspect.currentframe().f_code.co_name,
+                time.strftime("%Y%m%d")
+            )
+            header_data = "%s\n%s\n%s" % (
+                comment_string,
+                job.configuration.getRow(),
+                processes[0].getHeader()
+            )
+        process_path = os.path.join(base_path, "%s-process.csv" % job.db_id)
+        self._writer.write(
+            path=process_path,
+            rows=[process.getRow() for process in processes],
+            header=header_data
+        )
+        self._write_index(path=process_path)
+        self._update_catalog(path=base_path, job=job)
+
+    def close_files(self):
+        """
+        Method that writes and closes all files that are currently kept open for writing. The
+        index of every file that has been appended to is updated, as well as the size of the file
+        in the catalog of its run.
+        """
+        self._writer.close()
+        summaries = {}
+        while self._appended_paths:
+            traffic_path = self._appended_paths.pop()
+            index = CSVIndex.for_file(path=traffic_path, persist=True)
+            run_path, file_name = os.path.split(traffic_path)
+            summary = self.job_catalog(path=run_path).get(file_name[:-len("-traffic.csv")])
+            if summary is not None:
+                summaries.setdefault(run_path, []).append(
+                    summary.with_sizes(traffic_size=index.size))
+        for run_path, run_summaries in summaries.items():
+            self.job_catalog(path=run_path).update_all(summaries=run_summaries)
+
+    @staticmethod
+    def _write_index(path=None):
+        """
+        Method writes the index of a file that has been (re)written (see :py:class:`CSVIndex`).
+
+        :param path: path of file
+        """
+        CSVIndex.from_file(path=path).save()
+
+    @staticmethod
+    def _remove_index(path=None):
+        """
+        Method removes the index of a file that has been removed, so that it is not taken for
+        a file of the same name that is written later.
+
+        :param path: path of file
+        """
+        try:
+            os.remove(CSVIndex.sidecar_path(path))
+        except OSError:
+            pass
 
     def write_payload(self, **kwargs):
         self._write_payload(**kwargs)
@@ -279,26 +539,118 @@ class FileDataSource(DataSource):
         )
 
     def _read_stream(self, path=None, data_path=None, workernode=None, run=None,
-                     converter=CSVReader(), stateful=False, pattern=None):
+                     converter=None, stateful=False, pattern=None, parser=None,
+                     follow=False, poll_interval=10, idle_timeout=None, archive_interval=60):
         """
+        Method parses all files in :py:attr:`path` matching :py:attr:`pattern` and yields the
+        data given out by the parser.
+
+        In follow mode, the directory is polled every :py:attr:`poll_interval` seconds for new
+        and growing files. Those are parsed from the position they have been read to before, so
+        finished data is given out as soon as it has been written to the log files. Files are
+        not marked as parsed then, as they might still grow. The state is archived after every
+        change if :py:attr:`stateful` is given. Following stops when no file has changed for
+        :py:attr:`idle_timeout` seconds, by default it never stops.
+
+        If :py:attr:`stateful` is given, the state is also archived after every file and at
+        least every :py:attr:`archive_interval` seconds while data is given out, so that an
+        interrupted run continues from the position files have been parsed to. Data that has
+        been given out is expected to be written before the next data is requested.
+
         :param path:
         :param data_path:
         :param workernode:
         :param run:
-        :param converter:
+        :param converter: reader to use if no :py:attr:`parser` is given
         :param stateful:
         :param pattern:
+        :param parser: parser to use, defaults to the parser of converter
+        :param follow: follow the files of the directory, defaults to `False`
+        :param poll_interval: seconds to wait between checks for changes when following
+        :param idle_timeout: seconds without changes to stop following, defaults to `None`
+        :param archive_interval: seconds between archiving the state while reading, defaults
+            to 60
         :return:
         """
-        for dir_entry in sorted(os.listdir(path)):
-            if re.match(pattern, dir_entry):
-                for data_object in converter.parser.parse(path=os.path.join(path, dir_entry)):
-                    yield data_object
-        converter.parser.check_caches(path=data_path)
-        for data in converter.parser.pop_data():
-            yield data
+        if parser is None:
+            parser = converter.parser
+        if follow:
+            for data_reader in parser.data_readers:
+                data_reader.finalize_files = False
+        # size of files when they have been parsed last time
+        sizes = {}
+        idle_since = archived_at = time.time()
+        try:
+            while True:
+                changed = False
+                for dir_entry in sorted(os.listdir(path)):
+                    if re.match(pattern, dir_entry):
+                        file_path = os.path.join(path, dir_entry)
+                        size = os.path.getsize(file_path)
+                        if sizes.get(file_path, None) == size:
+                            continue
+                        sizes[file_path] = size
+                        changed = True
+                        for data_object in parser.parse(path=file_path, records=True):
+                            yield data_object
+                            if stateful and time.time() - archived_at >= archive_interval:
+                                self._archive_stream_state(parser=parser, path=path)
+                                archived_at = time.time()
+                        if stateful and not follow:
+                            self._archive_stream_state(parser=parser, path=path)
+                            archived_at = time.time()
+                if not follow:
+                    break
+                if changed:
+                    idle_since = time.time()
+                    if stateful:
+                        self._archive_stream_state(parser=parser, path=path)
+                        archived_at = time.time()
+                elif idle_timeout is not None and time.time() - idle_since >= idle_timeout:
+                    break
+                # ensure that data that has been written so far is on disk
+                self.close_files()
+                time.sleep(poll_interval)
+            parser.check_caches(path=data_path)
+            for data in parser.pop_data():
+                yield data
+        finally:
+            # ensure that data written while streaming is on disk
+            self.close_files()
         if stateful:
-            converter.parser.archive_state(path=path)
+            parser.archive_state(path=path)
+
+    @staticmethod
+    def _stream_directories(path=None, follow=False, idle_timeout=None):
+        """
+        Method returns the run directories whose raw data is streamed (see
+        :py:func:`relevant_directories`). Runs are read one after the other, so following
+        several runs requires an :py:attr:`idle_timeout`, otherwise only the first run would be
+        followed.
+
+        :param path: path to stream raw data from
+        :param follow: if the raw data is followed
+        :param idle_timeout: seconds without changes to stop following
+        :return: list of tuples of base path, workernode, run and file name
+        :raises ValueError: if several runs are followed without idle_timeout
+        """
+        directories = list(relevant_directories(path=path))
+        if follow and idle_timeout is None and len(directories) > 1:
+            raise ValueError("following %d runs in %s requires an idle_timeout" % (
+                len(directories), path))
+        return directories
+
+    def _archive_stream_state(self, parser=None, path=None):
+        """
+        Method archives the state of :py:attr:`parser` while reading a stream. Data that has been
+        given out so far is written to disk first, so that the archived positions never point
+        behind data that has not been written.
+
+        :param parser: parser whose state is archived
+        :param path: path to archive state to
+        """
+        self.close_files()
+        parser.archive_state(path=path)
 
     def read_job(self, **kwargs):
         """
@@ -322,20 +674,73 @@ class FileDataSource(DataSource):
             return parser.parse(path=os.path.join(path, name))
         return parser.parse(path=os.path.join(path, "%s-process.csv" % name))
 
-    def read_traffic(self, path, name, converter=CSVReader()):
+    def read_traffic(self, path, name, converter=CSVReader(), pid=None, start=None, end=None):
         """
+        If a :py:attr:`pid`, :py:attr:`start` or :py:attr:`end` is given, only the traffic of
+        the pid whose tme is between start and end is read by seeking to its rows (see
+        :py:class:`CSVIndex`).
+
         :param path:
         :param name:
         :param converter:
-        :return:
+        :param pid: pid of traffic to read
+        :param start: minimum tme of traffic to read
+        :param end: maximum tme of traffic to read
+        :return: generator of lists of traffic
         """
+        try:
+            file_path = os.path.join(path, "%s-traffic.csv" % name)
+        except AttributeError:
+            raise FilePathException(value="path=%s, name=%s" % (path, name))
+        if pid is not None or start is not None or end is not None:
+            return iter([self._read_rows(
+                path=file_path, object_type=Traffic, pid=pid, start=start, end=end)])
         parser = TrafficParser(data_reader=converter)
         converter.parser = parser
+        return parser.parse(path=file_path)
+
+    def read_processes(self, path, name, pid=None, start=None, end=None):
+        """
+        Method reads the processes of the job :py:attr:`name` inside :py:attr:`path` without
+        building the job. Only the processes of the given :py:attr:`pid` that have been started
+        between :py:attr:`start` and :py:attr:`end` are read by seeking to their rows (see
+        :py:class:`CSVIndex`).
+
+        :param path: path of process file
+        :param name: name of job
+        :param pid: pid of processes to read
+        :param start: minimum tme of processes to read
+        :param end: maximum tme of processes to read
+        :return: list of processes
+        """
+        try:
+            file_path = os.path.join(path, "%s-process.csv" % name)
+        except AttributeError:
+            raise FilePathException(value="path=%s, name=%s" % (path, name))
+        return self._read_rows(path=file_path, object_type=Process, pid=pid, start=start, end=end)
+
+    @staticmethod
+    def _read_rows(path=None, object_type=None, pid=None, start=None, end=None):
+        index = CSVIndex.for_file(path=path)
+        return [object_type(**data) for data in index.read(
+            rows=index.select(pid=pid, start=start, end=end))]
+
+    def traffic_loader(self, path, name, max_rows=None):
+        """
+        Method returns a loader for the traffic of the job :py:attr:`name` inside
+        :py:attr:`path` that reads traffic on demand.
+
+        :param path: path of traffic file
+        :param name: name of job
+        :param max_rows: maximum number of traffic kept in memory
+        :return: traffic loader
+        :rtype: :py:class:`TrafficLoader`
+        """
         try:
             file_path = os.path.join(path, "%s-traffic.csv" % name)
         except AttributeError:
             raise FilePathException(value="path=%s, name=%s" % (path, name))
-        return parser.parse(path=file_path)
+        return TrafficLoader(path=file_path, max_rows=max_rows)
 
     def _write_payload(self, **kwargs):
         """
@@ -380,6 +785,9 @@ class FileDataSource(DataSource):
                         traffic_file.write("%s\n" % comment_string)
                         traffic_file.write("%s\n" % traffic.getHeader())
                     traffic_file.write("%s\n" % traffic.getRow())
+        self._write_index(path=process_file.name)
+        self._write_index(path=traffic_file.name)
+        self._update_catalog(path=current_path, job=payload)
 
     def write_network_statistics(self, **kwargs):
         network_statistics = kwargs.get("data", None)
@@ -404,6 +812,10 @@ class FileDataSource(DataSource):
 
     def archive(self, **kwargs):
         """
+        Method moves the process and traffic file of a job into the zip archive of its run.
+        Files that are still kept open for writing are closed first. The job is removed from
+        the catalog of the run.
+
         :param path:
         :param data:
         :param name:
@@ -413,17 +825,22 @@ class FileDataSource(DataSource):
         current_path = os.path.join(os.path.join(path, job.workernode), job.run)
         name = "%s.zip" % kwargs.get("name", "jobarchive")
         archive_path = os.path.join(current_path, name)
+        process_source = os.path.join(current_path, "%s-process.csv" % job.db_id)
+        traffic_source = os.path.join(current_path, "%s-traffic.csv" % job.db_id)
+        for source in (process_source, traffic_source):
+            self._writer.close(path=source)
+            self._appended_paths.discard(source)
         try:
             with zipfile.ZipFile(archive_path, mode="a", allowZip64=True) as zip_file:
-                process_source = os.path.join(current_path, "%s-process.csv" % job.db_id)
-                traffic_source = os.path.join(current_path, "%s-traffic.csv" % job.db_id)
                 if os.path.isfile(process_source) and \
                         os.path.isfile(traffic_source):
                     zip_file.write(process_source, os.path.basename(process_source))
                     zip_file.write(traffic_source, os.path.basename(traffic_source))
                 if zip_file.testzip() is None:
-                    os.remove(process_source)
-                    os.remove(traffic_source)
+                    for source in (process_source, traffic_source):
+                        os.remove(source)
+                        self._remove_index(path=source)
+                    self.job_catalog(path=current_path).remove(job_ids=[job.db_id])
                 else:
                     logging.getLogger(self.__class__.__name__).critical(
                         "something is wrong with zipfile %s for file %s",
@@ -0,0 +1,120 @@
+"""
+This module computes the metrics of a :py:class:`TreeFeature` for the process trees of jobs.
+Metrics are derived from the arrays of a :py:class:`FrozenTree`, so the tree of every job is only
+traversed once. If NumPy is available, the arrays are processed vectorized.
+"""
+import collections
+import logging
+import multiprocessing
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from gnmutils.sources.filedatasource import FileDataSource
+from gnmutils.treefeature import TreeFeature
+from gnmutils.utils import relevant_directories
+
+COLUMNS = ("id", "degrees", "height", "count", "leaves", "uid")
+
+
+def tree_metrics(tree=None):
+    """
+    Function computes the degrees, height, count and leaves of the given tree. The degrees are
+    the number of children of every process in pre-order.
+
+    :param tree: frozen tree
+    :type tree: :py:class:`FrozenTree`
+    :return: tuple of degrees, height, count and leaves
+    """
+    count = len(tree)
+    if numpy is not None and count > 0:
+        degrees = numpy.bincount(
+            numpy.frombuffer(tree.parents, dtype=numpy.intc)[1:], minlength=count)
+        depths = numpy.frombuffer(tree.depths, dtype=numpy.intc)
+        return (degrees.tolist(), int(depths.max() - depths[0]), count,
+                int(numpy.count_nonzero(degrees == 0)))
+    degrees = tree.degrees()
+    return degrees.tolist(), tree.height, count, degrees.count(0)
+
+
+def tree_feature(job=None):
+    """
+    Function creates the :py:class:`TreeFeature` of the given job.
+
+    :param job: job to create feature for
+    :return: feature of job, `None` if the tree of the job cannot be generated
+    :rtype: :py:class:`TreeFeature`
+    """
+    tree = job.tree
+    if tree is None:
+        return None
+    degrees, height, count, leaves = tree_metrics(tree.freeze())
+    return TreeFeature(id=job.db_id, degrees=degrees, height=height, count=count, leaves=leaves,
+                       uid=job.uid)
+
+
+def metrics_table(jobs=None):
+    """
+    Function computes the metrics for all given jobs and returns them as a table of columns.
+    Every column is a list, the columns are named as in :py:attr:`COLUMNS`. Jobs without a
+    valid tree are skipped.
+
+    :param jobs: iterable of jobs
+    :return: dictionary of column names and their values
+    :rtype: collections.OrderedDict
+    """
+    table = collections.OrderedDict((column, []) for column in COLUMNS)
+    columns = [(table[column], column) for column in COLUMNS]
+    for job in jobs:
+        feature = tree_feature(job)
+        if feature is None:
+            logging.getLogger(__name__).info("skipping job %s without tree", job.db_id)
+            continue
+        for values, column in columns:
+            values.append(getattr(feature, column))
+    return table
+
+
+def run_metrics_table(path=None, processes=1, **kwargs):
+    """
+    Function computes the metrics for the jobs of all runs inside given :py:attr:`path`. Jobs
+    are read by :py:meth:`FileDataSource.jobs` with the additional arguments given. Runs are
+    processed in parallel on :py:attr:`processes` cores, the tables of the runs are joined in
+    order of the runs.
+
+    :param path: path to search runs in
+    :param processes: number of cores to use
+    :return: dictionary of column names and their values
+    :rtype: collections.OrderedDict
+    """
+    work_units = [(os.path.join(base_path, workernode, run), kwargs)
+                  for base_path, workernode, run, _ in relevant_directories(path=path)]
+    table = collections.OrderedDict((column, []) for column in COLUMNS)
+    if processes > 1 and len(work_units) > 1:
+        pool = multiprocessing.Pool(processes=processes)
+        try:
+            for run_table in pool.imap(_run_metrics_table, work_units):
+                _extend(table, run_table)
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    else:
+        for work_unit in work_units:
+            _extend(table, _run_metrics_table(work_unit))
+    return table
+
+
+def _run_metrics_table(work_unit):
+    path, kwargs = work_unit
+    return metrics_table(FileDataSource().jobs(path=path, **kwargs))
+
+
+def _extend(table, other_table):
+    for column in COLUMNS:
+        table[column].extend(other_table[column])
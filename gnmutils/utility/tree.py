@@ -1,3 +1,7 @@
+import array
+import collections
+
+
 class Node(object):
     def __init__(self, value=None, children=False, parent=None):
         self.value = value
@@ -47,25 +51,45 @@ class Tree(object):
 
     def walkBFS(self, node=None, stopCriteria=lambda n, d: False):
         if node is None: node = self.root
-        toVisit = [node]
-        while len(toVisit) > 0:
-            node = toVisit.pop(0)
+        toVisit = collections.deque([node])
+        while toVisit:
+            node = toVisit.popleft()
             yield node
-            for child in node.children:
-                toVisit.append(child)
+            toVisit.extend(node.children)
 
     def walkDFS(self, node=None, depth=0, stopCriteria=lambda n, d: False):
         if node is None: node = self.root
         if stopCriteria(node, depth): return
-        # iterate tree in pre-order depth first
+        # iterate tree in pre-order depth first, instead of recursing a stack of iterators over
+        # the children along the current path is kept
         yield node, depth
+        toVisit = [self._children(node)]
+        while toVisit:
+            for child in toVisit[-1]:
+                child_depth = depth + len(toVisit)
+                if stopCriteria(child, child_depth):
+                    continue
+                yield child, child_depth
+                toVisit.append(self._children(child))
+                break
+            else:
+                toVisit.pop()
+
+    @staticmethod
+    def _children(node):
         try:
-            for child in node.children[:]:
-                for n, d in self.walkDFS(child, depth=depth + 1,
-                                         stopCriteria=stopCriteria):
-                    yield n, d
+            return iter(node.children[:])
         except TypeError:
-            pass
+            return iter(())
+
+    def freeze(self):
+        """
+        Method returns a read-only copy of the tree as :py:class:`FrozenTree`.
+
+        :return: frozen tree
+        :rtype: :py:class:`FrozenTree`
+        """
+        return FrozenTree.from_tree(self)
 
     def walkToRoot(self, node):
         yield node
@@ -87,3 +111,152 @@ class Tree(object):
                 if not stopCriteria(child, 0):
                     print("Tme %s for pid %s (%s)" % (
                     child.value.tme, child.value.pid, child.value.name))
+
+
+class FrozenTree(object):
+    """
+    The :py:class:`FrozenTree` is a read-only representation of a :py:class:`Tree` for trees that
+    are not modified anymore, e.g. of completed jobs. Instead of linked nodes, the values are stored
+    in depth first pre-order together with arrays of the index of their parent, their depth and
+    the size of their subtree. The subtree of a value therefore is the consecutive range of values
+    starting at its index, so subtrees can be sliced and skipped in constant time.
+
+    The arrays are given as :py:class:`array.array` and can be used as buffers, e.g. to process
+    them vectorized.
+
+    :param list values: values in pre-order
+    :param parents: index of parent for every value, `-1` for root
+    :param depths: depth for every value
+    :param sizes: number of values in subtree for every value
+    """
+    typecode = "i"
+
+    def __init__(self, values=None, parents=None, depths=None, sizes=None):
+        self.values = values if values is not None else []
+        self.parents = parents if parents is not None else array.array(self.typecode)
+        self.depths = depths if depths is not None else array.array(self.typecode)
+        self.sizes = sizes if sizes is not None else array.array(self.typecode)
+
+    @classmethod
+    def from_tree(cls, tree=None):
+        """
+        Method creates a frozen copy of the given :py:class:`Tree`. The order of values is the
+        order given by :py:meth:`Tree.walkDFS`.
+
+        :param tree: tree to be frozen
+        :return: frozen tree
+        :rtype: :py:class:`FrozenTree`
+        """
+        values = []
+        parents = array.array(cls.typecode)
+        depths = array.array(cls.typecode)
+        # index of the last value for every depth along the current path
+        path = []
+        for node, depth in tree.walkDFS():
+            del path[depth:]
+            parents.append(path[-1] if path else -1)
+            path.append(len(values))
+            values.append(node.value)
+            depths.append(depth)
+        sizes = array.array(cls.typecode, [1]) * len(values)
+        for index in range(len(values) - 1, 0, -1):
+            sizes[parents[index]] += sizes[index]
+        return cls(values=values, parents=parents, depths=depths, sizes=sizes)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def root(self):
+        """
+        Method returns the value of the root, `None` for empty trees.
+
+        :return: value of root
+        """
+        return self.values[0] if self.values else None
+
+    @property
+    def height(self):
+        """
+        Method returns the height of the tree, i.e. the maximum depth below the root.
+
+        :return: height of tree
+        :rtype: int
+        """
+        return max(self.depths) - self.depths[0] if self.values else 0
+
+    def subtree(self, index=0):
+        """
+        Method returns the range of indices forming the subtree of the value at :py:attr:`index`.
+
+        :param int index: index of root of subtree
+        :return: slice of subtree
+        :rtype: slice
+        """
+        return slice(index, index + self.sizes[index])
+
+    def children(self, index=0):
+        """
+        Generator that returns the indices of the children of the value at :py:attr:`index`.
+
+        :param int index: index of parent
+        :return: generator of indices
+        """
+        sizes = self.sizes
+        child = index + 1
+        end = index + sizes[index]
+        while child < end:
+            yield child
+            child += sizes[child]
+
+    def degrees(self):
+        """
+        Method returns the number of children for every value.
+
+        :return: array of number of children
+        """
+        degrees = array.array(self.typecode, [0]) * len(self.values)
+        for parent in self.parents[1:]:
+            degrees[parent] += 1
+        return degrees
+
+    def degree_histogram(self):
+        """
+        Method returns how many values have a given number of children.
+
+        :return: dictionary of number of children and number of values
+        :rtype: dict
+        """
+        return dict(collections.Counter(self.degrees()))
+
+    def leaf_count(self):
+        """
+        Method returns the number of values without children.
+
+        :return: number of leaves
+        :rtype: int
+        """
+        return self.sizes.count(1)
+
+    def walk(self, index=0, stopCriteria=lambda value, depth: False):
+        """
+        Generator that iterates the subtree of the value at :py:attr:`index` in pre-order and
+        returns tuples of values and their depth. Values for which :py:attr:`stopCriteria` is true
+        are skipped with their subtrees.
+
+        :param int index: index of root of subtree
+        :param stopCriteria: function of value and depth, skips subtree if true
+        :return: generator of tuples of value and depth
+        """
+        values = self.values
+        depths = self.depths
+        sizes = self.sizes
+        end = index + sizes[index] if values else 0
+        while index < end:
+            value = values[index]
+            depth = depths[index]
+            if stopCriteria(value, depth):
+                index += sizes[index]
+            else:
+                yield value, depth
+                index += 1
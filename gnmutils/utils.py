@@ -1,3 +1,4 @@
+import fnmatch
 import os
 import re
 
@@ -69,6 +70,48 @@ def relevant_directories(path=None):
             yield splitted[0], splitted[1], run[1], filename
 
 
+def raw_data_size(path=None, pattern="*.log-*"):
+    """
+    Function that returns the number of bytes of raw GNM log files inside given
+    :py:attr:`path`. It serves as an estimate for the work that is required to process a run.
+
+    :param path: run directory or single file to check
+    :param pattern: pattern that raw data files need to match
+    :return: size of raw data in bytes
+    :rtype: int
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    size = 0
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return size
+    for name in fnmatch.filter(names, pattern):
+        current_path = os.path.join(path, name)
+        if os.path.isfile(current_path):
+            size += os.path.getsize(current_path)
+    return size
+
+
+def replace_file(source=None, target=None):
+    """
+    Function that moves the file :py:attr:`source` to :py:attr:`target`, replacing target if it
+    exists. Where supported, target is replaced at once, so readers never see an incomplete file.
+
+    :param source: path of file to move
+    :param target: path of file to replace
+    """
+    try:
+        os.rename(source, target)
+    except OSError:
+        if not os.path.exists(target):
+            raise
+        # replacing is not supported by rename on all platforms
+        os.remove(target)
+        os.rename(source, target)
+
+
 def _match_workernode_level(path=None):
     return re.match("c\d*-\d*-\d*", os.path.split(path)[1]) and \
            os.path.isdir(path)
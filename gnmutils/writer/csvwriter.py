@@ -0,0 +1,120 @@
+"""
+The module offers a writer to write CSV files with a pool of open file handles.
+"""
+import collections
+import logging
+import os
+
+from gnmutils.utility import path as pathutils
+
+
+class CSVWriter(object):
+    """
+    The :py:class:`CSVWriter` writes rows to CSV files. Files that are appended to are kept open
+    in a pool, so that files written several times in a row, e.g. the traffic of a job that is
+    split into several parts, are not reopened for every part. If more than :py:attr:`max_files`
+    files are open, the least recently used file is closed.
+
+    Headers are only written to empty files. Rows are given as strings without newline and are
+    written at once. The writer needs to be closed by :py:meth:`close` to ensure that all data is
+    written to disk.
+
+    :param int max_files: maximum number of files that are kept open
+    :param int buffer_size: size of the buffer of every file in bytes
+    """
+    def __init__(self, max_files=64, buffer_size=65536):
+        self.max_files = max_files
+        self.buffer_size = buffer_size
+        self._files = collections.OrderedDict()
+        # paths of open files that already contain data
+        self._filled = set()
+
+    def __getstate__(self):
+        # open files cannot be archived
+        state = self.__dict__.copy()
+        state["_files"] = collections.OrderedDict()
+        state["_filled"] = set()
+        return state
+
+    def append(self, path=None, rows=None, header=None):
+        """
+        Method appends the given :py:attr:`rows` to the file given by :py:attr:`path`. If the
+        file is empty, the :py:attr:`header` is written first.
+
+        :param path: path of file to append to
+        :param rows: iterable of rows to append
+        :param header: header to write to empty files
+        """
+        output_file = self._file(path)
+        if path not in self._filled:
+            if header is not None:
+                output_file.write("%s\n" % header)
+            self._filled.add(path)
+        output_file.writelines("%s\n" % row for row in rows)
+
+    def write(self, path=None, rows=None, header=None):
+        """
+        Method writes the file given by :py:attr:`path` with the :py:attr:`header` and
+        :py:attr:`rows`. An already existing file is replaced.
+
+        :param path: path of file to write
+        :param rows: iterable of rows to write
+        :param header: header to write
+        """
+        self.close(path=path)
+        pathutils.ensureDirectory(os.path.dirname(path))
+        with open(path, "w", self.buffer_size) as output_file:
+            if header is not None:
+                output_file.write("%s\n" % header)
+            output_file.writelines("%s\n" % row for row in rows)
+
+    def flush(self, path=None):
+        """
+        Method flushes the buffer of the file given by :py:attr:`path`. If no path is given, the
+        buffers of all open files are flushed.
+
+        :param path: path of file to flush
+        """
+        if path is None:
+            for output_file in self._files.values():
+                output_file.flush()
+        else:
+            output_file = self._files.get(path, None)
+            if output_file is not None:
+                output_file.flush()
+
+    def close(self, path=None):
+        """
+        Method closes the file given by :py:attr:`path`. If no path is given, all open files are
+        closed.
+
+        :param path: path of file to close
+        """
+        if path is None:
+            while self._files:
+                self._close_oldest()
+        else:
+            output_file = self._files.pop(path, None)
+            if output_file is not None:
+                self._filled.discard(path)
+                output_file.close()
+
+    def _close_oldest(self):
+        path, output_file = self._files.popitem(last=False)
+        self._filled.discard(path)
+        output_file.close()
+
+    def _file(self, path):
+        try:
+            output_file = self._files.pop(path)
+        except KeyError:
+            if len(self._files) >= self.max_files:
+                self._close_oldest()
+            pathutils.ensureDirectory(os.path.dirname(path))
+            logging.getLogger(self.__class__.__name__).debug("opening %s", path)
+            output_file = open(path, "a", self.buffer_size)
+            if output_file.tell() > 0:
+                self._filled.add(path)
+        # remember as most recently used
+        self._files[path] = output_file
+        return output_file
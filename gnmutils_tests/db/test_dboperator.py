@@ -0,0 +1,98 @@
+import unittest
+
+from gnmutils.db.dboperator import DBOperator
+from gnmutils.db.dbobjects import DBWorkernodeObject, DBConfigurationObject, DBJobObject, \
+    DBAffiliationObject
+from gnmutils.monitoringconfiguration import MonitoringConfiguration
+
+
+class CountingDBOperator(DBOperator):
+    def __init__(self, **kwargs):
+        DBOperator.__init__(self, **kwargs)
+        self.lookups = []
+
+    def _load_or_create_workernode(self, data=None, **kwargs):
+        self.lookups.append(data)
+        return DBWorkernodeObject(id=len(self.lookups), name=data)
+
+    def _load_or_create_configuration(self, data=None, **kwargs):
+        self.lookups.append(data.version)
+        return DBConfigurationObject(id=len(self.lookups), version=data.version)
+
+
+class FakeSQLCommand(object):
+    """
+    Stand-in for an SQL command that records the operations done and assigns ids on save.
+    """
+    def __init__(self, fail_at=None):
+        self.operations = []
+        self.fail_at = fail_at
+
+    def startTransaction(self):
+        self.operations.append("start")
+
+    def commitTransaction(self):
+        self.operations.append("commit")
+
+    def rollbackTransaction(self):
+        self.operations.append("rollback")
+
+    def save(self, db_object):
+        if db_object.tme == self.fail_at:
+            raise ValueError("could not save %s" % db_object.tme)
+        self.operations.append("save")
+        return DBJobObject(id=len(self.operations), tme=db_object.tme)
+
+    def update(self, db_object):
+        self.operations.append("update")
+        return db_object
+
+
+class TestDBOperator(unittest.TestCase):
+    def test_cached_lookups(self):
+        operator = CountingDBOperator(cache_size=2)
+        first = operator.load_or_create_workernode(data="c00-001-001")
+        for _ in range(10):
+            self.assertIs(first, operator.load_or_create_workernode(data="c00-001-001"))
+        operator.load_or_create_workernode(data="c00-001-002")
+        self.assertEqual(["c00-001-001", "c00-001-002"], operator.lookups)
+
+        configuration = MonitoringConfiguration(version="alpha", interval=20)
+        operator.load_or_create_configuration(data=configuration)
+        operator.load_or_create_configuration(
+            data=MonitoringConfiguration(version="alpha", interval=20))
+        self.assertEqual(["c00-001-001", "c00-001-002", "alpha"], operator.lookups)
+        # least recently used workernode has been dropped
+        operator.load_or_create_workernode(data="c00-001-002")
+        operator.load_or_create_workernode(data="c00-001-001")
+        self.assertEqual(["c00-001-001", "c00-001-002", "alpha", "c00-001-001"],
+                         operator.lookups)
+
+        operator.clear_caches()
+        operator.load_or_create_workernode(data="c00-001-001")
+        self.assertEqual(5, len(operator.lookups))
+
+    def test_save_all(self):
+        operator = DBOperator()
+        sql_command = FakeSQLCommand()
+        job_objects = operator.save_all(sql_command=sql_command, data=[
+            DBJobObject(tme=1), DBJobObject(id=5, tme=2), DBJobObject(tme=3)])
+        self.assertEqual(["start", "save", "update", "save", "commit"], sql_command.operations)
+        self.assertEqual([2, 5, 4], [job_object.id_value for job_object in job_objects])
+
+        sql_command = FakeSQLCommand(fail_at=3)
+        self.assertRaises(ValueError, operator.save_all, sql_command=sql_command, data=[
+            DBJobObject(tme=1), DBJobObject(tme=3)])
+        self.assertEqual(["start", "save", "rollback"], sql_command.operations)
+
+    def test_load_or_create_affiliations(self):
+        uids = []
+
+        class AffiliationDBOperator(DBOperator):
+            def load_or_create_affiliation(self, data=None, **kwargs):
+                uids.append(data)
+                return DBAffiliationObject(uid=data)
+        operator = AffiliationDBOperator()
+        operator.load_or_create_affiliations(uids=[10, 0, 12, 10])
+        operator.load_or_create_affiliations(uids=[12, 13])
+        self.assertEqual([10, 12, 13], uids)
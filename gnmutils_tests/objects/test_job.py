@@ -4,13 +4,90 @@ import gnmutils_tests
 
 from gnmutils.objects.job import Job
 from gnmutils.objects.process import Process
-from gnmutils.exceptions import NoDataSourceException, FilePathException
+from gnmutils.objects.traffic import Traffic
+from gnmutils.exceptions import NoDataSourceException, FilePathException, \
+    DataNotInCacheException
 from gnmutils.sources.filedatasource import FileDataSource
 from gnmutils.parser.jobparser import JobParser
 from gnmutils.reader.csvreader import CSVReader
 from gnmutils.monitoringconfiguration import MonitoringConfiguration
 
 
+def legacy_processes_in_order(job):
+    """
+    Implementation of :py:meth:`Job.processes_in_order` before it was rewritten, serves as
+    reference for the expected order.
+    """
+    tree = job.tree
+    # create the actual array
+    processes = [node.value for node, _ in tree.walkDFS()]
+    processes_in_order = []
+    processes.sort(key=lambda x: x.tme)
+    current_tme = processes[0].tme
+    current_processes = []
+    current_pid = processes[0].gpid - 1  # to also include first pid in correct order
+    current_pid_tme = processes[0].tme
+    current_pid_exit_tme = processes[0].exit_tme
+    _create_order = legacy_create_order
+    while processes:
+        if processes[0].tme == current_tme:
+            current_processes.append(processes.pop(0))
+        else:
+            # do sorting
+            ordered = _create_order(current_processes, current_pid, current_pid_tme, current_pid_exit_tme)
+            # reset values
+            current_tme = processes[0].tme
+            current_pid = ordered[-1].pid
+            current_pid_tme = ordered[-1].tme
+            current_pid_exit_tme = ordered[-1].exit_tme
+            processes_in_order.extend(ordered)
+            current_processes = []
+    if current_processes:
+        ordered = _create_order(current_processes, current_pid, current_pid_tme, current_pid_exit_tme)
+        processes_in_order.extend(ordered)
+    for process in processes_in_order:
+        yield process
+
+
+def legacy_create_order(elements, start_pid, start_pid_tme, start_pid_exit_tme):
+    elements_in_order = []
+    elements.sort(key=lambda x: x.pid)
+    # check if the tmes from start_pid are close, than we can directly consider start_pid
+    base_tme = elements[0].tme
+    if base_tme - start_pid_tme > 100:
+        ppid_list = [element.ppid for element in elements]
+        try:
+            candidate_generator = (element for element in elements if element.pid in ppid_list)
+            candidate = next(candidate_generator)
+            while candidate.pid in ppid_list:
+                candidate = next(candidate_generator)
+        except StopIteration:
+            candidate = None
+        if candidate is not None:
+            # check if there is something on the left to be taken...
+            # TODO: when it needs to go on from the back, I do have a problem so far...
+            possible_start_elements = [element.pid for element in elements if element.pid < candidate.pid]
+            last_valid = candidate.pid
+            possible_element = possible_start_elements.pop()
+            while last_valid - possible_element < 50 and len(possible_start_elements) > 0:
+                last_valid = possible_element
+                possible_element = possible_start_elements.pop()
+            start_pid = last_valid - 1
+
+    bigger = [process for process in elements if process.pid > start_pid]
+    elements_in_order.extend(bigger)
+    smaller = [process for process in elements if process.pid <= start_pid]
+    elements_in_order.extend(smaller)
+    # as long as there are items that depend on others in the back, put them to the back of the list
+    pid_list = [element.pid for element in elements_in_order]
+    for index, element in enumerate(elements_in_order[:]):
+        if element.ppid in pid_list[index + 1:]:
+            # move element to back
+            elements_in_order.remove(element)
+            elements_in_order.append(element)
+    return elements_in_order
+
+
 class TestJobFunctions(unittest.TestCase):
     def setUp(self):
         self.empty_job = Job()
@@ -44,6 +121,27 @@ class TestJobFunctions(unittest.TestCase):
         job2.add_process(process=process_root)
         self.assertEqual(False, job2.is_complete())
 
+    def test_tree_with_skipped_process(self):
+        job = Job()
+        job.add_process(Process(name="test", pid="6", ppid="5", gpid="3", tme=20, exit_tme=30))
+        job.add_process(Process(name="test", pid="5", ppid="1", gpid="3", tme=5, exit_tme=50))
+        job.add_process(Process(name="sge_shepherd", cmd="sge_shepherd", pid="3", ppid="1",
+                                gpid="3", tme=10, exit_tme=100))
+        job.add_process(Process(name="test", pid="4", ppid="3", gpid="3", tme=11, exit_tme=90))
+        # process 5 started before root and is skipped, its child cannot be reached from root
+        self.assertEqual(False, job.is_complete())
+        self.assertEqual(3, job.process_count())
+
+        job = Job()
+        job.add_process(Process(name="test", pid="5", ppid="1", gpid="3", tme=5, exit_tme=50))
+        job.add_process(Process(name="sge_shepherd", cmd="sge_shepherd", pid="3", ppid="1",
+                                gpid="3", tme=10, exit_tme=100))
+        job.add_process(Process(name="test", pid="4", ppid="3", gpid="3", tme=11, exit_tme=90))
+        job.add_process(Process(name="test", pid="6", ppid="4", gpid="3", tme=12, exit_tme=80))
+        self.assertEqual(True, job.is_complete())
+        self.assertEqual(3, job.process_count())
+        self.assertEqual([3, 4, 6], [process.pid for process in job.processes()])
+
     def test_cache_deletion(self):
         job = Job()
         process_root = Process(name="sge_shepherd", cmd="sge_shepherd", pid="3", ppid="0", gpid=3)
@@ -81,6 +179,67 @@ class TestJobFunctions(unittest.TestCase):
         self.assertEqual(len(job.faulty_nodes), 1)
         job.regenerate_tree()
 
+    def test_add_traffics(self):
+        jobs = [Job(), Job()]
+        for job in jobs:
+            job.add_process(Process(name="sge_shepherd", cmd="sge_shepherd", pid=2, ppid=1,
+                                    gpid=2, tme=100, exit_tme=300))
+            job.add_process(Process(name="test", pid=3, ppid=2, gpid=2, tme=110, exit_tme=150))
+            job.add_process(Process(name="test", pid=3, ppid=2, gpid=2, tme=200, exit_tme=250))
+        traffics = [Traffic(pid=pid, tme=tme, gpid=2, source_port=index)
+                    for index, (pid, tme) in enumerate(
+                        ((3, 200), (2, 90), (3, 95), (3, 170), (3, 130), (2, 280), (3, 170)))]
+        for traffic in traffics:
+            jobs[0].add_traffic(traffic)
+        jobs[1].add_traffics(traffics)
+        expected = [[traffic.source_port for traffic in process.traffic]
+                    for process in jobs[0].processes()]
+        self.assertEqual([[1, 5], [2, 3, 4, 6], [0]], expected)
+        self.assertEqual(expected, [[traffic.source_port for traffic in process.traffic]
+                                    for process in jobs[1].processes()])
+
+        job = Job()
+        job.add_process(Process(name="sge_shepherd", cmd="sge_shepherd", pid=2, ppid=1,
+                                gpid=2, tme=100, exit_tme=300))
+        self.assertRaises(DataNotInCacheException, job.add_traffics, [
+            Traffic(pid=2, tme=100), Traffic(pid=4, tme=100), Traffic(pid=2, tme=110)])
+        self.assertEqual([100], [traffic.tme for traffic in next(job.processes()).traffic])
+
+    def test_prepare_lazy_traffic(self):
+        jobs = []
+        for lazy in (False, True):
+            parser = JobParser(data_source=FileDataSource())
+            reader = CSVReader()
+            reader.parser = parser
+            for job in parser.parse(path=os.path.join(
+                    os.path.dirname(gnmutils_tests.__file__),
+                    "data/c00-001-001/1/1-process.csv")):
+                job.prepare_traffic(lazy=lazy, max_rows=100)
+                jobs.append(job)
+        eager_job, lazy_job = jobs
+        count = 0
+        for eager_process, lazy_process in zip(eager_job.processes(), lazy_job.processes()):
+            self.assertEqual(len(eager_process.traffic), len(lazy_process.traffic))
+            self.assertEqual([traffic.getRow() for traffic in eager_process.traffic],
+                             [traffic.getRow() for traffic in lazy_process.traffic])
+            count += len(lazy_process.traffic)
+        self.assertEqual(count, 3155)
+        loaders = set(process.traffic.loader for process in lazy_job.processes()
+                      if len(process.traffic) > 0)
+        self.assertEqual(len(loaders), 1)
+        loader = loaders.pop()
+        # traffic of at most 100 rows is kept besides the traffic accessed last
+        self.assertLessEqual(loader.cached_rows, max(
+            100, max(len(process.traffic) for process in lazy_job.processes())))
+
+        # traffic appended is kept besides traffic from file
+        process = next(process for process in lazy_job.processes() if len(process.traffic) > 0)
+        length = len(process.traffic)
+        process.traffic.append(Traffic(pid=process.pid, tme=process.tme))
+        self.assertEqual(len(process.traffic), length + 1)
+        self.assertEqual(len(list(process.traffic)), length + 1)
+        self.assertEqual(process.traffic[-1].tme, process.tme)
+
     def test_last_tme(self):
         self.assertIsNone(self.empty_job.last_tme)
         self.empty_job.add_process(process=Process(tme=1, exit_tme=3, name="sge_shepherd", cmd="sge_shepherd", pid="3", ppid="0", gpid=3))
@@ -154,6 +313,23 @@ class TestJobFunctions(unittest.TestCase):
                     last_pid = 0
                 last_tme = process.tme
 
+    def test_processes_in_order_regression(self):
+        data_source = FileDataSource()
+        for job in data_source.jobs(path=self._file_path()):
+            self.assertEqual([(process.pid, process.tme) for process in
+                              legacy_processes_in_order(job)],
+                             [(process.pid, process.tme) for process in job.processes_in_order()])
+        job = Job()
+        job.add_process(Process(name="sge_shepherd", cmd="sge_shepherd", pid=32760, ppid=1,
+                                gpid=32760, tme=0, exit_tme=1000))
+        for pid, ppid, tme in ((32765, 32760, 5), (32767, 3, 5), (2, 32760, 5), (3, 32760, 5),
+                               (4, 32767, 5), (32766, 32765, 200), (5, 4, 200), (1, 32760, 200)):
+            job.add_process(Process(name="test", pid=pid, ppid=ppid, gpid=32760, tme=tme,
+                                    exit_tme=500 if tme < 100 else 300))
+        self.assertEqual([(process.pid, process.tme) for process in
+                          legacy_processes_in_order(job)],
+                         [(process.pid, process.tme) for process in job.processes_in_order()])
+
     def _file_path(self):
         return os.path.join(
             os.path.dirname(gnmutils_tests.__file__),
@@ -1,6 +1,8 @@
 import unittest
+import pickle
 
 from gnmutils.objects.process import Process
+from gnmutils.reader.csvreader import CSVReader
 from gnmutils.exceptions import ArgumentNotDefinedException, ProcessMismatchException
 
 
@@ -103,6 +105,17 @@ class TestProcessFunctions(unittest.TestCase):
                              "state": "exit",
                              "exit_code": 0
                          })
+        self.assertEqual(process.toProcessEvent(state="fork"),
+                         {
+                             "tme": 1405011331,
+                             "name": "(sge_shepherd)",
+                             "cmd": "sge_shepherd-4165419",
+                             "pid": 30726,
+                             "ppid": 7733,
+                             "uid": 0,
+                             "gpid": 30726,
+                             "state": "fork"
+                         })
 
         row_string = "1405011331,,30726,7733,30726,0,(sge_shepherd)," \
                      "sge_shepherd-4165419,0,0,1,,,,,0,,,."
@@ -119,6 +132,21 @@ class TestProcessFunctions(unittest.TestCase):
                              "state": ".",
                          })
 
+    def test_process_from_record(self):
+        record_type = CSVReader.record_type(
+            ("tme", "pid", "ppid", "uid", "name", "cmd", "exit_code", "state", "gpid"))
+        for row_string in ("1406555483,9939,9881,0,(sge_shepherd),sge_shepherd-5073566,0,.,9939",
+                           "1406555490,9939,9881,0,(sge_shepherd),sge_shepherd-5073566,0,exit,"
+                           "9939"):
+            record = record_type._make(row_string.split(","))
+            process = Process.from_process_record(record)
+            self.assertEqual(Process.from_process_event(**record._asdict()).getRow(),
+                             process.getRow())
+            self.assertIs(Process, type(process))
+        self.assertEqual(1406555490, process.exit_tme)
+        self.assertRaises(TypeError, Process.from_record,
+                          CSVReader.record_type(("tme", "unknown"))._make(("1", "2")))
+
     def test_process_from_row(self):
         row_string = "1405011331,1405065581,30726,7733,30726,0,(sge_shepherd)," \
                      "sge_shepherd-4165419,1,1,1,,,,,0,,,exit"
@@ -192,3 +220,20 @@ class TestProcessFunctions(unittest.TestCase):
                          "int_out_volume (), ext_in_volume (), ext_out_volume ()",
                          process.__repr__())
 
+    def test_slots(self):
+        row_string = "1405011331,1405011340,30726,7733,30726,0,(sge_shepherd)," \
+                     "sge_shepherd-4165419,0,0,1,,,,,0,,,exit"
+        row_header = "tme,exit_tme,pid,ppid,gpid,uid,name,cmd,error_code,signal,valid," \
+                     "int_in_volume,int_out_volume,ext_in_volume,ext_out_volume,tree_depth," \
+                     "process_type,color,state"
+        process = Process(**dict(zip(row_header.split(","), row_string.split(","))))
+        self.assertFalse(hasattr(process, "__dict__"))
+        process.traffic.append("traffic")
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(process, protocol))
+            self.assertEqual(process.getRow(), loaded.getRow())
+            self.assertEqual(["traffic"], loaded.traffic)
+        # states of objects archived with a dictionary can still be loaded
+        loaded = Process.__new__(Process)
+        loaded.__setstate__(process.__getstate__())
+        self.assertEqual(process.getRow(), loaded.getRow())
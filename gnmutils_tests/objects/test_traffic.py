@@ -1,6 +1,7 @@
 import unittest
+import pickle
 
-from gnmutils.objects.traffic import Traffic
+from gnmutils.objects.traffic import Traffic, ConnectionClassifier
 from gnmutils.exceptions import ArgumentNotDefinedException, TrafficMismatchException
 
 
@@ -51,6 +52,29 @@ class TestTraffic(unittest.TestCase):
         self.assertEqual(8080, traffic.source_port)
         self.assertEqual("ext", traffic.conn_cat)
 
+    def test_connection_classifier(self):
+        classifier = ConnectionClassifier(max_connections=2)
+        self.assertEqual("10.1.7.102", classifier.internal_ip(workernode="c01-007-102"))
+        self.assertEqual("int", classifier.category(ip="10.97.4.129"))
+        self.assertEqual("int", classifier.category(ip="192.108.45.1"))
+        self.assertEqual("ext", classifier.category(ip="192.109.45.1"))
+        self.assertEqual("ext", classifier.category(ip="128.142.187.77"))
+        connection = classifier.parse(conn="10.97.4.129:3128-10.1.7.102:32983",
+                                      workernode="c01-007-102")
+        self.assertEqual(("10.1.7.102", 32983, "10.97.4.129", 3128, "int", True), connection)
+        self.assertIs(connection, classifier.parse(conn="10.97.4.129:3128-10.1.7.102:32983",
+                                                   workernode="c01-007-102"))
+        self.assertRaises(TrafficMismatchException, classifier.parse,
+                          conn="10.97.4.129:3128-10.1.7.102:32983", workernode="c01-007-103")
+
+        # values are exchanged for every traffic of the connection
+        for _ in range(2):
+            traffic = Traffic(conn="10.97.4.129:3128-10.1.7.102:32983", workernode="c01-007-102",
+                              in_rate=1, out_rate=2, in_cnt=3, out_cnt=4)
+            self.assertEqual((2, 1, 4, 3),
+                             (traffic.in_rate, traffic.out_rate, traffic.in_cnt, traffic.out_cnt))
+            self.assertEqual("int", traffic.conn_cat)
+
     def test_header_formats(self):
         # from payloads
         traffic_header = "tme,pid,ppid,uid,in_rate,out_rate,in_cnt,out_cnt,gpid,source_ip,dest_ip,source_port,dest_port,conn_cat"
@@ -88,3 +112,12 @@ class TestTraffic(unittest.TestCase):
         self.assertEqual("ext", traffic.conn_cat)
         self.assertEqual(0.0477539, traffic.in_rate)
         self.assertEqual(0.0512207, traffic.out_rate)
+
+    def test_slots(self):
+        traffic_header = "tme,pid,ppid,uid,in_rate,out_rate,in_cnt,out_cnt,conn,gpid"
+        traffic_row = "1406555483,12389,12388,11941,0.861572,0.662549,15,19,10.1.7.102:35844-128.142.166.98:25443,9941"
+        traffic = Traffic(**dict(zip(traffic_header.split(","), traffic_row.split(","))))
+        self.assertFalse(hasattr(traffic, "__dict__"))
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(traffic, protocol))
+            self.assertEqual(traffic.getRow(), loaded.getRow())
@@ -2,6 +2,7 @@ import unittest
 
 from gnmutils.parser.dataparser import DataParser
 from gnmutils.sources.filedatasource import FileDataSource
+from gnmutils.reader.csvreader import CSVReader
 from gnmutils.exceptions import ParserNotInitializedException, FilePathException
 
 
@@ -46,6 +47,18 @@ class TestDataParser(unittest.TestCase):
         parser = DataParser()
         self.assertRaises(NotImplementedError, parser.pop_data)
 
+    def test_pieces(self):
+        parser = DataParser()
+        self.assertRaises(ParserNotInitializedException, parser.add_pieces, batch=[])
+
+    def test_piece_from_record(self):
+        parser = DataParser()
+        record = CSVReader.record_type(("tme", "pid"))("1", "2")
+        self.assertRaises(NotImplementedError, parser._piece_from_record, record)
+        parser._piece_from_dict = lambda data_dict: data_dict
+        record = CSVReader.record_type(("tme", "in-rate"))("1", "2")
+        self.assertEqual({"tme": "1", "in-rate": "2"}, parser._piece_from_record(record))
+
     def test_parsing_finished(self):
         parser = DataParser()
         self.assertIsNone(parser._parsing_finished().next())
@@ -1,6 +1,9 @@
 import unittest
+import os
+import gnmutils_tests
 
 from gnmutils.parser.jobparser import JobParser
+from gnmutils.reader.csvreader import CSVReader
 from gnmutils.objects.process import Process
 from gnmutils.exceptions import *
 
@@ -68,5 +71,21 @@ class TestJobParserFunctions(unittest.TestCase):
         
         self.assertIsNone(self.jobParser.data.tree, "JobParser should not return tree")
 
+    def test_batch_parsing(self):
+        path = os.path.join(
+            os.path.dirname(gnmutils_tests.__file__),
+            "data/c00-001-001/1/1-process.csv"
+        )
+        orders = []
+        for batch_size in (None, 1000, 7):
+            parser = JobParser()
+            reader = CSVReader()
+            reader.parser = parser
+            job = next(parser.parse(path=path, batch_size=batch_size))
+            self.assertEqual(job.process_count(), 9109)
+            orders.append([(node.value.pid, node.value.tme) for node, _ in job.tree.walkDFS()])
+        self.assertEqual(orders[0], orders[1])
+        self.assertEqual(orders[0], orders[2])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from gnmutils.parser.trafficstreamparser import TrafficStreamParser
+from gnmutils.sources.datasource import DataSource
+from gnmutils.objects.traffic import Traffic
+from gnmutils.objectcache import ObjectCache
+
+
+class LookupDataSource(DataSource):
+    """
+    Data source without state that knows the job of gpid 2 only after :py:attr:`known` is set.
+    """
+    def __init__(self):
+        self.lookups = []
+        self.known = False
+
+    def object_data(self, **kwargs):
+        return iter([])
+
+    def job_description(self, **kwargs):
+        job = kwargs["data"]
+        self.lookups.append((job.gpid, job.tme))
+        if job.gpid != 2 or not self.known:
+            return None
+        job.db_id = 1
+        job.last_tme = job.tme + 1000
+        return job
+
+
+class TestTrafficStreamParser(unittest.TestCase):
+    def test_unmatched_traffic(self):
+        data_source = LookupDataSource()
+        parser = TrafficStreamParser(workernode="c00-001-001", run="1", data_source=data_source)
+        for tme in range(1300, 1500, 20):
+            for gpid in (1, 2):
+                for pid in range(3):
+                    parser.add_piece(Traffic(gpid=gpid, pid=pid, tme=tme))
+        # misses are looked up once for every gpid and bucket
+        self.assertEqual([(1, 1320), (2, 1320)], data_source.lookups)
+        self.assertEqual(60, len(parser._data.unfound))
+        # until the stream has proceeded by the timeout
+        parser.add_piece(Traffic(gpid=1, pid=0, tme=1580))
+        self.assertEqual(2, len(data_source.lookups))
+        parser.add_piece(Traffic(gpid=1, pid=0, tme=1600))
+        self.assertEqual([(1, 1620)], data_source.lookups[2:])
+        self.assertEqual(62, len(parser._data.unfound))
+
+        # misses are retried once for every gpid and bucket and remembered again
+        parser.check_caches()
+        self.assertEqual([(1, 1320), (2, 1320)], sorted(data_source.lookups[3:]))
+        self.assertEqual(62, len(parser._data.unfound))
+        parser.add_piece(Traffic(gpid=2, pid=0, tme=1600))
+        self.assertEqual(5, len(data_source.lookups))
+        data_source.known = True
+        parser.check_caches()
+        # traffic of a gpid is retried in order, so all traffic is matched by the first job
+        self.assertEqual([(1, 1320), (2, 1320)], sorted(data_source.lookups[5:]))
+        self.assertEqual(32, len(parser._data.unfound))
+        self.assertEqual([31], [len(traffic["data"]) for traffic in parser.pop_data()])
+
+    def test_traffic_of_finished_jobs(self):
+        data_source = LookupDataSource()
+        data_source.known = True
+        parser = TrafficStreamParser(workernode="c00-001-001", run="1", data_source=data_source)
+        # jobs of the cache are still running, the job of gpid 2 has already been finished
+        parser.job_cache = ObjectCache()
+        for tme in range(1300, 1400, 20):
+            parser.add_piece(Traffic(gpid=2, pid=1, tme=tme))
+        self.assertEqual([], data_source.lookups)
+        self.assertEqual(5, len(parser._data.unfound))
+
+        parser.check_caches()
+        self.assertEqual([(2, 1320)], data_source.lookups)
+        self.assertEqual(0, len(parser._data.unfound))
+        self.assertEqual([5], [len(traffic["data"]) for traffic in parser.pop_data()])
+
+
+if __name__ == '__main__':
+    unittest.main()
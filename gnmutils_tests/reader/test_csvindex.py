@@ -0,0 +1,52 @@
+import unittest
+import os
+import tempfile
+import gnmutils_tests
+
+from gnmutils.reader.csvindex import CSVIndex
+from gnmutils.reader.csvreader import CSVReader
+from gnmutils.parser.trafficparser import TrafficParser
+
+
+class TestCSVIndex(unittest.TestCase):
+    def test_index(self):
+        index = CSVIndex.from_file(path=self._file_path())
+        self.assertEqual(len(index), 3155)
+        reader = CSVReader()
+        reader.parser = TrafficParser()
+        expected = list(reader.data(path=self._file_path()))
+        self.assertEqual([int(data["pid"]) for data in expected], index.pids.tolist())
+        self.assertEqual([int(data["tme"]) for data in expected], index.tmes.tolist())
+        rows = [3154, 0, 42, 42]
+        self.assertEqual(list(index.read(rows=rows)), [expected[row] for row in rows])
+        self.assertEqual(index.header(3154)["tme"], 0)
+
+    def test_select(self):
+        index = CSVIndex.from_file(path=self._file_path())
+        pids = index.pids.tolist()
+        tmes = index.tmes.tolist()
+        pid = pids[42]
+        start, end = tmes[42], tmes[42] + 60
+        self.assertEqual(
+            [row for row in range(len(index))
+             if pids[row] == pid and start <= tmes[row] <= end],
+            index.select(pid=pid, start=start, end=end))
+        self.assertEqual(
+            [row for row in range(len(index)) if tmes[row] <= end],
+            index.select(end=end))
+        self.assertEqual(list(range(len(index))), index.select())
+        self.assertEqual([], index.select(pid=-1))
+        self.assertEqual([], index.select(pid=pid, start=end, end=start))
+
+    def test_missing_header(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        try:
+            with os.fdopen(handle, "w") as csv_file:
+                csv_file.write("# comment\n1405011326,30744,30742\n")
+            self.assertRaises(ValueError, CSVIndex.from_file, path=path)
+        finally:
+            os.remove(path)
+
+    def _file_path(self):
+        return os.path.join(
+            os.path.dirname(gnmutils_tests.__file__), "data/c00-001-001/1/1-traffic.csv")
@@ -1,9 +1,13 @@
 import unittest
 import os
+import pickle
+import shutil
+import tempfile
 import gnmutils_tests
 
 from gnmutils.reader.csvreader import CSVReader
 from gnmutils.parser.jobparser import JobParser
+from gnmutils.parser.trafficparser import TrafficParser
 
 
 class TestCSVReader(unittest.TestCase):
@@ -36,6 +40,124 @@ class TestCSVReader(unittest.TestCase):
                                         (node.value.tme, child.value.tme))
                         last_child = child
 
+    def test_records(self):
+        parser = TrafficParser()
+        reader = CSVReader()
+        reader.parser = parser
+        data = list(reader.data(path=self._traffic_file_path()))
+        parser.parsed_data.clear()
+        records = list(reader.records(path=self._traffic_file_path()))
+        self.assertEqual(len(data), 9999)
+        self.assertEqual(len(records), len(data))
+        self.assertEqual(reader.fields, records[0]._fields)
+        for record, data_dict in zip(records, data):
+            self.assertEqual(dict(zip(record._fields, record)), data_dict)
+        # empty tme fields are filled with the last known tme
+        self.assertEqual(records[1].tme, 1406555483)
+        self.assertEqual(records[1].conn, "10.1.7.102:32983-10.97.4.129:3128")
+        # already parsed files are not read again
+        self.assertEqual(list(reader.records(path=self._traffic_file_path())), [None])
+
+    def test_batches(self):
+        parser = TrafficParser()
+        reader = CSVReader()
+        reader.parser = parser
+        batches = list(reader.batches(path=self._traffic_file_path(), size=1000))
+        self.assertEqual(len(batches), 10)
+        self.assertEqual([len(batch) for batch in batches], [1000] * 9 + [999])
+        self.assertEqual(list(reader.batches(path=self._traffic_file_path())), [])
+
+    def test_resume(self):
+        parser = TrafficParser()
+        reader = CSVReader()
+        reader.parser = parser
+        expected = list(reader.data(path=self._traffic_file_path()))
+
+        parser = TrafficParser()
+        reader = CSVReader()
+        reader.parser = parser
+        data = []
+        for row in reader.data(path=self._traffic_file_path()):
+            data.append(row)
+            if len(data) == 1234:
+                break
+        # resume with archived state
+        parsed_offsets = pickle.loads(pickle.dumps(parser.parsed_offsets))
+        self.assertEqual(1234, parsed_offsets[self._traffic_file_path()][1] - 1)
+        parser = TrafficParser()
+        parser.parsed_offsets.update(parsed_offsets)
+        reader = CSVReader()
+        reader.parser = parser
+        data.extend(reader.data(path=self._traffic_file_path()))
+        self.assertEqual(expected, data)
+        self.assertEqual({}, parser.parsed_offsets)
+        self.assertEqual(set([self._traffic_file_path()]), parser.parsed_data)
+
+    def test_incomplete_file(self):
+        with open(self._traffic_file_path()) as input_file:
+            lines = input_file.readlines()
+        parser = TrafficParser()
+        reader = CSVReader()
+        reader.parser = parser
+        expected = list(reader.data(path=self._traffic_file_path()))
+        path = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(path, "1406555483-traffic.log-20140730")
+            parser = TrafficParser()
+            reader = CSVReader()
+            reader.finalize_files = False
+            reader.parser = parser
+            data = []
+            with open(file_path, "w") as output_file:
+                output_file.writelines(lines[:100])
+                output_file.write(lines[100][:10])
+            data.extend(reader.data(path=file_path))
+            self.assertEqual(99, len(data))
+            with open(file_path, "a") as output_file:
+                output_file.write(lines[100][10:])
+                output_file.writelines(lines[101:])
+            data.extend(reader.data(path=file_path))
+            self.assertEqual(expected, data)
+            self.assertEqual(set(), parser.parsed_data)
+        finally:
+            shutil.rmtree(path)
+
+    def test_position_of_split_rows(self):
+        with open(self._traffic_file_path()) as input_file:
+            lines = [next(input_file) for _ in range(4)]
+        path = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(path, "1406555483-traffic.log-20140730")
+            with open(file_path, "w") as output_file:
+                output_file.write(lines[0])
+                # row that has been split over two lines
+                output_file.write(lines[1][:20] + "\n")
+                output_file.write(lines[1][20:])
+                output_file.writelines(lines[2:])
+            parser = TrafficParser()
+            reader = CSVReader()
+            reader.finalize_files = False
+            reader.parser = parser
+            self.assertEqual(3, len(list(reader.data(path=file_path))))
+            self.assertEqual(5, parser.parsed_offsets[file_path][1])
+            self.assertEqual(os.path.getsize(file_path), parser.parsed_offsets[file_path][0])
+        finally:
+            shutil.rmtree(path)
+
+    def test_record_type(self):
+        self.assertIs(CSVReader.record_type(("tme", "pid")), CSVReader.record_type(("tme", "pid")))
+        self.assertEqual(CSVReader.record_type(("tme", "pid"))._fields, ("tme", "pid"))
+        # fields that are no identifiers are renamed, but the names of the header are kept
+        record_type = CSVReader.record_type(("tme", "in-rate", "class"))
+        self.assertEqual(record_type._fields, ("tme", "_1", "_2"))
+        self.assertEqual(record_type._header_fields, ("tme", "in-rate", "class"))
+
+    def _traffic_file_path(self):
+        return os.path.join(
+            os.path.dirname(gnmutils_tests.__file__),
+            "data/c00-001-001/1/1406555483-traffic.log-20140730"
+        )
+
     def _file_path(self):
         return os.path.join(
             os.path.dirname(gnmutils_tests.__file__),
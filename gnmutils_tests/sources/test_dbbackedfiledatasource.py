@@ -1,8 +1,15 @@
 import unittest
 import os
+import shutil
+import tempfile
 import gnmutils_tests
 
 from gnmutils.sources.dbbackedfiledatasource import DBBackedFileDataSource
+from gnmutils.objects.job import Job
+from gnmutils.objects.process import Process
+from gnmutils.objects.traffic import Traffic
+from gnmutils.monitoringconfiguration import MonitoringConfiguration
+from gnmutils_tests.db.test_dboperator import CountingDBOperator, FakeSQLCommand
 from utility.exceptions import *
 
 
@@ -40,5 +47,130 @@ class TestDBBackedFileDataSource(unittest.TestCase):
         self.assertEqual(0, count, "Count should be zero with empty database")
 
 
+class FakeDBOperator(CountingDBOperator):
+    """
+    Operator that saves jobs with a :py:class:`FakeSQLCommand` instead of a database.
+    """
+    def __init__(self, fail_at=None):
+        CountingDBOperator.__init__(self)
+        self.sql_command = FakeSQLCommand(fail_at=fail_at)
+
+    def load_or_create_affiliations(self, uids=None, **kwargs):
+        pass
+
+    def save_all(self, data=None, **kwargs):
+        return CountingDBOperator.save_all(self, data=data, sql_command=self.sql_command)
+
+    def save_or_update(self, data=None, **kwargs):
+        if data.id_value:
+            return self.sql_command.update(data)
+        return self.sql_command.save(data)
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.dataSource = DBBackedFileDataSource(batch_size=3, flush_interval=60)
+        self.dataSource._db_operator = FakeDBOperator()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    @staticmethod
+    def _job(tme):
+        job = Job(workernode="c00-001-001", run="1", tme=tme, gpid=tme,
+                  configuration=MonitoringConfiguration(version="alpha", interval=20))
+        job.add_process(Process(name="sge_shepherd", cmd="sge_shepherd", pid=tme, ppid=1,
+                                gpid=tme, tme=tme, exit_tme=tme + 10))
+        return job
+
+    def _process_path(self, job):
+        return os.path.join(self.path, "c00-001-001", "1", "%s-process.csv" % job.db_id)
+
+    def test_flush_by_size(self):
+        jobs = [self.dataSource.write_job(data=self._job(tme), path=self.path)
+                for tme in (10, 20)]
+        self.assertEqual(2, len(self.dataSource._job_queue))
+        self.assertEqual([], self.dataSource._db_operator.sql_command.operations)
+        jobs.append(self.dataSource.write_job(data=self._job(30), path=self.path))
+        self.assertEqual([], self.dataSource._job_queue)
+        self.assertEqual(["start", "save", "save", "save", "commit"],
+                         self.dataSource._db_operator.sql_command.operations)
+        self.assertEqual([2, 3, 4], [job.db_id for job in jobs])
+        for job in jobs:
+            self.assertTrue(os.path.exists(self._process_path(job)))
+
+    def test_flush_by_time(self):
+        self.dataSource.flush_interval = 0
+        job = self.dataSource.write_job(data=self._job(10), path=self.path)
+        self.assertEqual([], self.dataSource._job_queue)
+        self.assertTrue(os.path.exists(self._process_path(job)))
+
+    def test_flush_one_by_one(self):
+        self.dataSource._db_operator = FakeDBOperator(fail_at=20)
+        jobs = [self._job(tme) for tme in (10, 20, 30)]
+        for job in jobs[:2]:
+            self.dataSource.write_job(data=job, path=self.path)
+        # saving all jobs at once fails, the remaining jobs are saved one by one
+        self.assertRaises(RethrowException, self.dataSource.write_job, data=jobs[2],
+                          path=self.path)
+        self.assertTrue(os.path.exists(self._process_path(jobs[0])))
+        self.assertTrue(os.path.exists(self._process_path(jobs[2])))
+        self.assertEqual([jobs[1]], [kwargs["data"] for kwargs in self.dataSource._job_queue])
+
+    def test_flush_with_failed_file(self):
+        jobs = [self._job(tme) for tme in (10, 20, 30)]
+        # files of a job cannot be written if its path is a file
+        blocked_path = os.path.join(self.path, "blocked")
+        with open(blocked_path, "w"):
+            pass
+        self.dataSource.write_job(data=jobs[0], path=self.path)
+        self.dataSource.write_job(data=jobs[1], path=blocked_path)
+        with self.assertRaises(RethrowException) as context:
+            self.dataSource.write_job(data=jobs[2], path=self.path)
+        # the failed job is named
+        self.assertIn("%s (gpid=20, tme=20)" % jobs[1].db_id, str(context.exception))
+        # files of the following jobs are still written
+        self.assertTrue(os.path.exists(self._process_path(jobs[0])))
+        self.assertTrue(os.path.exists(self._process_path(jobs[2])))
+        self.assertEqual([jobs[1]], [kwargs["data"] for kwargs in self.dataSource._job_queue])
+
+        # failed job is retried and updated instead of being saved again
+        os.remove(blocked_path)
+        db_id = jobs[1].db_id
+        operations = len(self.dataSource._db_operator.sql_command.operations)
+        self.dataSource.flush_jobs()
+        self.assertEqual(["start", "update", "commit"],
+                         self.dataSource._db_operator.sql_command.operations[operations:])
+        self.assertEqual(db_id, jobs[1].db_id)
+        self.assertTrue(os.path.exists(os.path.join(
+            blocked_path, "c00-001-001", "1", "%s-process.csv" % db_id)))
+        self.assertEqual([], self.dataSource._job_queue)
+
+    def test_write_traffic_flushes_job(self):
+        job = self.dataSource.write_job(data=self._job(10), path=self.path)
+        self.assertIsNone(job._db_id)
+        traffic = {"id": None, "job": job, "workernode": "c00-001-001", "run": "1",
+                   "configuration": None, "data": []}
+        try:
+            self.dataSource.write_traffic(data=traffic, path=self.path)
+        except IndexError:
+            # empty traffic has no header, the job has been flushed before
+            pass
+        self.assertEqual([], self.dataSource._job_queue)
+        self.assertEqual(2, job.db_id)
+        self.assertEqual(2, traffic["id"])
+
+
+    def test_write_traffic_flushes_due_jobs(self):
+        job = self.dataSource.write_job(data=self._job(10), path=self.path)
+        self.assertEqual(1, len(self.dataSource._job_queue))
+        self.dataSource.flush_interval = 0
+        traffic = {"id": 1, "job": None, "workernode": "c00-001-001", "run": "1",
+                   "configuration": None, "data": [Traffic(gpid=1, pid=1, tme=10)]}
+        self.dataSource.write_traffic(data=traffic, path=self.path)
+        self.assertEqual([], self.dataSource._job_queue)
+        self.assertTrue(os.path.exists(self._process_path(job)))
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,14 @@
 import unittest
 import os
+import shutil
+import tempfile
+import zipfile
+import threading
 import gnmutils_tests
 
 from gnmutils.sources.filedatasource import FileDataSource
+from gnmutils.objects.job import Job
+from gnmutils.reader.csvindex import CSVIndex
 
 
 class TestFileDataSource(unittest.TestCase):
@@ -22,6 +28,306 @@ class TestFileDataSource(unittest.TestCase):
             self.assertIsNotNone(job)
         self.assertEqual(index, 0)
 
+    def test_jobs_with_traffics(self):
+        path = os.path.join(self.path, "1")
+        raw_jobs = [(job.gpid, job.tme, job.process_count()) for job in
+                    self.dataSource.jobs(source="raw", path=path, data_path=path)]
+        jobs = {}
+        traffic_count = 0
+        for data in self.dataSource.jobs_with_traffics(path=path, data_path=path):
+            if isinstance(data, Job):
+                jobs[data.db_id] = data
+            else:
+                self.assertGreater(len(data["data"]), 0)
+                traffic_count += len(data["data"])
+                if data["id"] is not None:
+                    # traffic is given after its job
+                    job = jobs[data["id"]]
+                    for traffic in data["data"]:
+                        self.assertEqual(job.gpid, traffic.gpid)
+                        self.assertGreaterEqual(traffic.tme + 20, job.tme)
+        self.assertEqual(sorted(raw_jobs), sorted((job.gpid, job.tme, job.process_count())
+                                                  for job in jobs.values()))
+        self.assertEqual(8828, traffic_count)
+
+    def test_jobs_with_traffics_without_process_log(self):
+        path = tempfile.mkdtemp()
+        try:
+            run_path = os.path.join(path, "c00-001-001", "1")
+            os.makedirs(run_path)
+            shutil.copy(os.path.join(self.path, "1", "1406555483-traffic.log-20140730"),
+                        run_path)
+            traffic_count = 0
+            for data in self.dataSource.jobs_with_traffics(path=run_path, data_path=path):
+                self.assertNotIsInstance(data, Job)
+                traffic_count += len(data["data"])
+            # traffic that does not belong to any job is still given out
+            self.assertGreater(traffic_count, 0)
+        finally:
+            shutil.rmtree(path)
+
+    @staticmethod
+    def _write_logs(run_path, count=20):
+        # jobs that are finished in the middle of the logs
+        processes = ["tme,pid,ppid,uid,name,cmd,exit_code,state,gpid"]
+        traffics = ["tme,pid,ppid,uid,in_rate,out_rate,in_cnt,out_cnt,conn,gpid"]
+        for index in range(count):
+            tme = 1406555483 + 100 * index
+            gpid = 1000 + 10 * index
+            processes.extend([
+                "%d,%d,1,0,(sge_shepherd),sge_shepherd-%d,0,.,%d" % (tme, gpid, index, gpid),
+                "%d,%d,%d,1,(sh),/bin/sh,0,.,%d" % (tme + 1, gpid + 1, gpid, gpid),
+                "%d,%d,%d,1,(sh),/bin/sh,0,exit,%d" % (tme + 40, gpid + 1, gpid, gpid),
+                "%d,%d,1,0,(sge_shepherd),sge_shepherd-%d,0,exit,%d" % (
+                    tme + 41, gpid, index, gpid)])
+            traffics.extend(
+                "%d,%d,%d,1,1.0,1.0,1,1,10.0.0.1:%d-10.0.0.2:80,%d" % (
+                    tme + 20 * offset, gpid + 1, gpid, 1000 + offset, gpid)
+                for offset in (1, 2))
+        for name, lines in (("1406555483-process.log-20140730", processes),
+                            ("1406555483-traffic.log-20140730", traffics)):
+            with open(os.path.join(run_path, name), "w") as output_file:
+                output_file.write("\n".join(lines) + "\n")
+
+    @staticmethod
+    def _summary(data):
+        if isinstance(data, Job):
+            return "job", data.gpid, data.tme, data.process_count()
+        return "traffic", data["data"][0].gpid, len(data["data"])
+
+    def test_resume_jobs_with_traffics(self):
+        path = tempfile.mkdtemp()
+        try:
+            expected_path = os.path.join(path, "expected", "c00-001-001", "1")
+            os.makedirs(expected_path)
+            self._write_logs(expected_path)
+            expected = [self._summary(data) for data in FileDataSource().jobs_with_traffics(
+                path=expected_path, data_path=path)]
+            self.assertEqual(40, len(expected))
+
+            run_path = os.path.join(path, "c00-001-001", "1")
+            os.makedirs(run_path)
+            self._write_logs(run_path)
+            process_path = os.path.join(run_path, "1406555483-process.log-20140730")
+            result = []
+            # interrupt the run while the 11th data is given out
+            data_stream = FileDataSource().jobs_with_traffics(
+                path=run_path, data_path=path, stateful=True, archive_interval=0)
+            for data in data_stream:
+                if len(result) == 10:
+                    break
+                result.append(self._summary(data))
+            data_stream.close()
+            parsed_offsets = next(FileDataSource().object_data(
+                pattern="parsed_offsets.pkl", path=run_path))
+            self.assertGreater(parsed_offsets[process_path][0], 0)
+            self.assertLess(parsed_offsets[process_path][0], os.path.getsize(process_path))
+
+            # resume from archived state
+            result.extend(self._summary(data) for data in FileDataSource().jobs_with_traffics(
+                path=run_path, data_path=path, stateful=True))
+            self.assertEqual(sorted(expected), sorted(result))
+        finally:
+            shutil.rmtree(path)
+
+    def test_follow_jobs(self):
+        path = tempfile.mkdtemp()
+        try:
+            run_path = os.path.join(path, "c00-001-001", "1")
+            os.makedirs(run_path)
+            file_name = "1406555483-process.log-20140730"
+            with open(os.path.join(self.path, "1", file_name)) as input_file:
+                lines = input_file.readlines()
+            with open(os.path.join(run_path, file_name), "w") as output_file:
+                output_file.writelines(lines[:5000])
+
+            def append():
+                with open(os.path.join(run_path, file_name), "a") as output_file:
+                    output_file.writelines(lines[5000:])
+            # data is appended while following the directory
+            timer = threading.Timer(.2, append)
+            timer.start()
+            jobs = [(job.gpid, job.tme, job.process_count()) for job in self.dataSource.jobs(
+                source="raw", path=run_path, data_path=run_path, follow=True, poll_interval=.05,
+                idle_timeout=1)]
+            timer.join()
+            expected = [(job.gpid, job.tme, job.process_count()) for job in self.dataSource.jobs(
+                source="raw", path=os.path.join(self.path, "1"), data_path=run_path)]
+            self.assertEqual(sorted(expected), sorted(jobs))
+        finally:
+            shutil.rmtree(path)
+
+    def test_follow_jobs_with_traffics(self):
+        path = tempfile.mkdtemp()
+        try:
+            expected_path = os.path.join(path, "expected", "c00-001-001", "1")
+            os.makedirs(expected_path)
+            self._write_logs(expected_path)
+            expected = [self._summary(data) for data in FileDataSource().jobs_with_traffics(
+                path=expected_path, data_path=path)]
+
+            run_path = os.path.join(path, "c00-001-001", "1")
+            os.makedirs(run_path)
+            self._write_logs(run_path)
+            logs = {}
+            for file_name in os.listdir(run_path):
+                with open(os.path.join(run_path, file_name)) as input_file:
+                    logs[file_name] = input_file.read()
+                with open(os.path.join(run_path, file_name), "w") as output_file:
+                    output_file.write(logs[file_name][:len(logs[file_name]) // 2])
+
+            def append():
+                for file_name, log in logs.items():
+                    with open(os.path.join(run_path, file_name), "a") as output_file:
+                        output_file.write(log[len(log) // 2:])
+            # data is appended while following the directory
+            timer = threading.Timer(.2, append)
+            timer.start()
+            result = [self._summary(data) for data in FileDataSource().jobs_with_traffics(
+                path=run_path, data_path=path, follow=True, poll_interval=.05, idle_timeout=1)]
+            timer.join()
+            self.assertEqual(sorted(expected), sorted(result))
+        finally:
+            shutil.rmtree(path)
+
+    def test_follow_several_runs(self):
+        path = tempfile.mkdtemp()
+        try:
+            for run in ("1", "2"):
+                os.makedirs(os.path.join(path, "c00-001-001", run))
+            # only the first run would be followed without idle_timeout
+            for data_stream in (
+                    self.dataSource.jobs(source="raw", path=path, follow=True),
+                    self.dataSource.traffics(source="raw", path=path, follow=True),
+                    self.dataSource.jobs_with_traffics(path=path, follow=True)):
+                self.assertRaises(ValueError, next, data_stream)
+        finally:
+            shutil.rmtree(path)
+
+    def test_indexed_reading(self):
+        path = tempfile.mkdtemp()
+        try:
+            job = next(self.dataSource.jobs(path=self.path))
+            traffics = next(self.dataSource.read_traffic(path=job.path, name=job.db_id))
+            run_path = os.path.join(path, job.workernode, job.run)
+            self.dataSource.write_job(path=path, data=job)
+            self.assertTrue(os.path.exists(os.path.join(run_path, "1-process.csv.idx")))
+            # sidecars are not mistaken for process files
+            self.assertEqual(["1"], [current.db_id for current in self.dataSource.jobs(path=path)])
+            # traffic is appended in parts, the index is updated when closing files
+            for part in (traffics[:1000], traffics[1000:]):
+                self.dataSource.write_traffic(path=path, data={
+                    "workernode": job.workernode, "run": job.run, "id": job.db_id,
+                    "configuration": None, "data": part})
+                self.dataSource.close_files()
+            index = CSVIndex.load(path=os.path.join(run_path, "1-traffic.csv"))
+            self.assertEqual(len(index), len(traffics))
+
+            pid, tme = traffics[2000].pid, traffics[2000].tme
+            expected = [traffic.getRow() for traffic in traffics
+                        if traffic.pid == pid and tme - 600 <= traffic.tme <= tme + 600]
+            selected = next(self.dataSource.read_traffic(
+                path=run_path, name=job.db_id, pid=pid, start=tme - 600, end=tme + 600))
+            self.assertEqual(expected, [traffic.getRow() for traffic in selected])
+            self.assertIn(traffics[2000].getRow(), expected)
+
+            processes = self.dataSource.read_processes(path=run_path, name=job.db_id, pid=pid)
+            self.assertEqual(sorted(process.getRow() for process in job.processes()
+                                    if process.pid == pid),
+                             sorted(process.getRow() for process in processes))
+        finally:
+            shutil.rmtree(path)
+
+    def test_job_catalog(self):
+        path = tempfile.mkdtemp()
+        try:
+            job = next(self.dataSource.jobs(path=self.path))
+            self.dataSource.write_job(path=path, data=job)
+            run_path = os.path.join(path, job.workernode, job.run)
+            summary = FileDataSource().job_catalog(path=run_path).get(job.db_id)
+            self.assertEqual((summary.gpid, summary.tme, summary.exit_tme, summary.uid),
+                             (job.gpid, job.tme, job.exit_tme, job.uid))
+            self.assertEqual(summary.process_count, 9109)
+            self.assertTrue(summary.valid)
+            self.assertTrue(summary.complete)
+            self.assertEqual(summary.process_size,
+                             os.path.getsize(os.path.join(run_path, "1-process.csv")))
+            # traffic that is still buffered is counted and every job keeps a single row
+            traffics = next(self.dataSource.read_traffic(path=job.path, name=job.db_id))
+            for part in (traffics[:10], traffics[10:20]):
+                self.dataSource.write_traffic(path=path, data={
+                    "workernode": job.workernode, "run": job.run, "id": job.db_id,
+                    "configuration": None, "data": part})
+                self.dataSource.write_job(path=path, data=job)
+                self.assertEqual(
+                    os.path.getsize(os.path.join(run_path, "1-traffic.csv")),
+                    FileDataSource().job_catalog(path=run_path).get(job.db_id).traffic_size)
+                self.dataSource.close_files()
+            with open(os.path.join(run_path, "job_catalog.csv")) as catalog_file:
+                self.assertEqual(2, len(catalog_file.readlines()))
+
+            names = []
+
+            class CountingDataSource(FileDataSource):
+                def read_job(self, **kwargs):
+                    names.append(kwargs["name"])
+                    return FileDataSource.read_job(self, **kwargs)
+            data_source = CountingDataSource()
+            self.assertEqual([job.db_id], [current.db_id for current in data_source.jobs(
+                path=path, uid=job.uid, start=job.exit_tme, end=job.exit_tme + 10)])
+            self.assertEqual(["1"], names)
+            self.assertEqual([], list(data_source.jobs(path=path, start=job.exit_tme + 1)))
+            self.assertEqual([], list(data_source.jobs(path=path, uid=job.uid + 1)))
+            self.assertEqual(["1"], names)
+            # jobs that have been changed since they have been summarized are read
+            with open(os.path.join(run_path, "1-process.csv"), "a") as process_file:
+                process_file.write("# changed\n")
+            self.assertEqual([], list(data_source.jobs(path=path, uid=job.uid + 1)))
+            self.assertEqual(["1", "1"], names)
+        finally:
+            shutil.rmtree(path)
+
+    def test_archive(self):
+        path = tempfile.mkdtemp()
+        try:
+            job = next(self.dataSource.jobs(path=self.path))
+            traffics = next(self.dataSource.read_traffic(path=job.path, name=job.db_id))
+            run_path = os.path.join(path, job.workernode, job.run)
+            self.dataSource.write_job(path=path, data=job)
+            self.dataSource.write_traffic(path=path, data={
+                "workernode": job.workernode, "run": job.run, "id": job.db_id,
+                "configuration": None, "data": traffics})
+            # traffic is still kept open for writing
+            self.dataSource.archive(data=job, path=path, name="jobarchive")
+            self.assertEqual(["job_catalog.csv", "jobarchive.zip"], sorted(os.listdir(run_path)))
+            with zipfile.ZipFile(os.path.join(run_path, "jobarchive.zip")) as zip_file:
+                lines = zip_file.read("1-traffic.csv").decode().splitlines()
+            self.assertEqual([traffic.getRow() for traffic in traffics], lines[2:])
+            self.assertEqual(0, len(FileDataSource().job_catalog(path=run_path)))
+            self.assertEqual([], list(self.dataSource.jobs(path=path)))
+        finally:
+            shutil.rmtree(path)
+
+    def test_traffics_with_job_index(self):
+        path = tempfile.mkdtemp()
+        try:
+            raw_path = os.path.join(self.path, "1")
+            written_ids = set()
+            for job in self.dataSource.jobs(source="raw", path=raw_path, data_path=path):
+                if job is not None:
+                    job.db_id = str(len(written_ids) + 1)
+                    self.dataSource.write_job(path=path, data=job)
+                    written_ids.add(job.db_id)
+
+            class IndexedDataSource(FileDataSource):
+                def job_description(self, **kwargs):
+                    raise AssertionError("job has not been taken from index")
+            job_ids = set(traffic["id"] for traffic in IndexedDataSource().traffics(
+                source="raw", path=raw_path, data_path=path))
+            self.assertTrue(job_ids & written_ids)
+            self.assertLessEqual(job_ids, written_ids | set([None]))
+        finally:
+            shutil.rmtree(path)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import shutil
+import tempfile
+
+from gnmutils.catalog import JobCatalog, JobSummary
+
+
+def summary(job_id, **kwargs):
+    values = dict(id=str(job_id), gpid=1, tme=100, exit_tme=200, last_tme=200, uid=10, valid=True,
+                  complete=True, process_count=1, process_size=10, traffic_size=0)
+    values.update(kwargs)
+    return JobSummary(**values)
+
+
+class TestJobCatalog(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_update(self):
+        catalog = JobCatalog(path=self.path)
+        self.assertEqual(0, len(catalog))
+        catalog.update(summary(1))
+        catalog.update(summary(2, exit_tme=None, last_tme=0, valid=False))
+        catalog.update_sizes(job_id=1, traffic_size=42)
+        self.assertFalse(catalog.update_sizes(job_id=3, traffic_size=42))
+
+        loaded = JobCatalog(path=self.path)
+        self.assertEqual(summary(1, traffic_size=42), loaded.get(1))
+        self.assertEqual(summary(2, exit_tme=None, last_tme=0, valid=False), loaded.get("2"))
+        self.assertIn(1, loaded)
+        self.assertEqual(["1"], [current.id for current in loaded.select(valid=True)])
+        self.assertEqual(["2"], [current.id for current in loaded.select(start=300)])
+        self.assertEqual([], [current.id for current in loaded.select(end=50)])
+        self.assertEqual(["1", "2"], [current.id for current in loaded.select(uid=10, end=100)])
+
+    def test_single_row_per_job(self):
+        catalog = JobCatalog(path=self.path)
+        catalog.update(summary(1))
+        catalog.update(summary(2))
+        for tme in range(10):
+            catalog.update(summary(1, tme=tme))
+            catalog.update_all([summary(1, tme=tme), summary(2, traffic_size=tme)])
+        with open(catalog.file_path) as catalog_file:
+            self.assertEqual(3, len(catalog_file.readlines()))
+        loaded = JobCatalog(path=self.path)
+        self.assertEqual(summary(1, tme=9), loaded.get(1))
+        self.assertEqual(summary(2, traffic_size=9), loaded.get(2))
+        loaded.remove(job_ids=[1, 3])
+        self.assertEqual(["2"], list(JobCatalog(path=self.path).summaries))
+
+    def test_incomplete_row(self):
+        catalog = JobCatalog(path=self.path)
+        catalog.update(summary(1))
+        with open(catalog.file_path, "a") as catalog_file:
+            catalog_file.write("2,1,100")
+        loaded = JobCatalog(path=self.path)
+        self.assertEqual(["1"], list(loaded.summaries))
+        loaded.update(summary(3))
+        self.assertEqual(["1", "3"], list(JobCatalog(path=self.path).summaries))
@@ -0,0 +1,128 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from gnmutils.checkpoint import Checkpoint
+from gnmutils.objectcache import ObjectCache
+from gnmutils.objects.job import Job
+from gnmutils.objects.process import Process
+from gnmutils.sources.filedatasource import FileDataSource
+
+
+class TestCheckpointFunctions(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.path, "data.ckpt")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_setUp(self):
+        checkpoint = Checkpoint(path=self.checkpoint_path)
+        self.assertEqual(0, len(checkpoint))
+        self.assertIsNone(checkpoint.kind)
+        self.assertEqual([], list(checkpoint.items()))
+
+    def test_update(self):
+        checkpoint = Checkpoint(path=self.checkpoint_path)
+        checkpoint.update(entries={1: "a", 2: "b"}, kind="test")
+        size = os.path.getsize(self.checkpoint_path)
+        # unchanged entries are not written again
+        checkpoint.update(entries={1: "a", 2: "b"}, kind="test")
+        self.assertEqual(size, os.path.getsize(self.checkpoint_path))
+        checkpoint.update(entries={1: "a", 3: "c"}, kind="test")
+        self.assertGreater(os.path.getsize(self.checkpoint_path), size)
+
+        loaded = Checkpoint(path=self.checkpoint_path)
+        self.assertEqual("test", loaded.kind)
+        self.assertEqual({1: "a", 3: "c"}, dict(loaded.items()))
+
+    def test_compaction(self):
+        checkpoint = Checkpoint(path=self.checkpoint_path, compaction_factor=2)
+        checkpoint.minimum_records = 0
+        for index in range(10):
+            checkpoint.update(entries={1: index}, kind="test")
+        loaded = Checkpoint(path=self.checkpoint_path)
+        self.assertEqual({1: 9}, dict(loaded.items()))
+        self.assertLessEqual(loaded._records, 4)
+
+    def test_incomplete_record(self):
+        checkpoint = Checkpoint(path=self.checkpoint_path)
+        checkpoint.update(entries={1: "a"}, kind="test")
+        size = os.path.getsize(self.checkpoint_path)
+        checkpoint.update(entries={1: "a", 2: "b" * 100}, kind="test")
+        with open(self.checkpoint_path, "r+b") as checkpoint_file:
+            checkpoint_file.truncate(size + 10)
+        loaded = Checkpoint(path=self.checkpoint_path)
+        self.assertEqual({1: "a"}, dict(loaded.items()))
+        loaded.update(entries={1: "a", 3: "c"}, kind="test")
+        self.assertEqual({1: "a", 3: "c"}, dict(Checkpoint(path=self.checkpoint_path).items()))
+
+    def test_object_data(self):
+        data_source = FileDataSource()
+        object_cache = ObjectCache()
+        object_cache.add_data(data=Process(tme=1, pid=2))
+        object_cache.add_data(data=Process(tme=3, pid=2))
+        object_cache.add_data(data=Process(tme=1, pid=4))
+        object_cache.unfound.add(5)
+        data_source.write_object_data(data=object_cache, name="data", path=self.path)
+        data_source.write_object_data(data=set(["a", "b"]), name="parsed_data", path=self.path)
+        data_source.write_object_data(data={"c": 1}, name="configuration", path=self.path)
+
+        data_source = FileDataSource()
+        loaded = next(data_source.object_data(pattern="data.pkl", path=self.path))
+        self.assertEqual([1, 3], [process.tme for process in loaded.object_cache[2]])
+        self.assertEqual([1], [process.tme for process in loaded.object_cache[4]])
+        self.assertEqual(set([5]), loaded.unfound)
+        self.assertEqual(3, loaded.get_data(value=4, key=2).tme)
+        self.assertEqual(set(["a", "b"]), next(data_source.object_data(
+            pattern="parsed_data.pkl", path=self.path)))
+        self.assertEqual({"c": 1}, next(data_source.object_data(
+            pattern="configuration.pkl", path=self.path)))
+        self.assertIsNone(next(data_source.object_data(pattern="missing.pkl", path=self.path),
+                               None))
+
+    def test_unchanged_object_data(self):
+        data_source = FileDataSource()
+        object_cache = ObjectCache()
+        for gpid in range(10):
+            object_cache.add_data(data=Job(tme=gpid, gpid=gpid, data_source=data_source),
+                                  key=gpid)
+        data_source.write_object_data(data=object_cache, name="data", path=self.path)
+        checkpoint_path = os.path.join(self.path, "data.ckpt")
+        size = os.path.getsize(checkpoint_path)
+
+        # unchanged cache does not write any records
+        data_source.write_object_data(data=object_cache, name="data", path=self.path)
+        self.assertEqual(size, os.path.getsize(checkpoint_path))
+
+        # jobs do not depend on the state of the data source
+        data_source._appended_paths.add(os.path.join(self.path, "1-traffic.csv"))
+        object_cache.data_at(key=1, index=0)
+        data_source.write_object_data(data=object_cache, name="data", path=self.path)
+        self.assertEqual(size, os.path.getsize(checkpoint_path))
+
+        # restored cache does neither read nor write unchanged data
+        data_source = FileDataSource()
+        loaded = next(data_source.object_data(pattern="data.pkl", path=self.path))
+        self.assertEqual(set(range(10)), loaded._pending)
+        self.assertEqual(set(range(10)), set(loaded.keys()))
+        self.assertTrue(5 in loaded)
+        data_source.write_object_data(data=loaded, name="data", path=self.path)
+        self.assertEqual(size, os.path.getsize(checkpoint_path))
+        self.assertEqual(set(range(10)), loaded._pending)
+
+        job = loaded.data_at(key=3, index=0)
+        self.assertEqual(3, job.tme)
+        self.assertIsNone(job.data_source)
+        self.assertNotIn(3, loaded._pending)
+        loaded.add_data(data=Job(tme=20, gpid=3), key=3)
+        loaded.pop_data(key=4)
+        data_source.write_object_data(data=loaded, name="data", path=self.path)
+        self.assertGreater(os.path.getsize(checkpoint_path), size)
+
+        restored = next(FileDataSource().object_data(pattern="data.pkl", path=self.path))
+        self.assertEqual(set(range(10)) - set([4]), set(restored.keys()))
+        self.assertEqual([3, 20], [job.tme for job in restored.data_list(key=3)])
+        self.assertEqual([7], [job.tme for job in restored.data_list(key=7)])
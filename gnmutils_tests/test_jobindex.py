@@ -0,0 +1,20 @@
+import unittest
+
+from gnmutils.jobindex import JobIndex
+
+
+class TestJobIndex(unittest.TestCase):
+    def test_find(self):
+        index = JobIndex([(1, 200, 300, "2"), (1, 100, 150, "1"), (2, 100, None, "3")])
+        self.assertEqual(3, len(index))
+        self.assertIsNone(index.find(gpid=1, tme=99))
+        self.assertEqual((100, 150, "1"), index.find(gpid=1, tme=100))
+        # the job started last is given, even if it has already ended
+        self.assertEqual((100, 150, "1"), index.find(gpid=1, tme=199))
+        self.assertEqual((200, 300, "2"), index.find(gpid=1, tme=1000))
+        self.assertEqual((100, 0, "3"), index.find(gpid=2, tme=100))
+        self.assertIsNone(index.find(gpid=3, tme=100))
+        self.assertEqual(0, len(JobIndex()))
+
+if __name__ == '__main__':
+    unittest.main()
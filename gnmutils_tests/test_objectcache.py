@@ -1,4 +1,5 @@
 import unittest
+import pickle
 
 from gnmutils.objectcache import ObjectCache
 from gnmutils.objects.process import Process
@@ -106,6 +107,51 @@ class TestObjectCacheFunctions(unittest.TestCase):
         newProcess = self.object_cache.get_data(value=process.tme, key=process.pid)
         self.assertEqual(process2.name, newProcess.name)
 
+    def test_removeWithValue(self):
+        processes = [Process(tme=tme, pid=2) for tme in (3, 1, 2, 2, 0)]
+        for process in processes:
+            self.object_cache.add_data(data=process)
+        self.assertEqual([process.tme for process in self.object_cache.object_cache[2]],
+                         [0, 1, 2, 2, 3])
+        self.assertTrue(self.object_cache.remove_data(data=processes[3], value=2))
+        self.assertIs(self.object_cache.get_data(value=2, key=2), processes[2])
+        # stale values still find the data object
+        self.assertTrue(self.object_cache.remove_data(data=processes[2], value=5))
+        self.assertFalse(self.object_cache.remove_data(data=processes[2], value=2))
+        self.assertIs(self.object_cache.get_data(value=2, key=2), processes[1])
+        self.assertEqual(self.object_cache.data_index(value=3, key=2), 2)
+
+    def test_indexOfStringValue(self):
+        processes = [Process(tme=tme, pid=2) for tme in (5, 10, 100)]
+        for process in processes:
+            self.object_cache.add_data(data=process)
+        # values are compared as numbers and not as strings
+        self.assertEqual(self.object_cache.data_index(value="20", key=2), 1)
+        self.assertIs(self.object_cache.get_data(value="9", key=2), processes[0])
+
+    def test_popData(self):
+        process = Process(tme=1, pid=2)
+        process2 = Process(tme=2, pid=2)
+        self.object_cache.add_data(data=process2)
+        self.object_cache.add_data(data=process)
+        self.assertIs(self.object_cache.pop_data(key=2), process2)
+        self.assertIs(self.object_cache.get_data(value=5, key=2), process)
+        self.assertIs(self.object_cache.pop_data(key=2), process)
+        self.assertEqual(len(self.object_cache.object_cache), 0)
+        self.assertRaises(KeyError, self.object_cache.pop_data, key=2)
+        self.assertRaises(DataNotInCacheException, self.object_cache.get_data, 1, 2)
+
+    def test_archivedState(self):
+        process = Process(tme=1, pid=2)
+        process2 = Process(tme=2, pid=2)
+        self.object_cache.add_data(data=process)
+        self.object_cache.add_data(data=process2)
+        # caches archived before values were stored do not contain them
+        del self.object_cache._value_cache
+        object_cache = pickle.loads(pickle.dumps(self.object_cache))
+        self.assertEqual(object_cache.get_data(value=1, key=2).tme, 1)
+        self.assertEqual(object_cache.get_data(value=3, key=2).tme, 2)
+
     def test_getNullObject(self):
         self.assertRaises(DataNotInCacheException, self.object_cache.get_data, 1, 1)
 
@@ -0,0 +1,73 @@
+import unittest
+import os
+import time
+
+import gnmutils_tests
+
+from gnmutils.objects.job import Job
+from gnmutils.objects.process import Process
+from gnmutils.objects.traffic import Traffic
+from gnmutils.replay import replay, job_events, START_EVENT, TRAFFIC_EVENT, EXIT_EVENT
+from gnmutils.sources.filedatasource import FileDataSource
+
+
+class TestReplay(unittest.TestCase):
+    def _job(self, gpid, tme):
+        job = Job(job_id=gpid)
+        root = Process(name="sge_shepherd", cmd="sge_shepherd", pid=gpid, ppid=1, gpid=gpid,
+                       tme=tme, exit_tme=tme + 10, state="exit")
+        child = Process(name="test", cmd="test", pid=gpid + 1, ppid=gpid, gpid=gpid, tme=tme,
+                        exit_tme=tme + 10, state="exit")
+        child.traffic.append(Traffic(pid=gpid + 1, ppid=gpid, gpid=gpid, tme=tme + 5,
+                                     conn="10.1.7.102:32857-10.97.4.129:3128"))
+        job.add_process(root)
+        job.add_process(child)
+        return job
+
+    def test_job_events(self):
+        job = next(FileDataSource().jobs(path=os.path.join(
+            os.path.dirname(gnmutils_tests.__file__), "data/c00-001-001/1/1-process.csv")))
+        job.prepare_traffic()
+        events = list(job_events(job))
+        kinds = [kind for _, kind, _ in events]
+        self.assertEqual(9109, kinds.count(START_EVENT))
+        self.assertEqual(9109, kinds.count(EXIT_EVENT))
+        self.assertEqual(3155, kinds.count(TRAFFIC_EVENT))
+        tmes = [tme for tme, _, _ in events]
+        self.assertEqual(sorted(tmes), tmes)
+        started = set()
+        for _, kind, event in events:
+            if kind == START_EVENT:
+                self.assertTrue(event["ppid"] in started or not started)
+                started.add(event["pid"])
+            elif kind == EXIT_EVENT:
+                self.assertEqual("exit", event["state"])
+                self.assertIn("exit_code", event)
+        self.assertTrue(job.tme - 20 <= events[0][0] <= job.tme)
+        self.assertEqual(job.exit_tme, events[-1][0])
+        self.assertEqual(job.gpid, events[-1][2]["pid"])
+
+    def test_replay(self):
+        events = list(replay([self._job(10, 100), self._job(20, 105)]))
+        self.assertEqual([
+            (START_EVENT, 10, 100), (START_EVENT, 11, 100), (START_EVENT, 20, 105),
+            (START_EVENT, 21, 105), (TRAFFIC_EVENT, 11, 105), (TRAFFIC_EVENT, 21, 110),
+            (EXIT_EVENT, 11, 110), (EXIT_EVENT, 10, 110), (EXIT_EVENT, 21, 115),
+            (EXIT_EVENT, 20, 115)], [(kind, event["pid"], event["tme"]) for kind, event in events])
+        self.assertEqual("fork", events[0][1]["state"])
+        self.assertEqual("int", events[4][1]["conn_cat"])
+
+        # traffic of a job may precede the job by one interval
+        early_job = self._job(20, 115)
+        early_job.tree.root.children[0].value.traffic[0].tme = 101
+        self.assertEqual((TRAFFIC_EVENT, 21, 101), [(kind, event["pid"], event["tme"]) for
+                                                   kind, event in replay([
+                                                       self._job(10, 100), early_job])][2])
+        self.assertRaises(ValueError, list, replay([
+            self._job(10, 100), self._job(20, 130), self._job(30, 100)]))
+        self.assertEqual([], list(replay([])))
+
+    def test_speed(self):
+        start = time.time()
+        self.assertEqual(5, len(list(replay([self._job(10, 100)], speed=100))))
+        self.assertTrue(time.time() - start >= .1)
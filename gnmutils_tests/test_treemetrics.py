@@ -0,0 +1,55 @@
+import unittest
+import os
+
+import gnmutils_tests
+import gnmutils.treemetrics as treemetrics
+
+from gnmutils.objects.job import Job
+from gnmutils.objects.process import Process
+from gnmutils.sources.filedatasource import FileDataSource
+
+
+class TestTreeMetrics(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(os.path.dirname(gnmutils_tests.__file__), "data/c00-001-001/1")
+        self.numpy = treemetrics.numpy
+
+    def tearDown(self):
+        treemetrics.numpy = self.numpy
+
+    def test_tree_metrics(self):
+        job = next(FileDataSource().jobs(path=self.path))
+        expected = [len(node.children) for node, _ in job.tree.walkDFS()]
+        results = []
+        for numpy in set([None, self.numpy]):
+            treemetrics.numpy = numpy
+            degrees, height, count, leaves = treemetrics.tree_metrics(job.tree.freeze())
+            self.assertEqual(expected, degrees)
+            self.assertEqual(9109, count)
+            self.assertEqual(expected.count(0), leaves)
+            self.assertEqual(max(depth for _, depth in job.tree.walkDFS()), height)
+            results.append((degrees, height, count, leaves))
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_tree_feature(self):
+        self.assertIsNone(treemetrics.tree_feature(Job(job_id=1)))
+        job = Job(job_id=1)
+        job.add_process(Process(name="sge_shepherd", cmd="sge_shepherd", pid=2, ppid=1, uid=0,
+                                tme=1, exit_tme=10))
+        job.add_process(Process(name="test", pid=3, ppid=2, uid=10, tme=2, exit_tme=9))
+        job.add_process(Process(name="test", pid=4, ppid=2, uid=10, tme=3, exit_tme=8))
+        feature = treemetrics.tree_feature(job)
+        self.assertEqual(1, feature.id)
+        self.assertEqual([2, 0, 0], feature.degrees)
+        self.assertEqual(1, feature.height)
+        self.assertEqual(3, feature.count)
+        self.assertEqual(2, feature.leaves)
+        self.assertEqual(10, feature.uid)
+
+    def test_run_metrics_table(self):
+        table = treemetrics.run_metrics_table(path=self.path)
+        self.assertEqual(list(treemetrics.COLUMNS), list(table.keys()))
+        self.assertEqual(["1"], table["id"])
+        self.assertEqual([9109], table["count"])
+        self.assertEqual(table, treemetrics.run_metrics_table(
+            path=os.path.dirname(self.path), processes=2))
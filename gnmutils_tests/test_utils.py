@@ -0,0 +1,39 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+import gnmutils_tests
+
+from gnmutils.utils import raw_data_size, replace_file
+
+
+class TestUtilsFunctions(unittest.TestCase):
+    def setUp(self):
+        self.run_path = os.path.join(
+            os.path.dirname(gnmutils_tests.__file__), "data/c00-001-001/1")
+
+    def test_raw_data_size(self):
+        process_path = os.path.join(self.run_path, "1406555483-process.log-20140730")
+        traffic_path = os.path.join(self.run_path, "1406555483-traffic.log-20140730")
+        self.assertEqual(os.path.getsize(process_path), raw_data_size(process_path))
+        self.assertEqual(os.path.getsize(process_path) + os.path.getsize(traffic_path),
+                         raw_data_size(self.run_path))
+        self.assertEqual(0, raw_data_size(os.path.dirname(self.run_path)))
+        self.assertEqual(0, raw_data_size(os.path.join(self.run_path, "missing")))
+
+    def test_replace_file(self):
+        path = tempfile.mkdtemp()
+        try:
+            source = os.path.join(path, "file.tmp")
+            target = os.path.join(path, "file")
+            for content in ("first", "second"):
+                with open(source, "w") as output_file:
+                    output_file.write(content)
+                replace_file(source=source, target=target)
+                with open(target) as input_file:
+                    self.assertEqual(content, input_file.read())
+                self.assertFalse(os.path.exists(source))
+            self.assertRaises(OSError, replace_file, source=source, target=target)
+        finally:
+            shutil.rmtree(path)
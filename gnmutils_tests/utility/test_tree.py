@@ -0,0 +1,85 @@
+import unittest
+
+from gnmutils.utility.tree import Tree, Node, FrozenTree
+
+
+class TestTree(unittest.TestCase):
+    def setUp(self):
+        #      1
+        #    /   \
+        #   2     5
+        #  / \     \
+        # 3   4     6
+        self.nodes = dict((value, Node(value=value)) for value in range(1, 7))
+        for parent, child in ((1, 2), (2, 3), (2, 4), (1, 5), (5, 6)):
+            self.nodes[parent].add(self.nodes[child])
+        self.tree = Tree(self.nodes[1])
+
+    def test_walkDFS(self):
+        self.assertEqual([(1, 0), (2, 1), (3, 2), (4, 2), (5, 1), (6, 2)],
+                         [(node.value, depth) for node, depth in self.tree.walkDFS()])
+        self.assertEqual([(2, 3), (3, 4), (4, 4)],
+                         [(node.value, depth) for node, depth in
+                          self.tree.walkDFS(node=self.nodes[2], depth=3)])
+        self.assertEqual(6, self.tree.getVertexCount())
+        self.assertEqual(3, self.tree.getVertexCount(node=self.nodes[2]))
+
+    def test_walkDFS_stopCriteria(self):
+        self.assertEqual([1, 5, 6], [node.value for node, _ in self.tree.walkDFS(
+            stopCriteria=lambda node, depth: node.value == 2)])
+        self.assertEqual([1, 2, 5], [node.value for node, _ in self.tree.walkDFS(
+            stopCriteria=lambda node, depth: depth > 1)])
+        self.assertEqual([], list(self.tree.walkDFS(stopCriteria=lambda node, depth: True)))
+
+    def test_walkDFS_modification(self):
+        # children of nodes that have already been continued are not visited
+        values = []
+        for node, _ in self.tree.walkDFS():
+            values.append(node.value)
+            if node.value == 3:
+                self.nodes[2].add(Node(value=7))
+            elif node.value == 5:
+                self.nodes[5].add(Node(value=8))
+        self.assertEqual([1, 2, 3, 4, 5, 6, 8], values)
+
+    def test_walkBFS(self):
+        self.assertEqual([1, 2, 5, 3, 4, 6], [node.value for node in self.tree.walkBFS()])
+        self.assertEqual([5, 6], [node.value for node in self.tree.walkBFS(node=self.nodes[5])])
+
+    def test_deep_tree(self):
+        root = node = Node(value=0)
+        for value in range(1, 10000):
+            child = Node(value=value)
+            node.add(child)
+            node = child
+        tree = Tree(root)
+        self.assertEqual(list(range(10000)), [depth for _, depth in tree.walkDFS()])
+        self.assertEqual(10000, len(list(tree.walkBFS())))
+        self.assertEqual(10000, tree.getDepth(node) + 1)
+
+    def test_freeze(self):
+        frozen = self.tree.freeze()
+        self.assertEqual(6, len(frozen))
+        self.assertEqual(1, frozen.root)
+        self.assertEqual([1, 2, 3, 4, 5, 6], frozen.values)
+        self.assertEqual([-1, 0, 1, 1, 0, 4], list(frozen.parents))
+        self.assertEqual([0, 1, 2, 2, 1, 2], list(frozen.depths))
+        self.assertEqual([6, 3, 1, 1, 2, 1], list(frozen.sizes))
+        self.assertEqual(2, frozen.height)
+        self.assertEqual([2, 3, 4], frozen.values[frozen.subtree(1)])
+        self.assertEqual([1, 4], list(frozen.children(0)))
+        self.assertEqual([], list(frozen.children(2)))
+        self.assertEqual([2, 2, 0, 0, 1, 0], list(frozen.degrees()))
+        self.assertEqual({0: 3, 1: 1, 2: 2}, frozen.degree_histogram())
+        self.assertEqual(3, frozen.leaf_count())
+        self.assertEqual([(node.value, depth) for node, depth in self.tree.walkDFS()],
+                         list(frozen.walk()))
+        self.assertEqual([(5, 1), (6, 2)], list(frozen.walk(index=4)))
+        self.assertEqual([1, 5, 6], [value for value, _ in frozen.walk(
+            stopCriteria=lambda value, depth: value == 2)])
+
+        empty = FrozenTree()
+        self.assertEqual(0, len(empty))
+        self.assertIsNone(empty.root)
+        self.assertEqual(0, empty.height)
+        self.assertEqual([], list(empty.walk()))
@@ -0,0 +1,41 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from gnmutils.writer.csvwriter import CSVWriter
+
+
+class TestCSVWriter(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _content(self, name):
+        with open(os.path.join(self.path, name)) as input_file:
+            return input_file.read()
+
+    def test_append(self):
+        writer = CSVWriter(max_files=1)
+        first_path = os.path.join(self.path, "sub", "1-traffic.csv")
+        second_path = os.path.join(self.path, "sub", "2-traffic.csv")
+        writer.append(path=first_path, rows=["1,2", "3,4"], header="a,b")
+        writer.append(path=first_path, rows=["5,6"], header="a,b")
+        # closes the first file
+        writer.append(path=second_path, rows=["7,8"], header="a,b")
+        writer.append(path=first_path, rows=["9,10"], header="a,b")
+        writer.close()
+        self.assertEqual("a,b\n1,2\n3,4\n5,6\n9,10\n", self._content("sub/1-traffic.csv"))
+        self.assertEqual("a,b\n7,8\n", self._content("sub/2-traffic.csv"))
+
+    def test_write(self):
+        writer = CSVWriter()
+        path = os.path.join(self.path, "1-process.csv")
+        writer.append(path=path, rows=["1,2"], header="a,b")
+        writer.write(path=path, rows=["3,4"], header="a,b")
+        self.assertEqual("a,b\n3,4\n", self._content("1-process.csv"))
+        writer.write(path=path, rows=[])
+        self.assertEqual("", self._content("1-process.csv"))
+        writer.close()